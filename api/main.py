@@ -1,14 +1,58 @@
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from app.services.chatbot import CashifyChatbotService
+from starlette.background import BackgroundTask
+from typing import Optional
+from app.core.llm import ROLES, llm_registry
+from app.services.admission import AdmissionRejected, AdmissionTicket
+from app.services.chatbot import CashifyChatbotService, readiness
+from app.services.metrics import render_metrics
+from app.services.tracing import tracer
+from app.utils.auth import client_key
+from app.utils.config import get_server_config
 from app.logs.logger import Logger
-import uuid
+import os
+import json
+
+logger = Logger(__name__).get_logger()
+chatbot_service = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Build the chatbot service before the first request and release it after
+    the last. Under the production server the graph and clients were already
+    built in the master, so this only adds the per-worker state. In-flight
+    requests are drained by the server (SERVER_GRACEFUL_TIMEOUT) before the
+    shutdown half runs.
+    """
+    global chatbot_service
+    app.state.llm_warm_up = None
+    try:
+        chatbot_service = CashifyChatbotService()
+    except Exception as e:
+        logger.error(f"Failed to start application: {str(e)}")
+        raise
+    if get_server_config().warmup_llm:
+        app.state.llm_warm_up = await llm_registry.awarm_up(ROLES)
+    logger.info("FastAPI application started successfully (pid %d)", os.getpid())
+
+    yield
+
+    logger.info("FastAPI application shutting down (pid %d)", os.getpid())
+    service, chatbot_service = chatbot_service, None
+    service.close()
+    tracer.shutdown()
+
 
 app = FastAPI(
     title="Cashify Chatbot API",
     description="AI-powered customer service chatbot for Cashify",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -19,28 +63,30 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-logger = Logger().get_logger()
-chatbot_service = None
-
-
 class ChatRequest(BaseModel):
     message: str
+    session_id: Optional[str] = None
 
 
 class ChatResponse(BaseModel):
     response: str
+    session_id: Optional[str] = None
 
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize chatbot service on startup"""
-    global chatbot_service
-    try:
-        chatbot_service = CashifyChatbotService()
-        logger.info("FastAPI application started successfully")
-    except Exception as e:
-        logger.error(f"Failed to start application: {str(e)}")
-        raise
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    """Shed requests get a fast 429/503 telling the client when to come back"""
+    return JSONResponse(
+        {"detail": "Too many requests, please retry later", "reason": exc.reason},
+        status_code=exc.status_code,
+        headers=exc.headers
+    )
+
+
+async def _admit(client: str, timeout: Optional[float]) -> Optional[AdmissionTicket]:
+    """Wait for one of the service's in-flight slots; None when admission control is off"""
+    admission = chatbot_service.admission if chatbot_service else None
+    return await admission.acquire(client, timeout) if admission else None
 
 
 @app.get("/")
@@ -55,14 +101,50 @@ async def health_check():
     return {"status": "healthy", "service": "Cashify Chatbot API"}
 
 
+@app.get("/health/live")
+async def liveness_check():
+    """Liveness probe: the worker's event loop is answering; failing it means restart the worker"""
+    return {"status": "alive", "pid": os.getpid()}
+
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness probe: the service is up and its graph, LLM clients and local data are warm"""
+    checks = {"service": chatbot_service is not None, **readiness()}
+    ready = all(checks.values())
+    body = {"status": "ready" if ready else "not_ready", "checks": checks, "pid": os.getpid()}
+    warm_up = getattr(app.state, "llm_warm_up", None)
+    if warm_up is not None:
+        # Reported, not required: a slow provider should not take every worker out of rotation
+        body["llm_warm_up"] = warm_up
+    return JSONResponse(body, status_code=200 if ready else 503)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics: node, tool and LLM latency, token counts, retries, admission control and cache hits"""
+    return PlainTextResponse(render_metrics(chatbot_service), media_type="text/plain; version=0.0.4")
+
+
 @app.post("/chat", response_model=ChatResponse)
-async def chat_endpoint(request: ChatRequest):
+async def chat_endpoint(
+    request: ChatRequest,
+    client: str = Depends(client_key),
+    request_timeout: Optional[float] = Header(None, alias="X-Request-Timeout")
+):
     """Chat endpoint for processing user messages"""
     try:
         if not request.message.strip():
             raise HTTPException(status_code=400, detail="Message cannot be empty")
         
-        response = chatbot_service.chat(request.message)
+        # Without a session id the turn runs statelessly; a generated one would leave a thread nobody resumes
+        session_id = request.session_id
+        ticket = await _admit(client, request_timeout)
+        try:
+            response = await chatbot_service.achat(request.message, session_id)
+        finally:
+            if ticket:
+                ticket.release()
         
         # Safety check - ensure we extract string properly
         if hasattr(response, 'final_response'):
@@ -72,8 +154,55 @@ async def chat_endpoint(request: ChatRequest):
         else:
             final_text = str(response)
         
-        return ChatResponse(response=final_text)
+        return ChatResponse(response=final_text, session_id=session_id)
         
+    except AdmissionRejected:
+        raise
     except Exception as e:
         logger.error(f"Error in chat endpoint: {str(e)}")
-        raise HTTPException(status_code=500, detail="Internal server error")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+def _format_sse(event: dict) -> str:
+    """Serialize a workflow event as a Server-Sent Events frame"""
+    if event["type"] == "final":
+        response = event["response"]
+        final_text = getattr(response, "final_response", response)
+        event = {**event, "response": final_text if isinstance(final_text, str) else str(final_text)}
+    return f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False, default=str)}\n\n"
+
+
+@app.post("/chat/stream")
+async def chat_stream_endpoint(
+    request: ChatRequest,
+    client: str = Depends(client_key),
+    request_timeout: Optional[float] = Header(None, alias="X-Request-Timeout")
+):
+    """Stream node transitions, tool activity and model tokens as Server-Sent Events"""
+    if not request.message.strip():
+        raise HTTPException(status_code=400, detail="Message cannot be empty")
+    
+    session_id = request.session_id
+    # Admitted before the response starts, so a shed request still gets its 429/503 status
+    ticket = await _admit(client, request_timeout)
+
+    async def event_source():
+        try:
+            async for event in chatbot_service.astream_chat(request.message, session_id):
+                if event["type"] == "final":
+                    event = {**event, "session_id": session_id}
+                yield _format_sse(event)
+        except Exception as e:
+            logger.error(f"Error in chat stream endpoint: {str(e)}")
+            yield _format_sse({"type": "error", "message": "Internal server error"})
+        finally:
+            if ticket:
+                ticket.release()
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", **({"X-Session-Id": session_id} if session_id else {})},
+        # Also frees the slot if the client went away before the stream started
+        background=BackgroundTask(ticket.release) if ticket else None
+    )
@@ -0,0 +1,86 @@
+"""
+Production server: a gunicorn master forking uvicorn workers.
+
+    python -m api.server
+
+With SERVER_PRELOAD the master imports the app and builds the compiled graphs,
+LLM clients and local data before forking, then freezes them out of the
+garbage collector's reach, so every worker shares those pages copy-on-write
+instead of building and holding its own copy. Workers are configured from
+ServerConfig (WEB_CONCURRENCY, SERVER_GRACEFUL_TIMEOUT ...). For development
+keep using ``uvicorn api.main:app --reload``.
+"""
+import gc
+import warnings
+
+from gunicorn.app.base import BaseApplication
+
+with warnings.catch_warnings():
+    # uvicorn deprecates its gunicorn worker in favour of the uvicorn-worker package, which is not a dependency here
+    warnings.simplefilter("ignore", DeprecationWarning)
+    from uvicorn.workers import UvicornWorker
+
+from app.logs.logger import Logger
+from app.utils.config import get_server_config
+
+
+class GracefulUvicornWorker(UvicornWorker):
+    """
+    UvicornWorker that drains like a gunicorn worker: on SIGTERM it stops
+    accepting connections and gives in-flight requests and open streams up to
+    ``graceful_timeout`` seconds before cancelling them, then runs the app's
+    lifespan shutdown. The stock worker leaves uvicorn's drain unbounded, so
+    the master would kill it before the shutdown hooks ran.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Leave a second of the master's grace period for the lifespan shutdown
+        self.config.timeout_graceful_shutdown = max(self.cfg.graceful_timeout - 1, 1)
+
+
+class ProductionServer(BaseApplication):
+    """gunicorn application serving ``api.main:app``, configured from ServerConfig instead of a config file"""
+
+    def __init__(self, config=None):
+        self.config = config or get_server_config()
+        super().__init__()
+
+    def load_config(self):
+        options = {
+            "bind": f"{self.config.host}:{self.config.port}",
+            "workers": self.config.workers,
+            "worker_class": f"{__name__}.GracefulUvicornWorker",
+            "preload_app": self.config.preload,
+            "graceful_timeout": self.config.graceful_timeout,
+            "timeout": self.config.timeout,
+            "keepalive": self.config.keepalive,
+            "max_requests": self.config.max_requests,
+            "max_requests_jitter": self.config.max_requests_jitter,
+        }
+        for key, value in options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        # In the master when preloading, otherwise in each worker after the fork
+        from api.main import app
+
+        if self.config.preload:
+            from app.services.chatbot import preload
+
+            preload()
+            # Objects built so far are never freed; leaving them out of collections keeps their pages shared
+            gc.collect()
+            gc.freeze()
+            Logger(__name__).get_logger().info(
+                "Preloaded the app for %d workers (%d objects frozen)", self.config.workers, gc.get_freeze_count()
+            )
+        return app
+
+
+def main():
+    ProductionServer().run()
+
+
+if __name__ == "__main__":
+    main()
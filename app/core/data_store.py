@@ -0,0 +1,121 @@
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+
+@dataclass
+class _Entry:
+    path: Optional[str]
+    signature: Optional[Tuple[int, int, int]]
+    text: Optional[str]
+    parsed: Any = None
+    has_parsed: bool = False
+    checked_at: float = 0.0
+
+
+class DataStore:
+    """
+    In-memory cache of the tool data files.
+
+    Each file is read and parsed once and served from memory afterwards. At most
+    every ``check_interval`` seconds a lookup stats the file, and it is reloaded
+    only when its (mtime_ns, inode, size) signature changed, which also covers
+    editors that save by replacing the file.
+    """
+
+    def __init__(self, data_dir: str, check_interval: float = 1.0):
+        self.data_dir = data_dir
+        self.check_interval = check_interval
+        self._entries: Dict[str, _Entry] = {}
+        self._preloaded: Tuple[str, ...] = ()
+        self._lock = threading.RLock()
+
+    def _resolve(self, filename: str) -> Optional[str]:
+        for path in (os.path.join(self.data_dir, filename), filename):
+            if os.path.isfile(path):
+                return path
+        return None
+
+    @staticmethod
+    def _signature(path: Optional[str]) -> Optional[Tuple[int, int, int]]:
+        if not path:
+            return None
+        try:
+            stat = os.stat(path)
+            return (stat.st_mtime_ns, stat.st_ino, stat.st_size)
+        except OSError:
+            return None
+
+    def _load(self, filename: str) -> _Entry:
+        path = self._resolve(filename)
+        signature = self._signature(path)
+        text = None
+        if path:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    text = f.read()
+            except OSError:
+                signature = None
+        return _Entry(path=path, signature=signature, text=text, checked_at=time.monotonic())
+
+    def _entry(self, filename: str) -> _Entry:
+        entry = self._entries.get(filename)
+        now = time.monotonic()
+        if entry is not None and now - entry.checked_at < self.check_interval:
+            return entry
+
+        with self._lock:
+            entry = self._entries.get(filename)
+            if entry is not None and now - entry.checked_at < self.check_interval:
+                return entry
+
+            path = entry.path if entry and entry.path else self._resolve(filename)
+            if entry is None or self._signature(path) != entry.signature:
+                entry = self._load(filename)
+            else:
+                entry.checked_at = now
+            self._entries[filename] = entry
+            return entry
+
+    def get_text(self, filename: str, default: Optional[str] = None) -> Optional[str]:
+        """Raw file contents, or ``default`` if the file cannot be read"""
+        entry = self._entry(filename)
+        return entry.text if entry.text is not None else default
+
+    def get_json(self, filename: str, default: Any = None) -> Any:
+        """
+        Parsed JSON contents, or ``default`` if the file is missing.
+        The returned object is shared between callers and must not be mutated.
+        Malformed JSON raises ``json.JSONDecodeError`` on every call until fixed.
+        """
+        entry = self._entry(filename)
+        if entry.text is None:
+            return default
+        if not entry.has_parsed:
+            with self._lock:
+                if not entry.has_parsed:
+                    entry.parsed = json.loads(entry.text)
+                    entry.has_parsed = True
+        return entry.parsed
+
+    def preload(self, filenames: Iterable[str]):
+        self._preloaded = tuple(dict.fromkeys(self._preloaded + tuple(filenames)))
+        for filename in self._preloaded:
+            self._entry(filename)
+
+    def is_warm(self) -> bool:
+        """Whether every preloaded file is in memory, i.e. no request will have to read it from disk"""
+        return all(filename in self._entries for filename in self._preloaded)
+
+    def version(self) -> Tuple:
+        """Signature of every tracked file; changes whenever one of them is reloaded"""
+        with self._lock:
+            filenames = sorted(self._entries)
+        return tuple((filename, self._entry(filename).signature) for filename in filenames)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -1,31 +1,210 @@
-from langchain_groq import ChatGroq
-from ..utils.config import get_settings
+import importlib.util
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from ..services.reasoning import is_reasoning_model
+from .metrics_primitives import LatencyHistogram
+from ..utils.config import get_settings, get_llm_client_config
 from ..utils.exceptions import GroqInitializationError
 from ..logs.logger import Logger
 
 
+ROLES = ("judge", "tool_selection", "answer", "search_rewrite")
+
+
+class RoleLatencyCallback(BaseCallbackHandler):
+    """Times every call of a role's client into the registry's per-role histogram"""
+
+    def __init__(self, registry: "LLMRegistry", role: str):
+        self.registry = registry
+        self.role = role
+        self._started: Dict[Any, float] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._started[run_id] = time.perf_counter()
+
+    def _finished(self, run_id):
+        start = self._started.pop(run_id, None)
+        if start is not None:
+            elapsed = time.perf_counter() - start
+            self.registry.record_latency(self.role, elapsed)
+            Logger(__name__).get_logger().info("LLM latency [%s] %.0fms", self.role, elapsed * 1000)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._finished(run_id)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._finished(run_id)
+
+
+class LLMRegistry:
+    """
+    Process-wide LLM clients.
+
+    Each client is built on first use and then handed to every caller, and all
+    of them send requests through one shared httpx pool (one sync, one async),
+    so the tools module, the orchestrator and every Streamlit session reuse the
+    same keep-alive connections instead of opening their own.
+    """
+
+    def __init__(self, config=None):
+        self.config = config
+        self._lock = threading.RLock()
+        self._clients: Dict[str, Any] = {}
+        self._http_client = None
+        self._http_async_client = None
+        self._options = None
+        self._latency: Dict[str, LatencyHistogram] = {}
+
+    def _http_options(self) -> Dict:
+        if self._options is not None:
+            return self._options
+        import httpx
+        config = self.config or get_llm_client_config()
+        http2 = config.http2
+        if http2 and importlib.util.find_spec("h2") is None:
+            Logger(__name__).get_logger().warning("LLM_HTTP2 is set but the h2 package is missing, using HTTP/1.1")
+            http2 = False
+        self._options = {
+            "limits": httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry
+            ),
+            "timeout": httpx.Timeout(config.timeout, connect=config.connect_timeout),
+            "http2": http2,
+        }
+        return self._options
+
+    def http_client(self):
+        with self._lock:
+            if self._http_client is None:
+                import httpx
+                self._http_client = httpx.Client(**self._http_options())
+            return self._http_client
+
+    def http_async_client(self):
+        # Pooled async connections belong to the event loop that opened them; use one long-lived loop
+        with self._lock:
+            if self._http_async_client is None:
+                import httpx
+                self._http_async_client = httpx.AsyncClient(**self._http_options())
+            return self._http_async_client
+
+    def get(self, name: str, factory: Callable[[], Any]):
+        """The client registered as ``name``, built with ``factory`` the first time it is asked for"""
+        client = self._clients.get(name)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(name)
+                if client is None:
+                    client = self._clients[name] = factory()
+        return client
+
+    def built(self) -> List[str]:
+        """Names of the clients built so far"""
+        with self._lock:
+            return sorted(self._clients)
+
+    async def awarm_up(self, names: Iterable[str]) -> Dict[str, bool]:
+        """
+        Send a one-token request through each named client so its connection
+        is open before the first user asks. Failures are logged, not raised.
+        """
+        warm = {}
+        for name in names:
+            client = self._clients.get(name)
+            if client is None:
+                warm[name] = False
+                continue
+            try:
+                await client.bind(max_tokens=1).ainvoke("ping")
+                warm[name] = True
+            except Exception as e:
+                Logger(__name__).get_logger().warning("LLM warm-up for %s failed: %s", name, e)
+                warm[name] = False
+        return warm
+
+    def record_latency(self, role: str, seconds: float):
+        with self._lock:
+            self._latency.setdefault(role, LatencyHistogram()).record(seconds)
+
+    def latency_snapshot(self) -> Dict[str, Dict]:
+        """Per-role LLM call latency histograms"""
+        with self._lock:
+            return {role: histogram.snapshot() for role, histogram in self._latency.items()}
+
+    def close(self):
+        with self._lock:
+            self._clients.clear()
+            if self._http_client is not None:
+                self._http_client.close()
+                self._http_client = None
+            # The async pool is left to the garbage collector: closing it needs the loop that owns it
+            self._http_async_client = None
+
+
+llm_registry = LLMRegistry()
+
+
 class LLMinitialize:
     """
     This will initialize the LLM
     """
     def __init__(self):
         self.settings = get_settings()
-        self.logger = Logger().get_logger()
-    
+        self.logger = Logger(__name__).get_logger()
+
     def get_groq_llm(self):
         """
-        Get Groq LLM
+        Get the shared Groq LLM, built on first use
         """
+        groq = self.settings.groq
+        return llm_registry.get("groq", lambda: self._build_groq_llm("default", groq.model_name, groq.temperature, groq.max_token))
+
+    def get_llm(self, role: str):
+        """
+        Get the shared client for a graph role (see ROLES), configured from its model profile
+        """
+        if role not in ROLES:
+            raise ValueError(f"Unknown LLM role '{role}', expected one of {ROLES}")
+        profile = getattr(self.settings.models, role)
+        return llm_registry.get(role, lambda: self._build_groq_llm(role, profile.model_name, profile.temperature, profile.max_tokens))
+
+    def _suppression_options(self, role: str, model_name: str) -> Dict:
+        """Request options that keep reasoning out of the output, or cut one-line answers short"""
+        reasoning = self.settings.reasoning
+        if not reasoning.suppress:
+            return {}
+        if is_reasoning_model(model_name, reasoning.model_patterns):
+            return {"model_kwargs": {"extra_body": {"reasoning_format": reasoning.reasoning_format}}}
+        # A stop sequence would also cut a reasoning model's <think> block short, so only plain models get one
+        if role in reasoning.single_line_roles:
+            return {"stop_sequences": ["\n"]}
+        return {}
+
+    def _build_groq_llm(self, role: str, model_name: str, temperature: float, max_tokens: int):
+        # langchain_groq is the slowest import of the app, load it only when a client is needed
+        from langchain_groq import ChatGroq
         try:
+            options = self._suppression_options(role, model_name)
             llm = ChatGroq(
                 groq_api_key=self.settings.groq.groq_api,
-                model=self.settings.groq.model_name,
-                temperature=self.settings.groq.temperature,
-                max_tokens=self.settings.groq.max_token
+                model=model_name,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                http_client=llm_registry.http_client(),
+                http_async_client=llm_registry.http_async_client(),
+                callbacks=[RoleLatencyCallback(llm_registry, role)],
+                **options
             )
+            self.logger.info(f"Groq LLM client created for role {role}: {model_name} (max_tokens={max_tokens}, {options or 'no suppression'})")
             return llm
         except GroqInitializationError as e:
             raise GroqInitializationError(
                 error_code=500,
                 message=f"Error while initializing the LLM {str(e)}"
-            ) from e
\ No newline at end of file
+            ) from e
@@ -0,0 +1,186 @@
+"""
+Local BM25 search index over a directory of gadget spec and FAQ documents.
+
+Build offline with ``python -m app.core.local_index <docs_dir> <index_path>``,
+or let LocalIndexBackend build it at startup when the documents are newer
+than the index.
+"""
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+from collections import Counter, defaultdict
+from typing import Dict, List, Tuple
+
+from ..services.cache import normalize_query
+
+MAGIC = b"CSHIDX01"
+POSTING = struct.Struct("<II")  # doc id, term frequency
+HEADER_SIZE = struct.Struct("<Q")
+DOC_EXTENSIONS = (".md", ".txt")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "at", "be", "by", "can", "do", "does", "for", "from", "how", "i",
+    "in", "is", "it", "me", "my", "of", "on", "or", "the", "to", "what", "which", "with", "you",
+    "का", "की", "के", "है", "में", "और", "क्या", "को", "से",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in normalize_query(text).split() if token not in STOPWORDS]
+
+
+def _passages(path: str) -> List[Tuple[str, str]]:
+    """Split a document into (title, text) passages at markdown headings"""
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    doc_title = os.path.splitext(os.path.basename(path))[0].replace("-", " ").title()
+    passages, title, lines = [], doc_title, []
+    for line in content.splitlines():
+        heading = re.match(r"^(#+)\s+(.*)", line)
+        if heading:
+            if "".join(lines).strip():
+                passages.append((title, "\n".join(lines).strip()))
+            if len(heading.group(1)) == 1:
+                doc_title = title = heading.group(2).strip()
+            else:
+                title = f"{doc_title} - {heading.group(2).strip()}"
+            lines = []
+        else:
+            lines.append(line)
+    if "".join(lines).strip():
+        passages.append((title, "\n".join(lines).strip()))
+    return passages
+
+
+def source_mtime(docs_dir: str) -> int:
+    """Newest modification time among the documents (and the directory itself)"""
+    latest = os.stat(docs_dir).st_mtime_ns
+    for entry in os.scandir(docs_dir):
+        if entry.is_file() and entry.name.endswith(DOC_EXTENSIONS):
+            latest = max(latest, entry.stat().st_mtime_ns)
+    return latest
+
+
+def build_index(docs_dir: str, index_path: str) -> int:
+    """Index every passage of the documents in ``docs_dir``; returns the passage count"""
+    docs, texts, postings = [], [], defaultdict(list)
+    text_offset = 0
+
+    for name in sorted(os.listdir(docs_dir)):
+        if not name.endswith(DOC_EXTENSIONS):
+            continue
+        for title, text in _passages(os.path.join(docs_dir, name)):
+            doc_id = len(docs)
+            terms = Counter(tokenize(f"{title} {text}"))
+            for term, tf in terms.items():
+                postings[term].append((doc_id, tf))
+            encoded = text.encode("utf-8")
+            docs.append({
+                "title": title,
+                "source": name,
+                "length": sum(terms.values()),
+                "offset": text_offset,
+                "size": len(encoded),
+            })
+            texts.append(encoded)
+            text_offset += len(encoded)
+
+    vocabulary, blob, offset = {}, [], 0
+    for term in sorted(postings):
+        entries = postings[term]
+        vocabulary[term] = [len(entries), offset]
+        blob.extend(POSTING.pack(doc_id, tf) for doc_id, tf in entries)
+        offset += len(entries) * POSTING.size
+
+    header = json.dumps({
+        "docs": docs,
+        "terms": vocabulary,
+        "avgdl": sum(doc["length"] for doc in docs) / max(len(docs), 1),
+        "postings_size": offset,
+    }, ensure_ascii=False).encode("utf-8")
+
+    directory = os.path.dirname(index_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{index_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(HEADER_SIZE.pack(len(header)))
+        f.write(header)
+        f.write(b"".join(blob))
+        f.write(b"".join(texts))
+    os.replace(tmp_path, index_path)
+    return len(docs)
+
+
+class LocalIndex:
+    """
+    Read-only BM25 index loaded through mmap: the vocabulary and passage table
+    are parsed once, postings and passage text are read straight from the
+    mapped file on demand.
+    """
+
+    def __init__(self, index_path: str, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        with open(index_path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{index_path} is not a search index")
+
+        header_size, = HEADER_SIZE.unpack_from(self._mmap, len(MAGIC))
+        header_start = len(MAGIC) + HEADER_SIZE.size
+        header = json.loads(self._mmap[header_start:header_start + header_size].decode("utf-8"))
+        self.docs = header["docs"]
+        self.terms: Dict[str, List[int]] = header["terms"]
+        self.avgdl = header["avgdl"] or 1.0
+        self._postings_start = header_start + header_size
+        self._texts_start = self._postings_start + header["postings_size"]
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def _postings(self, term: str):
+        df, offset = self.terms[term]
+        start = self._postings_start + offset
+        return POSTING.iter_unpack(self._mmap[start:start + df * POSTING.size])
+
+    def text(self, doc_id: int) -> str:
+        doc = self.docs[doc_id]
+        start = self._texts_start + doc["offset"]
+        return self._mmap[start:start + doc["size"]].decode("utf-8")
+
+    def search(self, query: str, k: int = 3) -> List[Tuple[int, float]]:
+        scores: Dict[int, float] = defaultdict(float)
+        total = len(self.docs)
+        for term in set(tokenize(query)):
+            if term not in self.terms:
+                continue
+            df = self.terms[term][0]
+            idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+            for doc_id, tf in self._postings(term):
+                length = self.docs[doc_id]["length"]
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * length / self.avgdl))
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+    def snippet(self, doc_id: int, query: str, max_chars: int = 300) -> str:
+        """The passage line sharing the most terms with the query"""
+        terms = set(tokenize(query))
+        lines = [line.strip(" -*") for line in self.text(doc_id).splitlines() if line.strip()]
+        best = max(lines, key=lambda line: len(terms & set(tokenize(line))), default="")
+        return best if len(best) <= max_chars else best[:max_chars].rsplit(" ", 1)[0] + "..."
+
+    def close(self):
+        self._mmap.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("usage: python -m app.core.local_index <docs_dir> <index_path>")
+    count = build_index(sys.argv[1], sys.argv[2])
+    print(f"Indexed {count} passages from {sys.argv[1]} into {sys.argv[2]}")
@@ -0,0 +1,27 @@
+import bisect
+from typing import Dict, Sequence
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (seconds), cumulative like a Prometheus histogram"""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def record(self, seconds: float):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def snapshot(self) -> Dict:
+        cumulative, running = {}, 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            running += count
+            cumulative["+Inf" if bound == float("inf") else str(bound)] = running
+        return {"count": self.count, "sum": round(self.sum, 6), "buckets": cumulative}
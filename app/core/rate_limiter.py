@@ -0,0 +1,186 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Tuple
+
+from ..utils.exceptions import RateLimitExceeded
+
+
+class BucketStore:
+    """
+    In-process token bucket state.
+
+    ``reserve`` refills the bucket, then takes one token. When the bucket is empty
+    the token is borrowed ahead of time (the balance goes negative) and the caller
+    is told how long to wait for it, so concurrent callers queue up in order
+    instead of polling. Nothing is taken if that wait would exceed ``max_wait``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    @staticmethod
+    def _take(tokens: float, updated: float, now: float, rate: float, capacity: float,
+              max_wait: float) -> Tuple[float, float, bool]:
+        tokens = min(capacity, tokens + (now - updated) * rate)
+        wait = max(0.0, (1 - tokens) / rate)
+        if wait > max_wait:
+            return tokens, wait, False
+        return tokens - 1, wait, True
+
+    def reserve(self, key: str, rate: float, capacity: float, max_wait: float) -> Tuple[float, bool]:
+        """Returns (seconds until the token is available, whether it was reserved)"""
+        now = time.time()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens, wait, granted = self._take(tokens, updated, now, rate, capacity, max_wait)
+            self._buckets[key] = (tokens, now)
+        return wait, granted
+
+    def backlog(self, key: str, rate: float) -> float:
+        """Tokens still borrowed ahead of time, i.e. callers queued on this bucket across all users of the store"""
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (0.0, time.time()))
+        return max(0.0, -(tokens + (time.time() - updated) * rate))
+
+    def close(self):
+        pass
+
+
+class SQLiteBucketStore(BucketStore):
+    """Bucket state in a SQLite file so every uvicorn worker on the host draws from the same bucket"""
+
+    def __init__(self, path: str):
+        super().__init__()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._conn = self._connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+        # The store is built when app.core.tools is imported, i.e. in the gunicorn master under preload;
+        # a connection must not cross fork(), so every worker opens its own
+        os.register_at_fork(after_in_child=self._reconnect)
+
+    @staticmethod
+    def _connect(path: str) -> sqlite3.Connection:
+        conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _reconnect(self):
+        # The parent's connection is kept, never closed: closing it here could drop the parent's file locks
+        self._inherited_conn = self._conn
+        self._lock = threading.Lock()
+        self._conn = self._connect(self.path)
+
+    def reserve(self, key: str, rate: float, capacity: float, max_wait: float) -> Tuple[float, bool]:
+        with self._lock:
+            # IMMEDIATE takes the write lock up front, serialising workers on this bucket
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = self._conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+                tokens, updated = row if row else (capacity, now)
+                tokens, wait, granted = self._take(tokens, updated, now, rate, capacity, max_wait)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                    (key, tokens, now)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return wait, granted
+
+    def backlog(self, key: str, rate: float) -> float:
+        with self._lock:
+            row = self._conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+        return max(0.0, -(row[0] + (time.time() - row[1]) * rate)) if row else 0.0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class TokenBucketLimiter:
+    """
+    Token bucket allowing ``rate`` calls per second with bursts of up to ``capacity``.
+
+    ``acquire`` sleeps the calling thread, ``aacquire`` awaits, and both raise
+    RateLimitExceeded instead of waiting longer than ``max_wait`` seconds. With
+    ``fail_fast`` they never wait: a call either gets a token now or is refused.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1, max_wait: float = 5.0,
+                 fail_fast: bool = False, store: BucketStore = None, key: str = "default"):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_wait = 0.0 if fail_fast else max_wait
+        self.fail_fast = fail_fast
+        self.store = store or BucketStore()
+        self.key = key
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self.granted = 0
+        self.rejected = 0
+
+    def _reserve(self) -> float:
+        wait, granted = self.store.reserve(self.key, self.rate, self.capacity, self.max_wait)
+        with self._lock:
+            if not granted:
+                self.rejected += 1
+                raise RateLimitExceeded(f"Rate limit '{self.key}' exceeded, retry in {wait:.1f}s", retry_after=wait)
+            self.granted += 1
+            if wait > 0:
+                self._waiting += 1
+        return wait
+
+    def _done_waiting(self):
+        with self._lock:
+            self._waiting -= 1
+
+    def acquire(self):
+        wait = self._reserve()
+        if wait > 0:
+            try:
+                time.sleep(wait)
+            finally:
+                self._done_waiting()
+
+    async def aacquire(self):
+        wait = self._reserve()
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            finally:
+                self._done_waiting()
+
+    @property
+    def queue_depth(self) -> int:
+        """Callers of this process currently waiting for a token"""
+        return self._waiting
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = {"queue_depth": self._waiting, "granted": self.granted, "rejected": self.rejected}
+        stats["shared_backlog"] = round(self.store.backlog(self.key, self.rate), 3)
+        return stats
+
+
+def create_rate_limiter(config, key: str) -> TokenBucketLimiter:
+    """Build a limiter from a SearchRateLimitConfig-like object, sharing state through SQLite if configured"""
+    store = SQLiteBucketStore(config.sqlite_path) if config.store == "sqlite" else BucketStore()
+    return TokenBucketLimiter(
+        rate=config.rate,
+        capacity=config.burst,
+        max_wait=config.max_wait,
+        fail_fast=config.fail_fast,
+        store=store,
+        key=key
+    )
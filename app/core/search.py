@@ -0,0 +1,376 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.runnables import Runnable
+
+from .local_index import LocalIndex, build_index, source_mtime
+from .search_cache import SearchCache, SingleFlight
+from ..logs.logger import Logger
+from ..services.cache import normalize_query
+from ..services.reasoning import strip_reasoning
+from ..services.tracing import tracer
+from ..utils.exceptions import RateLimitExceeded
+
+
+def clean_query(text):
+    text = strip_reasoning(text)
+    lines = [line.strip() for line in text.split('\n') if line.strip()]
+    return lines[-1] if lines else text.strip()
+
+
+def search_query_messages(user_query: str):
+    query_generator_prompt = SystemMessage(content="Convert to search terms. Return ONLY 2-4 words.")
+    return [query_generator_prompt, HumanMessage(content=f"User question: {user_query}")]
+
+
+class SearchBackend:
+    """
+    A source of search results. ``run`` returns formatted results, or an empty
+    string when the backend has nothing for the query; it raises when the backend
+    is unavailable (including RateLimitExceeded).
+    """
+    name = "base"
+
+    def run(self, query: str) -> str:
+        raise NotImplementedError
+
+    async def arun(self, query: str) -> str:
+        # Search clients are synchronous, keep them off the event loop
+        return await asyncio.to_thread(self.run, query)
+
+    def close(self):
+        pass
+
+
+class DuckDuckGoBackend(SearchBackend):
+    """DuckDuckGo web search; the client is built on first use and reused afterwards"""
+    name = "duckduckgo"
+
+    def __init__(self, max_results: int = 3, rate_limiter=None):
+        self.max_results = max_results
+        self.rate_limiter = rate_limiter
+        self._client = None
+        self._lock = threading.Lock()
+
+    def _get_client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from langchain_community.tools import DuckDuckGoSearchRun
+                    from langchain_community.utilities import DuckDuckGoSearchAPIWrapper
+
+                    # Configure DuckDuckGo with safer settings
+                    wrapper = DuckDuckGoSearchAPIWrapper(
+                        region="us-en",
+                        safesearch="moderate",
+                        time="y",
+                        max_results=self.max_results,
+                        backend="auto"
+                    )
+                    self._client = DuckDuckGoSearchRun(api_wrapper=wrapper)
+        return self._client
+
+    def run(self, query: str) -> str:
+        # Wait for a search token, or raise RateLimitExceeded instead of waiting too long
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+        return self._get_client().run(query)
+
+    async def arun(self, query: str) -> str:
+        if self.rate_limiter:
+            await self.rate_limiter.aacquire()
+        return await asyncio.to_thread(self._get_client().run, query)
+
+
+class LocalIndexBackend(SearchBackend):
+    """
+    BM25 search over the local gadget spec and FAQ documents in ``docs_dir``.
+    The index is rebuilt at startup when any document is newer than it.
+    """
+    name = "local"
+
+    def __init__(self, docs_dir: str, index_path: str, max_results: int = 3, min_score: float = 1.0):
+        self.max_results = max_results
+        self.min_score = min_score
+        if not os.path.exists(index_path) or os.stat(index_path).st_mtime_ns < source_mtime(docs_dir):
+            count = build_index(docs_dir, index_path)
+            Logger(__name__).get_logger().info(f"Built local search index: {count} passages from {docs_dir}")
+        self.index = LocalIndex(index_path)
+
+    def run(self, query: str) -> str:
+        hits = [(doc_id, score) for doc_id, score in self.index.search(query, self.max_results) if score >= self.min_score]
+        return "\n".join(
+            f"{self.index.docs[doc_id]['title']}: {self.index.snippet(doc_id, query)}"
+            for doc_id, _ in hits
+        )
+
+    async def arun(self, query: str) -> str:
+        # Lookups are sub-millisecond reads from the mapped index
+        return self.run(query)
+
+    def close(self):
+        self.index.close()
+
+
+class FallbackSearchBackend(SearchBackend):
+    """
+    Tries backends in turn until one returns results. With ``select="latency"``
+    the order is re-ranked on every call by each backend's moving-average
+    latency, where a failure counts as ``failure_penalty`` seconds; with
+    ``select="ordered"`` the configured order is kept.
+    """
+    name = "fallback"
+
+    def __init__(self, backends: List[SearchBackend], select: str = "latency",
+                 failure_penalty: float = 5.0, alpha: float = 0.3):
+        self.backends = backends
+        self.select = select
+        self.failure_penalty = failure_penalty
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._latency: Dict[str, float] = {}
+        self._counts: Dict[str, Dict[str, int]] = {
+            backend.name: {"hits": 0, "misses": 0, "failures": 0} for backend in backends
+        }
+
+    def _order(self) -> List[SearchBackend]:
+        if self.select != "latency":
+            return list(self.backends)
+        with self._lock:
+            # Untried backends rank first so every backend gets measured
+            return sorted(self.backends, key=lambda backend: self._latency.get(backend.name, 0.0))
+
+    def _record(self, backend: SearchBackend, seconds: float, outcome: str):
+        with self._lock:
+            previous = self._latency.get(backend.name)
+            self._latency[backend.name] = seconds if previous is None else previous + self.alpha * (seconds - previous)
+            self._counts[backend.name][outcome] += 1
+
+    def _result(self, backend: SearchBackend, start: float, result: str) -> str:
+        self._record(backend, time.perf_counter() - start, "hits" if result else "misses")
+        return result
+
+    def _failed(self, backend: SearchBackend, start: float, error: Exception):
+        self._record(backend, time.perf_counter() - start + self.failure_penalty, "failures")
+        Logger(__name__).get_logger().warning(f"Search backend {backend.name} failed, trying the next one: {error}")
+
+    def run(self, query: str) -> str:
+        error = None
+        for backend in self._order():
+            start = time.perf_counter()
+            try:
+                result = self._result(backend, start, backend.run(query))
+            except Exception as e:
+                self._failed(backend, start, e)
+                error = e
+                continue
+            if result:
+                return result
+        if error:
+            raise error
+        return ""
+
+    async def arun(self, query: str) -> str:
+        error = None
+        for backend in self._order():
+            start = time.perf_counter()
+            try:
+                result = self._result(backend, start, await backend.arun(query))
+            except Exception as e:
+                self._failed(backend, start, e)
+                error = e
+                continue
+            if result:
+                return result
+        if error:
+            raise error
+        return ""
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                backend.name: {"latency": round(self._latency.get(backend.name, 0.0), 4), **self._counts[backend.name]}
+                for backend in self.backends
+            }
+
+    def close(self):
+        for backend in self.backends:
+            backend.close()
+
+
+class StubSearchBackend(SearchBackend):
+    """Offline stand-in returning canned results after a fixed latency; counts the searches it served"""
+    name = "stub"
+
+    def __init__(self, latency: float = 0.0, results: Optional[Dict[str, str]] = None):
+        self.latency = latency
+        self.results = results or {}
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def run(self, query: str) -> str:
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.calls += 1
+        return self.results.get(query, f"Top gadget results for '{query}' from the offline stub backend.")
+
+
+def create_search_backend(search_config, rate_limiter=None) -> SearchBackend:
+    """
+    Build the backend(s) named in ``search_config.backend``; a comma separated
+    list such as "local,duckduckgo" becomes a fallback chain.
+    """
+    backends = []
+    for name in (name.strip() for name in search_config.backend.split(",")):
+        if name == "duckduckgo":
+            backends.append(DuckDuckGoBackend(max_results=search_config.max_results, rate_limiter=rate_limiter))
+        elif name == "local":
+            try:
+                backends.append(LocalIndexBackend(
+                    search_config.local_docs_dir,
+                    search_config.local_index_path,
+                    max_results=search_config.max_results,
+                    min_score=search_config.local_min_score
+                ))
+            except (OSError, ValueError) as e:
+                Logger(__name__).get_logger().error(f"Local search index unavailable, skipping it: {e}")
+        elif name == "stub":
+            backends.append(StubSearchBackend(latency=search_config.stub_latency))
+        elif name:
+            raise ValueError(f"Unknown search backend: {name}")
+
+    if not backends:
+        raise ValueError(f"No usable search backend in '{search_config.backend}'")
+    if len(backends) == 1:
+        return backends[0]
+    return FallbackSearchBackend(backends, select=search_config.selection)
+
+
+class RealTimeSearch:
+    """
+    The get_real_time_search pipeline: rewrite the question into search terms
+    with the LLM, then fetch results from the search backend.
+
+    Both steps go through the SearchCache, and concurrent calls for the same
+    question or the same terms are coalesced so only one LLM call / search
+    goes out. When the backend is rate limited, a stale cached result is
+    served if there is one.
+
+    ``llm`` is a chat model, or a function returning one that is called on the
+    first search.
+    """
+
+    def __init__(self, llm, backend: SearchBackend, cache: Optional[SearchCache] = None, rate_limiter=None):
+        self._llm = llm
+        self.backend = backend
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.flight = SingleFlight()
+
+    @property
+    def llm(self):
+        if callable(self._llm) and not isinstance(self._llm, Runnable):
+            self._llm = self._llm()
+        return self._llm
+
+    def _cached(self, level: str, key: str) -> Optional[str]:
+        if not self.cache:
+            return None
+        value = getattr(self.cache, level).get(key)
+        tracer.annotate(**{f"search.{level}_cache_hit": value is not None})
+        return value
+
+    def _store(self, level: str, key: str, value: str):
+        if self.cache:
+            getattr(self.cache, level).put(key, value)
+            self.cache.mark_dirty()
+
+    def _degraded(self, key: str, error: RateLimitExceeded) -> str:
+        stale = self.cache.results.get(key, stale_ok=True) if self.cache else None
+        if stale:
+            return f"(recent) {stale}"
+        return f"Live search is busy right now, please try again in about {error.retry_after:.0f} seconds."
+
+    def _fetched(self, key: str, results: str) -> str:
+        if not results:
+            return "No results found."
+        self._store("results", key, results)
+        return results
+
+    def search_terms(self, user_query: str) -> str:
+        key = normalize_query(user_query)
+        cached = self._cached("terms", key)
+        if cached:
+            return cached
+
+        def generate():
+            terms = clean_query(self.llm.invoke(search_query_messages(user_query)).content.strip())
+            self._store("terms", key, terms)
+            return terms
+
+        return self.flight.do(f"terms:{key}", generate)
+
+    async def asearch_terms(self, user_query: str) -> str:
+        key = normalize_query(user_query)
+        cached = self._cached("terms", key)
+        if cached:
+            return cached
+
+        async def generate():
+            terms = clean_query((await self.llm.ainvoke(search_query_messages(user_query))).content.strip())
+            self._store("terms", key, terms)
+            return terms
+
+        return await self.flight.ado(f"terms:{key}", generate)
+
+    def results(self, terms: str) -> str:
+        key = normalize_query(terms)
+        cached = self._cached("results", key)
+        if cached:
+            return cached
+
+        def fetch():
+            try:
+                results = self.backend.run(terms)
+            except RateLimitExceeded as e:
+                return self._degraded(key, e)
+            return self._fetched(key, results)
+
+        return self.flight.do(f"results:{key}", fetch)
+
+    async def aresults(self, terms: str) -> str:
+        key = normalize_query(terms)
+        cached = self._cached("results", key)
+        if cached:
+            return cached
+
+        async def fetch():
+            try:
+                results = await self.backend.arun(terms)
+            except RateLimitExceeded as e:
+                return self._degraded(key, e)
+            return self._fetched(key, results)
+
+        return await self.flight.ado(f"results:{key}", fetch)
+
+    def run(self, user_query: str) -> str:
+        terms = self.search_terms(user_query)
+        return f"Search Query: {terms}\n\nResults: {self.results(terms)}"
+
+    async def arun(self, user_query: str) -> str:
+        terms = await self.asearch_terms(user_query)
+        return f"Search Query: {terms}\n\nResults: {await self.aresults(terms)}"
+
+    def stats(self) -> Dict:
+        stats = self.cache.stats() if self.cache else {}
+        stats["coalesced"] = self.flight.coalesced
+        if self.rate_limiter:
+            stats["rate_limiter"] = self.rate_limiter.stats()
+        if isinstance(self.backend, FallbackSearchBackend):
+            stats["backends"] = self.backend.stats()
+        return stats
@@ -0,0 +1,181 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire ``ttl`` seconds after being written.
+    Expired entries stay until evicted so they can still be read with ``stale_ok``.
+    Timestamps are wall-clock so persisted entries keep their age across restarts.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, stale_ok: bool = False) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (not stale_ok and time.time() - entry[1] > self.ttl):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, value: Any, created: Optional[float] = None):
+        with self._lock:
+            self._entries[key] = (value, created or time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def items(self):
+        with self._lock:
+            return [(key, value, created) for key, (value, created) in self._entries.items()]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SearchCache:
+    """
+    Two-level cache for real-time search: user query -> search terms, and
+    search terms -> results. Both levels are persisted together to one JSON
+    file, written atomically at most every ``persist_interval`` seconds by a
+    background thread, so no search pays for the write; call ``save()`` for a
+    final flush.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 1024,
+                 terms_ttl: float = 86400, results_ttl: float = 3600, persist_interval: float = 30):
+        self.path = path
+        self.persist_interval = persist_interval
+        self.terms = TTLCache(max_entries, terms_ttl)
+        self.results = TTLCache(max_entries, results_ttl)
+        self._dirty = False
+        self._last_save = time.monotonic()
+        self._save_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flushing = False
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        for level, cache in (("terms", self.terms), ("results", self.results)):
+            for key, value, created in data.get(level, []):
+                # Keep stale results around for degraded answers, LRU bounds them anyway
+                if level == "terms" and now - created > cache.ttl:
+                    continue
+                cache.put(key, value, created)
+
+    def mark_dirty(self):
+        self._dirty = True
+        if not self.path or time.monotonic() - self._last_save < self.persist_interval:
+            return
+        # Called from the search path, on the event loop for arun; the write happens elsewhere
+        with self._flush_lock:
+            if self._flushing:
+                return
+            self._flushing = True
+            self._last_save = time.monotonic()
+        threading.Thread(target=self._flush, name="search-cache-flush", daemon=True).start()
+
+    def _flush(self):
+        try:
+            self.save()
+        finally:
+            with self._flush_lock:
+                self._flushing = False
+
+    def save(self):
+        if not self.path or not self._dirty:
+            return
+        with self._save_lock:
+            self._dirty = False
+            self._last_save = time.monotonic()
+            data = {"terms": self.terms.items(), "results": self.results.items()}
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+            except OSError:
+                self._dirty = True
+
+    def stats(self) -> Dict:
+        return {
+            "terms": {"entries": len(self.terms), "hits": self.terms.hits, "misses": self.terms.misses},
+            "results": {"entries": len(self.results), "hits": self.results.hits, "misses": self.results.misses},
+        }
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key: the first caller runs, the rest wait for its result"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+        self.coalesced = 0
+
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            return future, True
+
+    def _finish(self, key: str, future: Future, result: Any = None, error: BaseException = None):
+        with self._lock:
+            self._calls.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    async def ado(self, key: str, afn: Callable[[], Any]) -> Any:
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+        try:
+            result = await afn()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
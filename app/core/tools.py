@@ -1,30 +1,34 @@
 import json
 import os
-from pathlib import Path
-from langchain_core.tools import tool
-from langchain_core.messages import SystemMessage, HumanMessage
+from langchain_core.tools import tool, StructuredTool
 from .llm import LLMinitialize
-import time
-import random
+from .data_store import DataStore
+from .rate_limiter import create_rate_limiter
+from .search import RealTimeSearch, create_search_backend
+from .search_cache import SearchCache
+from ..services.tracing import trace_tools
+from ..utils.config import get_local_data_config, get_search_config, get_search_rate_limit_config
+import atexit
 
-llm = LLMinitialize().get_groq_llm()
+rate_limiter = create_rate_limiter(get_search_rate_limit_config(), key="duckduckgo")
 
-class SimpleRateLimiter:
-    def __init__(self):
-        self.last_request_time = 0
-        self.min_delay = 3.0
-    
-    def wait_if_needed(self):
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        
-        if time_since_last < self.min_delay:
-            sleep_time = self.min_delay - time_since_last + random.uniform(0.5, 1.5)
-            time.sleep(sleep_time)
-        
-        self.last_request_time = time.time()
+search_config = get_search_config()
+search_cache = SearchCache(
+    path=search_config.cache_path,
+    max_entries=search_config.cache_max_entries,
+    terms_ttl=search_config.terms_ttl,
+    results_ttl=search_config.results_ttl
+) if search_config.cache_enabled else None
+if search_cache:
+    atexit.register(search_cache.save)
 
-rate_limiter = SimpleRateLimiter()
+# The LLM client is created on the first search, not at import
+real_time_search = RealTimeSearch(
+    lambda: LLMinitialize().get_llm("search_rewrite"),
+    create_search_backend(search_config, rate_limiter),
+    search_cache,
+    rate_limiter=rate_limiter
+)
 
 
 def get_data_dir():
@@ -37,77 +41,59 @@ def get_data_dir():
     except:
         return "."
 
+local_data = get_local_data_config()
+data_store = DataStore(get_data_dir(), check_interval=local_data.reload_interval)
+data_store.preload([
+    local_data.trending_products,
+    local_data.order_status,
+    local_data.about_info,
+    local_data.last_purchase,
+    local_data.personal_info
+])
+
 def read_file(filename, default="{}"):
-    data_dir = get_data_dir()
-    filepath = os.path.join(data_dir, filename)
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return f.read()
-    except:
-        try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                return f.read()
-        except:
-            return default
+    return data_store.get_text(filename, default)
 
 @tool
 def about_cashify() -> str:
     """Get Cashify company information"""
     try:
-        content = read_file("about.txt", None)
+        content = data_store.get_text(local_data.about_info)
         if content and not content.startswith("Error"):
             return content
-        json_content = read_file("company_info.json", "{}")
-        if json_content.startswith("{"):
-            return json.dumps(json.loads(json_content), indent=2)
+        company_info = data_store.get_json("company_info.json", {})
+        if isinstance(company_info, dict):
+            return json.dumps(company_info, indent=2)
         return "Cashify - India's Leading Re-Commerce Platform"
     except:
         return "Cashify - India's Leading Re-Commerce Platform"
 
-def clean_query(text):
-    if '<think>' in text:
-        text = text.split('</think>')[-1] if '</think>' in text else text.split('<think>')[0]
-    lines = [line.strip() for line in text.split('\n') if line.strip()]
-    return lines[-1] if lines else text.strip()
+def _real_time_search(user_query: str) -> str:
+    """Real-time search engine for any query"""
+    try:
+        return real_time_search.run(user_query)
+    except Exception as e:
+        return f"Search error: {str(e)}"
 
-@tool
-def get_real_time_search(user_query: str) -> str:
+async def _areal_time_search(user_query: str) -> str:
     """Real-time search engine for any query"""
     try:
-        from langchain_community.tools import DuckDuckGoSearchRun
-        from langchain_community.utilities import DuckDuckGoSearchAPIWrapper
-        
-        query_generator_prompt = SystemMessage(content="Convert to search terms. Return ONLY 2-4 words.")
-        query_messages = [query_generator_prompt, HumanMessage(content=f"User question: {user_query}")]
-        query_response = llm.invoke(query_messages)
-        search_query = clean_query(query_response.content.strip())
-        
-        # Apply rate limiting
-        rate_limiter.wait_if_needed()
-        
-        # Configure DuckDuckGo with safer settings
-        wrapper = DuckDuckGoSearchAPIWrapper(
-            region="us-en",
-            safesearch="moderate",
-            time="y",
-            max_results=3,
-            backend="auto"
-        )
-        
-        search = DuckDuckGoSearchRun(api_wrapper=wrapper)
-        search_results = search.run(search_query)
-        
-        return f"Search Query: {search_query}\n\nResults: {search_results}"
-        
+        return await real_time_search.arun(user_query)
     except Exception as e:
         return f"Search error: {str(e)}"
 
+get_real_time_search = StructuredTool.from_function(
+    func=_real_time_search,
+    coroutine=_areal_time_search,
+    name="get_real_time_search",
+    description="Real-time search engine for any query"
+)
+
 @tool
 def get_trending_product() -> str:
     """Get trending products on Cashify"""
     try:
-        content = read_file("trending_products.json", '{"mobiles": [], "laptops": []}')
-        trending_data = json.loads(content)
+        trending_data = data_store.get_json(local_data.trending_products, {"mobiles": [], "laptops": []})
         result = "Available Products:\n\n📱 MOBILES:\n"
         for mobile in trending_data.get('mobiles', []):
             status = "✅ Available" if mobile.get('available', True) else "❌ Out of Stock"
@@ -124,8 +110,7 @@ def get_trending_product() -> str:
 def get_last_purchases() -> str:
     """Get purchase history and last purchases of user"""
     try:
-        content = read_file("last_purchase.json", '{"last_purchases": []}')
-        purchases_data = json.loads(content)
+        purchases_data = data_store.get_json(local_data.last_purchase, {"last_purchases": []})
         purchases = purchases_data.get('last_purchases', [])
         result = "Recent Purchases:\n"
         for p in purchases:
@@ -138,8 +123,7 @@ def get_last_purchases() -> str:
 def get_order_tracking() -> str:
     """Get order status and tracking"""
     try:
-        content = read_file("order_tracking.json", '{}')
-        tracking_data = json.loads(content)
+        tracking_data = data_store.get_json(local_data.order_status, {})
         product = tracking_data.get('product', {})
         agent = tracking_data.get('delivery_agent', {})
         result = f"Order {tracking_data.get('order_id', 'Unknown')}: "
@@ -157,8 +141,7 @@ def get_order_tracking() -> str:
 def get_personal_profile() -> str:
     """Get user profile information like Cashify account details or available coupons and coins"""
     try:
-        content = read_file("points.json", '{"name": "Guest", "email": "guest@example.com", "coins_balance": 0, "gift_cards": []}')
-        profile_data = json.loads(content)
+        profile_data = data_store.get_json(local_data.personal_info, {"name": "Guest", "email": "guest@example.com", "coins_balance": 0, "gift_cards": []})
         gift_cards = profile_data.get('gift_cards', [])
         cards_info = ""
         for card in gift_cards:
@@ -170,11 +153,13 @@ def get_personal_profile() -> str:
     except Exception as e:
         return f"Error reading profile: {str(e)}"
 
-AVAILABLE_TOOLS = [
+# File-backed tools only define a sync body; under ainvoke LangChain runs them
+# in the default executor so they never block the event loop.
+AVAILABLE_TOOLS = trace_tools([
     about_cashify,
     get_real_time_search, 
     get_trending_product,
     get_last_purchases,
     get_order_tracking,
     get_personal_profile
-]
\ No newline at end of file
+])
\ No newline at end of file
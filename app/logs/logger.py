@@ -1,45 +1,237 @@
+import atexit
+import copy
+import json
 import logging
+import logging.handlers
 import os
+import queue
 import sys
-from datetime import datetime
+import threading
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
 
+from ..utils.config import get_logging_config
 
-class Logger:
+
+ROOT_LOGGER = "AppLogger"
+
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+# Attributes every LogRecord has; anything else on a record was passed through ``extra``
+_RECORD_FIELDS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_context_providers: List[Callable[[], Dict]] = []
+_setup_lock = threading.Lock()
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def add_context_provider(provider: Callable[[], Dict]):
+    """Register a function whose fields are added to every record where it is logged, e.g. the current trace id"""
+    _context_providers.append(provider)
+
+
+class ContextFilter(logging.Filter):
+    """Copies the registered context fields onto the record while still on the logging thread"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for provider in _context_providers:
+            for key, value in provider().items():
+                if value is not None:
+                    setattr(record, key, value)
+        return True
+
+
+class DebugSampler(logging.Filter):
     """
-    A reusable logger class that provides logging with console and
-    optional file output.
-    Removes singleton enforcement to allow more flexibility.
+    Keeps the first and then every ``every``-th DEBUG record of each call site
+    (file and line), so a debug line inside a hot loop cannot flood the log.
+    Other levels always pass. Kept records carry ``sampled=every``.
     """
 
-    def __init__(self, name: str = "AppLogger", level: str = "DEBUG"):
-        self._logger = logging.getLogger(name)
+    def __init__(self, every: int):
+        super().__init__()
+        self.every = every
+        self._seen: Dict[tuple, int] = {}
+        self._lock = threading.Lock()
 
-        if not self._logger.handlers:
-            self._logger.setLevel(getattr(
-                logging, level.upper(), logging.DEBUG
-                )
-            )
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.every <= 1:
+            return True
+        # Several handlers may share the sampler; decide once per record
+        keep = getattr(record, "_sample_keep", None)
+        if keep is None:
+            key = (record.pathname, record.lineno)
+            with self._lock:
+                seen = self._seen.get(key, 0)
+                self._seen[key] = seen + 1
+            keep = seen % self.every == 0
+            record._sample_keep = keep
+            if keep:
+                record.sampled = self.every
+        return keep
 
-            formatter = logging.Formatter(
-                "%(asctime)s - %(levelname)s - %(message)s",
-                datefmt="%Y-%m-%d %H:%M:%S"
-            )
 
-            # Console Handler
-            console_handler = logging.StreamHandler(sys.stdout)
-            console_handler.setFormatter(formatter)
-            self._logger.addHandler(console_handler)
-
-            # Optional File Handler
-            log_dir = "logs"
-            os.makedirs(log_dir, exist_ok=True)
-            log_file = os.path.join(
-                log_dir,
-                f"{datetime.now().strftime('%Y-%m-%d')}.log"
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, with any ``extra`` fields as top-level keys"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "func": record.funcName,
+            "line": record.lineno,
+            "thread": record.threadName,
+        }
+        entry.update(
+            (key, value) for key, value in vars(record).items()
+            if key not in _RECORD_FIELDS and not key.startswith("_")
+        )
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to the listener thread, which formats and writes them. When
+    the queue is full the record is dropped (and counted) rather than blocking
+    the request.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The queue never leaves the process, so only the message and traceback need freezing here
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _formatter(kind: str) -> logging.Formatter:
+    if kind == "json":
+        return JsonFormatter()
+    return logging.Formatter(TEXT_FORMAT, datefmt="%Y-%m-%d %H:%M:%S")
+
+
+def _file_handler(config) -> logging.Handler:
+    os.makedirs(config.log_dir, exist_ok=True)
+    path = os.path.join(config.log_dir, config.file_name)
+    if config.rotation == "time":
+        return logging.handlers.TimedRotatingFileHandler(
+            path, when=config.rotate_when, backupCount=config.backup_count, encoding="utf-8"
+        )
+    return logging.handlers.RotatingFileHandler(
+        path, maxBytes=config.max_bytes, backupCount=config.backup_count, encoding="utf-8"
+    )
+
+
+def _stop_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _restart_listener_after_fork():
+    """
+    A forked worker inherits the queue but not the listener thread that drains
+    it, so it gets its own queue and listener over the same handlers.
+    """
+    global _listener
+    if _listener is None:
+        return
+    handlers = _listener.handlers
+    _listener = logging.handlers.QueueListener(
+        queue.Queue(_listener.queue.maxsize), *handlers, respect_handler_level=True
+    )
+    for handler in logging.getLogger(ROOT_LOGGER).handlers:
+        if isinstance(handler, NonBlockingQueueHandler):
+            handler.queue = _listener.queue
+    _listener.start()
+
+
+def configure_logging(config=None) -> logging.Logger:
+    """
+    Install the console and rotating file handlers on the app's root logger,
+    once per process. In queue mode the request thread only enqueues the
+    record; a QueueListener thread formats it and does the I/O, and is
+    drained at exit.
+    """
+    global _listener
+    root = logging.getLogger(ROOT_LOGGER)
+    if root.handlers:
+        return root
+
+    with _setup_lock:
+        if root.handlers:
+            return root
+        config = config or get_logging_config()
+        root.setLevel(getattr(logging, config.level, logging.DEBUG))
+        for module, level in config.module_levels.items():
+            # Applies to third-party loggers ("httpx") and to app modules ("app.services.workflow")
+            logging.getLogger(module).setLevel(level)
+            logging.getLogger(f"{ROOT_LOGGER}.{module}").setLevel(level)
+
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(_formatter(config.console_format))
+        file_handler = _file_handler(config)
+        file_handler.setFormatter(_formatter(config.file_format))
+        handlers = [console_handler, file_handler]
+
+        if config.queue:
+            _listener = logging.handlers.QueueListener(
+                queue.Queue(config.queue_size), *handlers, respect_handler_level=True
             )
-            file_handler = logging.FileHandler(log_file)
-            file_handler.setFormatter(formatter)
-            self._logger.addHandler(file_handler)
+            _listener.start()
+            atexit.register(_stop_listener)
+            os.register_at_fork(after_in_child=_restart_listener_after_fork)
+            handlers = [NonBlockingQueueHandler(_listener.queue)]
+
+        # Filters run where the record is logged, before any formatting
+        sampler = DebugSampler(config.debug_sample_every)
+        for handler in handlers:
+            handler.addFilter(sampler)
+            handler.addFilter(ContextFilter())
+            root.addHandler(handler)
+    return root
+
+
+class Logger:
+    """
+    A reusable logger class that provides logging with console and
+    rotating file output.
+
+    ``Logger(__name__)`` returns a per-module child of the app logger, whose
+    level can be set with LOG_MODULE_LEVELS; ``Logger()`` is the app logger
+    itself. Prefer lazy %-style arguments on hot paths
+    (``logger.debug("tokens %d", n)``) so records that are filtered out are
+    never formatted.
+    """
+
+    def __init__(self, name: str = ROOT_LOGGER, level: Optional[str] = None):
+        root = configure_logging()
+        self._logger = root if name == ROOT_LOGGER else logging.getLogger(f"{ROOT_LOGGER}.{name}")
+        if level:
+            self.set_level(level)
 
     def debug(self, message: str, *args, **kwargs):
         self._logger.debug(message, *args, **kwargs)
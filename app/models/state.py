@@ -1,6 +1,7 @@
-from typing import Annotated, Sequence, TypedDict, List, Union, Optional
+from typing import Annotated, Any, Dict, Literal, Sequence, TypedDict, List, Union, Optional
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, ToolMessage
 from dataclasses import dataclass
+from pydantic import BaseModel, Field
 from langgraph.graph import add_messages
 
 
@@ -12,6 +13,12 @@ class AgentState(TypedDict):
     iteration_count: int
     global_iteration: int
     answer_satisfied: bool
+    route: Optional[str]
+    intent: Optional[str]
+    direct_eligible: Optional[bool]
+    # Set when an LLM call failed and the turn fell back to a canned reply
+    degraded: Optional[bool]
+    summary: Optional[str]
 
 class ChatRequest(TypedDict):
     """Chat request model"""
@@ -27,4 +34,19 @@ class ChatResponse(TypedDict):
 @dataclass
 class QueryResponses:
     final_response: str
-    messages: List[Union[HumanMessage, AIMessage, ToolMessage, str]]
\ No newline at end of file
+    messages: List[Union[HumanMessage, AIMessage, ToolMessage, str]]
+    # A fallback produced by an error, not a real answer; never cached
+    degraded: bool = False
+
+
+class PlannedToolCall(BaseModel):
+    """A tool the single-pass model wants to call"""
+    name: str = Field(description="Name of one of the available tools")
+    args: Dict[str, Any] = Field(default_factory=dict, description="Arguments for the tool")
+
+
+class SinglePassOutput(BaseModel):
+    """Topic decision, tool calls and answer for one user turn, produced in a single call"""
+    decision: Literal["ACCEPT", "REJECT"] = Field(description="ACCEPT for Cashify/gadget queries, REJECT otherwise")
+    tool_calls: List[PlannedToolCall] = Field(default_factory=list, description="Tools needed to answer, empty if none")
+    answer: str = Field(default="", description="Final answer when no tool is needed")
@@ -0,0 +1,166 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Optional
+
+from ..core.metrics_primitives import LatencyHistogram
+from ..logs.logger import Logger
+
+
+SHED_REASONS = ("key_queue_full", "queue_full", "deadline", "timeout")
+
+
+class AdmissionRejected(Exception):
+    """
+    A request turned away before it started: 429 when the caller is over its
+    own share of the queue, 503 when the server as a whole is.
+    """
+
+    def __init__(self, status_code: int, reason: str, retry_after: float):
+        super().__init__(f"Request rejected ({reason}), retry after {retry_after:.1f}s")
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Retry-After": str(max(1, math.ceil(self.retry_after)))}
+
+
+class AdmissionTicket:
+    """A held in-flight slot; ``release()`` may be called more than once"""
+
+    def __init__(self, controller: "AdmissionController", waited: float):
+        self.controller = controller
+        self.waited = waited
+        self._started = time.perf_counter()
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self.controller._release(time.perf_counter() - self._started)
+
+
+class AdmissionController:
+    """
+    Bounds how many chat requests run at once in this worker.
+
+    Up to ``max_in_flight`` requests run; the rest wait in one FIFO queue per
+    client key, and a freed slot goes to the keys in turn, so a client
+    sending a burst waits behind its own requests rather than everyone's.
+    A request is shed at once, instead of timing out later, when its key's
+    queue or the whole queue is full, or when its estimated wait already
+    exceeds its deadline. The estimate is its place in the round-robin order
+    times a moving average of how long admitted requests take.
+
+    All state is touched from the event loop only, so no lock is needed.
+    """
+
+    def __init__(self, max_in_flight: int = 16, max_queue: int = 64, max_queue_per_key: int = 16,
+                 queue_timeout: float = 10.0, service_time: float = 3.0, smoothing: float = 0.2):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.max_queue_per_key = max_queue_per_key
+        self.queue_timeout = queue_timeout
+        self.service_time = service_time
+        self.smoothing = smoothing
+        self.logger = Logger(__name__).get_logger()
+        self.in_flight = 0
+        self._queues: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+        self._queued = 0
+        self.admitted = 0
+        self.shed: Dict[str, int] = {}
+        self.wait_histogram = LatencyHistogram()
+
+    def estimated_wait(self, key: str) -> float:
+        """Seconds a new request from ``key`` would wait for a slot"""
+        own = len(self._queues.get(key, ()))
+        # Round robin: every other key gets at most one turn per turn of ours
+        ahead = own + sum(min(len(queue), own + 1) for other, queue in self._queues.items() if other != key)
+        return (ahead + 1) * self.service_time / self.max_in_flight
+
+    def _reject(self, status_code: int, reason: str, key: str) -> AdmissionRejected:
+        self.shed[reason] = self.shed.get(reason, 0) + 1
+        retry_after = self.estimated_wait(key)
+        self.logger.info("Shed request (%s): %d in flight, %d queued, retry after %.1fs",
+                         reason, self.in_flight, self._queued, retry_after)
+        return AdmissionRejected(status_code, reason, retry_after)
+
+    async def acquire(self, key: str, timeout: Optional[float] = None) -> AdmissionTicket:
+        """
+        Wait for an in-flight slot for a request from ``key``. ``timeout`` is
+        the caller's own deadline in seconds, capped by ``queue_timeout``.
+        Raises AdmissionRejected when the request is shed.
+        """
+        if self.in_flight < self.max_in_flight and not self._queued:
+            self.in_flight += 1
+            return self._admit(0.0)
+
+        budget = self.queue_timeout if timeout is None else min(timeout, self.queue_timeout)
+        if len(self._queues.get(key, ())) >= self.max_queue_per_key:
+            raise self._reject(429, "key_queue_full", key)
+        if self._queued >= self.max_queue:
+            raise self._reject(503, "queue_full", key)
+        if self.estimated_wait(key) > budget:
+            raise self._reject(503, "deadline", key)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(key, deque()).append(waiter)
+        self._queued += 1
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, budget)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the wait ended; pass it on
+                self._release(None)
+            else:
+                self._discard(key, waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            raise self._reject(503, "timeout", key) from None
+        return self._admit(time.perf_counter() - started)
+
+    def _admit(self, waited: float) -> AdmissionTicket:
+        self.admitted += 1
+        self.wait_histogram.record(waited)
+        return AdmissionTicket(self, waited)
+
+    def _discard(self, key: str, waiter: asyncio.Future):
+        queue = self._queues.get(key)
+        if queue and waiter in queue:
+            queue.remove(waiter)
+            self._queued -= 1
+            if not queue:
+                del self._queues[key]
+
+    def _release(self, duration: Optional[float]):
+        if duration is not None:
+            self.service_time += self.smoothing * (duration - self.service_time)
+        # The slot goes straight to the next waiter, round robin over keys
+        while self._queues:
+            key, queue = next(iter(self._queues.items()))
+            waiter = queue.popleft()
+            self._queued -= 1
+            if queue:
+                self._queues.move_to_end(key)
+            else:
+                del self._queues[key]
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def snapshot(self) -> Dict:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "queued": self._queued,
+            "queued_keys": len(self._queues),
+            "admitted": self.admitted,
+            "shed": {reason: self.shed.get(reason, 0) for reason in SHED_REASONS},
+            "service_time": round(self.service_time, 4),
+            "wait": self.wait_histogram.snapshot(),
+        }
@@ -0,0 +1,223 @@
+import os
+import re
+import threading
+import time
+import unicodedata
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from app.models.state import QueryResponses
+
+
+# Devanagari characters that are routinely typed interchangeably
+DEVANAGARI_FOLDS = {
+    "\u093c": "",        # nukta: फ़ -> फ
+    "\u0901": "\u0902",  # chandrabindu -> anusvara
+    "\u200c": "",        # zero width non-joiner
+    "\u200d": "",        # zero width joiner
+}
+DEVANAGARI_DIGITS = {0x0966 + i: str(i) for i in range(10)}
+PUNCTUATION = re.compile(r"[^\w\sऀ-ॿ]|[।॥]")
+
+MERSENNE_PRIME = (1 << 61) - 1
+
+
+def normalize_query(query: str) -> str:
+    """Fold case, whitespace, punctuation and Devanagari spelling variants"""
+    text = unicodedata.normalize("NFD", query or "")
+    for source, target in DEVANAGARI_FOLDS.items():
+        text = text.replace(source, target)
+    text = unicodedata.normalize("NFC", text).translate(DEVANAGARI_DIGITS).casefold()
+    text = PUNCTUATION.sub(" ", text)
+    return " ".join(text.split())
+
+
+def data_version(data_dir: str) -> Tuple:
+    """Fingerprint of the tool data files; changes whenever any of them is rewritten"""
+    try:
+        return tuple(sorted(
+            (entry.name, entry.stat().st_mtime_ns, entry.stat().st_size)
+            for entry in os.scandir(data_dir)
+            if entry.is_file() and entry.name.endswith((".json", ".txt")) and not entry.name.startswith("chat_history")
+        ))
+    except OSError:
+        return ()
+
+
+class MinHashIndex:
+    """MinHash signatures over character shingles with LSH banding for near-duplicate lookup"""
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, shingle_size: int = 3):
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        # Fixed coefficients keep signatures stable across processes
+        self._coefficients = [
+            (zlib.crc32(f"a{i}".encode()) | 1, zlib.crc32(f"b{i}".encode()))
+            for i in range(num_perm)
+        ]
+        self._signatures: Dict[str, List[int]] = {}
+        self._buckets: Dict[Tuple, Set[str]] = {}
+
+    def _shingles(self, text: str) -> Set[int]:
+        padded = f" {text} "
+        size = min(self.shingle_size, len(padded))
+        return {zlib.crc32(padded[i:i + size].encode()) for i in range(len(padded) - size + 1)}
+
+    def signature(self, text: str) -> List[int]:
+        shingles = self._shingles(text)
+        return [
+            min((a * shingle + b) % MERSENNE_PRIME for shingle in shingles)
+            for a, b in self._coefficients
+        ]
+
+    def _band_keys(self, signature: List[int]):
+        for band in range(self.bands):
+            yield (band, tuple(signature[band * self.rows:(band + 1) * self.rows]))
+
+    def add(self, key: str):
+        signature = self.signature(key)
+        self._signatures[key] = signature
+        for band_key in self._band_keys(signature):
+            self._buckets.setdefault(band_key, set()).add(key)
+
+    def remove(self, key: str):
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        for band_key in self._band_keys(signature):
+            bucket = self._buckets.get(band_key)
+            if bucket:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band_key]
+
+    def query(self, text: str, threshold: float) -> Optional[str]:
+        signature = self.signature(text)
+        candidates = set()
+        for band_key in self._band_keys(signature):
+            candidates.update(self._buckets.get(band_key, ()))
+
+        best_key, best_score = None, threshold
+        for key in candidates:
+            other = self._signatures[key]
+            score = sum(1 for a, b in zip(signature, other) if a == b) / self.num_perm
+            if score >= best_score:
+                best_key, best_score = key, score
+        return best_key
+
+    def clear(self):
+        self._signatures.clear()
+        self._buckets.clear()
+
+
+@dataclass
+class CacheEntry:
+    response: QueryResponses
+    created_at: float
+
+
+class ResponseCache:
+    """
+    LRU + TTL cache of final chatbot responses keyed on the normalized query.
+    Every entry belongs to the data version it was built from; when any tool
+    data file changes the whole cache is dropped.
+    """
+
+    def __init__(self, data_dir: str, max_entries: int = 512, ttl_seconds: float = 3600,
+                 near_duplicate: bool = False, similarity_threshold: float = 0.85,
+                 version_source: Optional[Callable[[], Tuple]] = None):
+        self.data_dir = data_dir
+        self.version_source = version_source or (lambda: data_version(data_dir))
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.near_duplicate_index = MinHashIndex() if near_duplicate else None
+
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._version = self.version_source()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+    def _check_version(self):
+        version = self.version_source()
+        if version != self._version:
+            self._entries.clear()
+            if self.near_duplicate_index:
+                self.near_duplicate_index.clear()
+            self._version = version
+
+    def _evict(self, key: str):
+        self._entries.pop(key, None)
+        if self.near_duplicate_index:
+            self.near_duplicate_index.remove(key)
+
+    def _lookup(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry.created_at > self.ttl_seconds:
+            self._evict(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def get(self, query: str) -> Optional[QueryResponses]:
+        key = normalize_query(query)
+        if not key:
+            return None
+
+        with self._lock:
+            self._check_version()
+
+            entry = self._lookup(key)
+            if entry:
+                self.hits += 1
+                return entry.response
+
+            if self.near_duplicate_index:
+                similar = self.near_duplicate_index.query(key, self.similarity_threshold)
+                entry = self._lookup(similar) if similar else None
+                if entry:
+                    self.near_hits += 1
+                    return entry.response
+
+            self.misses += 1
+            return None
+
+    def put(self, query: str, response: QueryResponses):
+        key = normalize_query(query)
+        # Fallbacks from a failed LLM call would otherwise be served for the whole TTL
+        if not key or getattr(response, "degraded", False) or not getattr(response, "final_response", ""):
+            return
+
+        with self._lock:
+            self._check_version()
+            self._evict(key)
+            self._entries[key] = CacheEntry(response=response, created_at=time.monotonic())
+            if self.near_duplicate_index:
+                self.near_duplicate_index.add(key)
+
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._evict(oldest)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self.near_duplicate_index:
+                self.near_duplicate_index.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "near_hits": self.near_hits,
+                "misses": self.misses,
+            }
@@ -1,80 +1,236 @@
-from app.core.llm import LLMinitialize
-from app.services.workflow import WorkflowOrchestrator
+from app.core.llm import LLMinitialize, ROLES, llm_registry
 from app.logs.logger import Logger
-from app.core.tools import AVAILABLE_TOOLS
+from app.core.tools import AVAILABLE_TOOLS, data_store
+from app.services.admission import AdmissionController
+from app.services.cache import ResponseCache
+from app.services.checkpoint import create_checkpointer
+from app.services.memory import SessionMemory, SQLiteSessionBackend
+from app.services.tracing import tracer
+from app.utils.config import (
+    get_admission_config, get_cache_config, get_checkpoint_config, get_history_config, get_session_config
+)
 from app.models.state import QueryResponses
 from langchain_core.messages import ToolMessage, HumanMessage
+import asyncio
+import atexit
+import threading
+import time
 import uuid
 import os
 import json
+from collections import deque
 from datetime import datetime
-
-import json
-import os
-from datetime import datetime
+from functools import lru_cache
+from typing import AsyncIterator, Dict, Optional
 
 class ChatHistoryManager:
-    def __init__(self, history_file="data/chat_history.txt"):
-        self.history_file = history_file
-        self.max_history = 5
+    """
+    Chat history kept as an append-only JSONL log plus an in-memory ring buffer.
+
+    Every query appends one line; reads are served from the ring buffer without
+    touching disk. fsync is batched (every ``fsync_every`` writes or
+    ``fsync_interval`` seconds, whichever comes first) and the log is compacted
+    down to the ring buffer once it holds ``compact_threshold`` records.
+    A legacy JSON-array history file is migrated in place on first load.
+    """
+
+    def __init__(self, history_file=None, max_history=None, compact_threshold=None,
+                 fsync_every=None, fsync_interval=None):
+        config = get_history_config()
+        self.history_file = history_file or config.history_file
+        self.max_history = max_history or config.max_history
+        self.compact_threshold = compact_threshold or config.compact_threshold
+        self.fsync_every = config.fsync_every if fsync_every is None else fsync_every
+        self.fsync_interval = config.fsync_interval if fsync_interval is None else fsync_interval
         
-    def save_query(self, user_message: str, bot_response: str):
-        history = []
-        if os.path.exists(self.history_file):
+        self._recent = deque(maxlen=self.max_history)
+        self._lock = threading.Lock()
+        self._handle = None
+        self._records_in_log = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._load()
+        atexit.register(self.close)
+
+    def _load(self):
+        if not os.path.exists(self.history_file):
+            return
+        
+        try:
+            with open(self.history_file, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except OSError:
+            return
+        
+        if content.lstrip().startswith('['):
+            try:
+                entries = json.loads(content)
+            except ValueError:
+                entries = []
+            self._recent.extend(entries)
+            self._compact()
+            return
+        
+        torn = bool(content) and not content.endswith("\n")
+        for line in content.splitlines():
+            if not line.strip():
+                continue
             try:
-                with open(self.history_file, 'r', encoding='utf-8') as f:
-                    history = json.load(f)
-            except:
-                history = []
+                self._recent.append(json.loads(line))
+                self._records_in_log += 1
+            except ValueError:
+                torn = True
+        
+        # A torn write from a crash would corrupt the next append; rewrite the log first
+        if torn:
+            self._compact()
+
+    def _open(self):
+        if self._handle is None:
+            directory = os.path.dirname(self.history_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._handle = open(self.history_file, 'a', encoding='utf-8')
+        return self._handle
+
+    def _sync(self, force=False):
+        if self._handle is None or (not self._unsynced and not force):
+            return
+        self._handle.flush()
+        due = self.fsync_every and (
+            self._unsynced >= self.fsync_every
+            or time.monotonic() - self._last_sync >= self.fsync_interval
+        )
+        if force or due:
+            os.fsync(self._handle.fileno())
+            self._unsynced = 0
+            self._last_sync = time.monotonic()
+
+    def _compact(self):
+        """Rewrite the log so it only holds the ring buffer contents"""
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
         
+        directory = os.path.dirname(self.history_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_file = f"{self.history_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            for entry in self._recent:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.history_file)
+        
+        self._records_in_log = len(self._recent)
+        self._unsynced = 0
+        
+    def save_query(self, user_message: str, bot_response: str):
         new_entry = {
             "timestamp": datetime.now().isoformat(),
             "user": user_message,
             "bot": bot_response
         }
         
-        history.append(new_entry)
-        
-        if len(history) > self.max_history:
-            history = history[-self.max_history:]
-        
-        os.makedirs(os.path.dirname(self.history_file), exist_ok=True)
-        with open(self.history_file, 'w', encoding='utf-8') as f:
-            json.dump(history, f, indent=2, ensure_ascii=False)
+        with self._lock:
+            self._recent.append(new_entry)
+            self._open().write(json.dumps(new_entry, ensure_ascii=False) + "\n")
+            self._records_in_log += 1
+            self._unsynced += 1
+            
+            if self._records_in_log >= self.compact_threshold:
+                self._compact()
+            else:
+                self._sync()
+    
+    def get_history(self) -> list:
+        with self._lock:
+            return list(self._recent)
     
     def get_context_text(self) -> str:
-        if not os.path.exists(self.history_file):
-            return ""
+        with self._lock:
+            queries = [entry["user"] for entry in list(self._recent)[-3:]]
         
-        try:
-            with open(self.history_file, 'r', encoding='utf-8') as f:
-                history = json.load(f)
-            
-            if history:
-                queries = [entry["user"] for entry in history[-3:]]
-                return f"\nRecent conversation context: {' | '.join(queries)}"
-            return ""
-        except:
-            return ""
+        if queries:
+            return f"\nRecent conversation context: {' | '.join(queries)}"
+        return ""
     
     def clear_history(self):
-        if os.path.exists(self.history_file):
-            os.remove(self.history_file)
+        with self._lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+            self._recent.clear()
+            self._records_in_log = 0
+            self._unsynced = 0
+            if os.path.exists(self.history_file):
+                os.remove(self.history_file)
+
+    def close(self):
+        with self._lock:
+            if self._handle is not None:
+                self._sync(force=True)
+                self._handle.close()
+                self._handle = None
+
+
+@lru_cache(maxsize=None)
+def get_workflow():
+    """The process-wide orchestrator: the graph is compiled once and shared by every service instance"""
+    # langgraph is imported with the first service, not with this module
+    from app.services.workflow import WorkflowOrchestrator
+    
+    llm_init = LLMinitialize()
+    answer_llm = llm_init.get_llm("answer")
+    return WorkflowOrchestrator(
+        answer_llm, llm_init.get_llm("tool_selection").bind_tools(AVAILABLE_TOOLS), AVAILABLE_TOOLS,
+        checkpointer=create_checkpointer(get_checkpoint_config()),
+        role_llms={"judge": llm_init.get_llm("judge"), "answer": answer_llm}
+    )
+
+
+def preload():
+    """
+    Build everything requests share: the compiled graphs, every role's LLM
+    client and the local data. The production server calls this in the
+    gunicorn master before forking, so workers share the memory copy-on-write;
+    elsewhere it is just an early start. No request is sent, as a pooled
+    connection must not cross fork().
+    """
+    workflow = get_workflow()
+    workflow.stateless_workflow
+    llm_init = LLMinitialize()
+    for role in ROLES:
+        llm_init.get_llm(role)
+    # The local data files were preloaded when the tools module was imported
+    return workflow
+
+
+def readiness() -> Dict[str, bool]:
+    """Which shared components are warm; a worker is ready when all are"""
+    return {
+        "workflow": get_workflow.cache_info().currsize > 0,
+        "llm_clients": set(ROLES) <= set(llm_registry.built()),
+        "data_store": data_store.is_warm(),
+    }
 
 
 class CashifyChatbotService:
     def __init__(self):
-        self.logger = Logger().get_logger()
+        self.logger = Logger(__name__).get_logger()
         self.history_manager = ChatHistoryManager()  
+        self.session_memory = self._create_session_memory()
+        self.response_cache = self._create_response_cache()
+        self.admission = self._create_admission_controller()
         self._initialize_components()
     
     def _initialize_components(self):
         try:
-            llm_init = LLMinitialize()
-            self.llm = llm_init.get_groq_llm()
-            self.tools = AVAILABLE_TOOLS
-            self.llm_with_tools = self.llm.bind_tools(self.tools)
-            self.workflow = WorkflowOrchestrator(self.llm, self.llm_with_tools, self.tools)
+            self.workflow = get_workflow()
+            self.llm = self.workflow.llm
+            self.tools = self.workflow.tools
+            self.llm_with_tools = self.workflow.llm_with_tools
             
             tool_names = [tool.name for tool in self.tools]
             self.logger.info(f"Chatbot initialized with {len(self.tools)} tools: {tool_names}")
@@ -82,48 +238,197 @@ class CashifyChatbotService:
             self.logger.error(f"Failed to initialize: {str(e)}")
             raise
     
-    def process_query(self, user_input: str) -> QueryResponses:
-        try:
-            context_text = self.history_manager.get_context_text()
+    def close(self):
+        """Flush the history log and close the session store"""
+        self.history_manager.close()
+        self.session_memory.close()
+
+    def _create_session_memory(self) -> SessionMemory:
+        session_config = get_session_config()
+        backend = None
+        if session_config.backend == "sqlite":
+            backend = SQLiteSessionBackend(session_config.sqlite_path)
+        return SessionMemory(
+            backend=backend,
+            max_sessions=session_config.max_sessions,
+            idle_ttl=session_config.idle_ttl,
+            max_history=session_config.max_history
+        )
+
+    def _history(self, session_id: Optional[str] = None):
+        """Session-scoped history when a session id is given, the shared log otherwise"""
+        if session_id:
+            return self.session_memory.session(session_id)
+        return self.history_manager
+
+    def _context_text(self, history, session_id: Optional[str] = None) -> str:
+        """Checkpointed sessions carry their own messages; only stateless turns need the history digest"""
+        if session_id and self.workflow.checkpointer:
+            return ""
+        return history.get_context_text()
+
+    def _create_response_cache(self):
+        cache_config = get_cache_config()
+        if not cache_config.enabled:
+            return None
+        return ResponseCache(
+            data_dir=data_store.data_dir,
+            version_source=data_store.version,
+            max_entries=cache_config.max_entries,
+            ttl_seconds=cache_config.ttl_seconds,
+            near_duplicate=cache_config.near_duplicate,
+            similarity_threshold=cache_config.similarity_threshold
+        )
+
+    def _create_admission_controller(self):
+        admission_config = get_admission_config()
+        if not admission_config.enabled:
+            return None
+        return AdmissionController(
+            max_in_flight=admission_config.max_in_flight,
+            max_queue=admission_config.max_queue,
+            max_queue_per_key=admission_config.max_queue_per_key,
+            queue_timeout=admission_config.queue_timeout,
+            service_time=admission_config.service_time
+        )
+
+    def _cacheable(self, history, session_id: Optional[str] = None) -> bool:
+        """
+        Only a conversation's opening turn may share a cached answer; a
+        follow-up depends on what that session said before it.
+        """
+        if not self.response_cache:
+            return False
+        if not session_id:
+            return True
+        return not history.get_history() and not self.workflow.has_thread(session_id)
+
+    def _cached_response(self, user_input: str):
+        if not self.response_cache:
+            return None
+        cached = self.response_cache.get(user_input)
+        tracer.annotate(cache_hit=cached is not None)
+        if cached:
+            self.logger.info("Response cache hit for '%s'", user_input)
+        return cached
+
+    def _cache_response(self, user_input: str, response):
+        if self.response_cache:
+            self.response_cache.put(user_input, response)
+
+    def _record_response(self, user_input: str, response, history=None) -> QueryResponses:
+        if hasattr(response, 'final_response'):
+            final_response = response.final_response
+        else:
+            final_response = str(response)
+        
+        if not final_response or final_response == "None" or final_response.strip() == "":
+            final_response = "I couldn't process your request. Please try again."
+        
+        (history or self.history_manager).save_query(user_input, final_response)
+        
+        return response
+
+    def _record_error(self, user_input: str, error: Exception, history=None) -> QueryResponses:
+        error_id = str(uuid.uuid4())
+        error_response = f"Error processing query: {str(error)}"
+        
+        (history or self.history_manager).save_query(user_input, error_response)
+        
+        error_message = ToolMessage(
+            content=f"Error: {str(error)}",
+            tool_call_id=error_id
+        )
+        return QueryResponses(
+            final_response=error_response,
+            messages=[error_message],
+            degraded=True
+        )
+
+    def process_query(self, user_input: str, session_id: Optional[str] = None) -> QueryResponses:
+        with tracer.span("chat", kind="request", session=bool(session_id)):
+            history = self._history(session_id)
+            try:
+                cacheable = self._cacheable(history, session_id)
+                cached = self._cached_response(user_input) if cacheable else None
+                if cached:
+                    self.workflow.record_turn(session_id, user_input, cached)
+                    return self._record_response(user_input, cached, history)
             
-            response = self.workflow.process_query_with_context(user_input, context_text)
+                context_text = self._context_text(history, session_id)
             
-            if hasattr(response, 'final_response'):
-                final_response = response.final_response
-            else:
-                final_response = str(response)
+                response = self.workflow.process_query_with_context(user_input, context_text, session_id)
+                if cacheable:
+                    self._cache_response(user_input, response)
+            
+                return self._record_response(user_input, response, history)
+            
+            except Exception as e:
+                return self._record_error(user_input, e, history)
+
+    async def aprocess_query(self, user_input: str, session_id: Optional[str] = None) -> QueryResponses:
+        with tracer.span("chat", kind="request", session=bool(session_id)):
+            history = self._history(session_id)
+            try:
+                # History may hit local files or SQLite; keep its I/O off the event loop
+                cacheable = await asyncio.to_thread(self._cacheable, history, session_id)
+                cached = self._cached_response(user_input) if cacheable else None
+                if cached:
+                    await asyncio.to_thread(self.workflow.record_turn, session_id, user_input, cached)
+                    return await asyncio.to_thread(self._record_response, user_input, cached, history)
             
-            if not final_response or final_response == "None" or final_response.strip() == "":
-                final_response = "I couldn't process your request. Please try again."
+                context_text = await asyncio.to_thread(self._context_text, history, session_id)
             
-            self.history_manager.save_query(user_input, final_response)
+                response = await self.workflow.aprocess_query_with_context(user_input, context_text, session_id)
+                if cacheable:
+                    self._cache_response(user_input, response)
             
-            return response
+                return await asyncio.to_thread(self._record_response, user_input, response, history)
             
-        except Exception as e:
-            error_id = str(uuid.uuid4())
-            error_response = f"Error processing query: {str(e)}"
+            except Exception as e:
+                return await asyncio.to_thread(self._record_error, user_input, e, history)
+
+    async def astream_query(self, user_input: str, session_id: Optional[str] = None) -> AsyncIterator[Dict]:
+        """Stream workflow events for a query, recording the final answer in history"""
+        with tracer.span("chat", kind="request", session=bool(session_id)):
+            history = self._history(session_id)
+            try:
+                cacheable = await asyncio.to_thread(self._cacheable, history, session_id)
+                cached = self._cached_response(user_input) if cacheable else None
+                if cached:
+                    await asyncio.to_thread(self.workflow.record_turn, session_id, user_input, cached)
+                    yield {"type": "final", "cached": True, "response": await asyncio.to_thread(
+                        self._record_response, user_input, cached, history
+                    )}
+                    return
             
-            self.history_manager.save_query(user_input, error_response)
+                context_text = await asyncio.to_thread(self._context_text, history, session_id)
             
-            error_message = ToolMessage(
-                content=f"Error: {str(e)}",
-                tool_call_id=error_id
-            )
-            return QueryResponses(
-                final_response=error_response,
-                messages=[error_message]
-            )
-
-    def get_chat_history(self) -> list: 
-        try:
-            with open(self.history_manager.history_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except:
-            return []
+                async for event in self.workflow.astream_query_events(user_input, context_text, session_id):
+                    if event["type"] == "final":
+                        if cacheable:
+                            self._cache_response(user_input, event["response"])
+                        event = {**event, "response": await asyncio.to_thread(
+                            self._record_response, user_input, event["response"], history
+                        )}
+                    yield event
+                
+            except Exception as e:
+                yield {"type": "final", "response": await asyncio.to_thread(self._record_error, user_input, e, history)}
+
+    def get_chat_history(self, session_id: Optional[str] = None) -> list: 
+        return self._history(session_id).get_history()
     
-    def chat(self, message: str) -> QueryResponses:
-        return self.process_query(message)
+    def chat(self, message: str, session_id: Optional[str] = None) -> QueryResponses:
+        return self.process_query(message, session_id)
+
+    async def achat(self, message: str, session_id: Optional[str] = None) -> QueryResponses:
+        return await self.aprocess_query(message, session_id)
+
+    def astream_chat(self, message: str, session_id: Optional[str] = None) -> AsyncIterator[Dict]:
+        return self.astream_query(message, session_id)
     
-    def clear_chat_history(self):
-        self.history_manager.clear_history()
\ No newline at end of file
+    def clear_chat_history(self, session_id: Optional[str] = None):
+        self._history(session_id).clear_history()
+        if session_id:
+            self.workflow.clear_thread(session_id)
\ No newline at end of file
@@ -0,0 +1,123 @@
+import asyncio
+import importlib
+import os
+import sqlite3
+import threading
+from typing import Optional
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import MemorySaver
+
+from ..logs.logger import Logger
+
+try:
+    from langgraph.checkpoint.sqlite import SqliteSaver
+except ImportError:  # langgraph-checkpoint-sqlite is optional
+    SqliteSaver = None
+
+
+if SqliteSaver is not None:
+
+    class ThreadedSqliteSaver(SqliteSaver):
+        """
+        SqliteSaver usable from both invoke() and ainvoke().
+
+        The stock saver only implements the sync interface; the async methods here
+        run the sync ones in a worker thread, which is safe because every statement
+        goes through the saver's own lock on a ``check_same_thread=False`` connection.
+        """
+
+        @classmethod
+        def from_path(cls, path: str) -> "ThreadedSqliteSaver":
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            saver = cls(cls._connect(path))
+            saver.path = path
+            saver.setup()
+            # A connection must not cross fork(); preforked server workers open their own
+            os.register_at_fork(after_in_child=saver._reconnect)
+            return saver
+
+        @staticmethod
+        def _connect(path: str) -> sqlite3.Connection:
+            conn = sqlite3.connect(path, check_same_thread=False)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            return conn
+
+        def _reconnect(self):
+            # The parent's connection is kept, never closed: closing it here could drop the parent's file locks
+            self._inherited_conn = self.conn
+            self.lock = threading.Lock()
+            self.conn = self._connect(self.path)
+
+        async def aget_tuple(self, config):
+            return await asyncio.to_thread(self.get_tuple, config)
+
+        async def alist(self, config, *, filter=None, before=None, limit=None):
+            items = await asyncio.to_thread(
+                lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+            )
+            for item in items:
+                yield item
+
+        async def aput(self, config, checkpoint, metadata, new_versions):
+            return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+        async def aput_writes(self, config, writes, task_id, task_path=""):
+            return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+        def prune(self, thread_id: str, keep: int = 1):
+            """Drop all but the newest ``keep`` checkpoints of a thread"""
+            with self.lock, self.conn:
+                self.conn.execute(
+                    """DELETE FROM writes WHERE thread_id = ? AND checkpoint_id NOT IN (
+                        SELECT checkpoint_id FROM checkpoints WHERE thread_id = ?
+                        ORDER BY checkpoint_id DESC LIMIT ?
+                    )""",
+                    (thread_id, thread_id, keep)
+                )
+                self.conn.execute(
+                    """DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_id NOT IN (
+                        SELECT checkpoint_id FROM checkpoints WHERE thread_id = ?
+                        ORDER BY checkpoint_id DESC LIMIT ?
+                    )""",
+                    (thread_id, thread_id, keep)
+                )
+
+        def close(self):
+            with self.lock:
+                self.conn.close()
+
+
+def create_checkpointer(checkpoint_config) -> Optional[BaseCheckpointSaver]:
+    """
+    Build the graph checkpointer for ``checkpoint_config.backend``:
+
+    - ``sqlite``: local file at ``checkpoint_config.sqlite_path`` (falls back to memory
+      when langgraph-checkpoint-sqlite is not installed)
+    - ``memory``: in-process, lost on restart
+    - ``none``: no checkpointer, every turn starts from a fresh state
+    - ``module:factory``: any other saver, e.g. a Redis one, built by calling ``factory()``
+    """
+    logger = Logger(__name__).get_logger()
+    backend = (checkpoint_config.backend or "none").strip()
+
+    if backend.lower() == "none":
+        return None
+
+    if backend.lower() == "memory":
+        return MemorySaver()
+
+    if backend.lower() == "sqlite":
+        if SqliteSaver is None:
+            logger.warning("langgraph-checkpoint-sqlite is not installed, using in-memory checkpoints")
+            return MemorySaver()
+        return ThreadedSqliteSaver.from_path(checkpoint_config.sqlite_path)
+
+    if ":" in backend:
+        module_name, factory_name = backend.split(":", 1)
+        factory = getattr(importlib.import_module(module_name), factory_name)
+        return factory()
+
+    raise ValueError(f"Unknown checkpoint backend: {backend}")
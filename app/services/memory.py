@@ -0,0 +1,206 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+class SessionMemoryBackend:
+    """Persistent storage for per-session chat history"""
+
+    def load(self, session_id: str, limit: int) -> List[Dict]:
+        return []
+
+    def append(self, session_id: str, entry: Dict, keep: int):
+        pass
+
+    def clear(self, session_id: str):
+        pass
+
+    def close(self):
+        pass
+
+
+class SQLiteSessionBackend(SessionMemoryBackend):
+    """SQLite-backed session history, keeping only the last ``keep`` entries per session"""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS chat_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                user TEXT NOT NULL,
+                bot TEXT NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_chat_history_session ON chat_history (session_id, id)"
+        )
+
+    def load(self, session_id: str, limit: int) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT timestamp, user, bot FROM chat_history WHERE session_id = ? ORDER BY id DESC LIMIT ?",
+                (session_id, limit)
+            ).fetchall()
+        return [{"timestamp": ts, "user": user, "bot": bot} for ts, user, bot in reversed(rows)]
+
+    def append(self, session_id: str, entry: Dict, keep: int):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    "INSERT INTO chat_history (session_id, timestamp, user, bot) VALUES (?, ?, ?, ?)",
+                    (session_id, entry["timestamp"], entry["user"], entry["bot"])
+                )
+                self._conn.execute(
+                    """DELETE FROM chat_history WHERE session_id = ? AND id NOT IN (
+                        SELECT id FROM chat_history WHERE session_id = ? ORDER BY id DESC LIMIT ?
+                    )""",
+                    (session_id, session_id, keep)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def clear(self, session_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM chat_history WHERE session_id = ?", (session_id,))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class _Session:
+    __slots__ = ("entries", "last_access")
+
+    def __init__(self, entries, max_history: int):
+        self.entries = deque(entries, maxlen=max_history)
+        self.last_access = time.monotonic()
+
+
+class SessionHistory:
+    """ChatHistoryManager-compatible view of one session"""
+
+    def __init__(self, memory: "SessionMemory", session_id: str):
+        self.memory = memory
+        self.session_id = session_id
+
+    def save_query(self, user_message: str, bot_response: str):
+        self.memory.save_query(self.session_id, user_message, bot_response)
+
+    def get_context_text(self) -> str:
+        return self.memory.get_context_text(self.session_id)
+
+    def get_history(self) -> list:
+        return self.memory.get_history(self.session_id)
+
+    def clear_history(self):
+        self.memory.clear(self.session_id)
+
+
+class SessionMemory:
+    """
+    Per-session conversation memory.
+
+    Hot sessions live in an in-process LRU capped at ``max_sessions``; sessions
+    idle for longer than ``idle_ttl`` seconds are dropped from memory. Every
+    write goes through to the backend, so an evicted session is reloaded from
+    it on its next request. Memory stays bounded at roughly
+    ``max_sessions * max_history`` entries however many sessions exist.
+    """
+
+    def __init__(self, backend: Optional[SessionMemoryBackend] = None, max_sessions: int = 10000,
+                 idle_ttl: float = 1800, max_history: int = 5, sweep_interval: float = 60):
+        self.backend = backend or SessionMemoryBackend()
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.max_history = max_history
+        self.sweep_interval = sweep_interval
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+
+    def _sweep(self, now: float):
+        """Drop idle sessions; LRU order means the idle ones sit at the front"""
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if now - session.last_access <= self.idle_ttl:
+                break
+            del self._sessions[session_id]
+        self._last_sweep = now
+
+    def _session(self, session_id: str) -> _Session:
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                session.last_access = now
+                self._sessions.move_to_end(session_id)
+                return session
+
+        entries = self.backend.load(session_id, self.max_history)
+
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = _Session(entries, self.max_history)
+                self._sessions[session_id] = session
+            session.last_access = now
+            self._sessions.move_to_end(session_id)
+
+            if now - self._last_sweep >= self.sweep_interval:
+                self._sweep(now)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            return session
+
+    def session(self, session_id: str) -> SessionHistory:
+        return SessionHistory(self, session_id)
+
+    def save_query(self, session_id: str, user_message: str, bot_response: str):
+        entry = {
+            "timestamp": datetime.now().isoformat(),
+            "user": user_message,
+            "bot": bot_response
+        }
+        session = self._session(session_id)
+        with self._lock:
+            session.entries.append(entry)
+        self.backend.append(session_id, entry, self.max_history)
+
+    def get_history(self, session_id: str) -> list:
+        session = self._session(session_id)
+        with self._lock:
+            return list(session.entries)
+
+    def get_context_text(self, session_id: str) -> str:
+        history = self.get_history(session_id)
+        if history:
+            queries = [entry["user"] for entry in history[-3:]]
+            return f"\nRecent conversation context: {' | '.join(queries)}"
+        return ""
+
+    def clear(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+        self.backend.clear(session_id)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def close(self):
+        self.backend.close()
@@ -0,0 +1,170 @@
+from typing import Dict, Iterable, List, Tuple
+
+from .tracing import Tracer, tracer as default_tracer
+
+
+PREFIX = "cashify"
+
+
+def _labels(labels: Dict) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in sorted(labels.items()):
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class PrometheusWriter:
+    """Builds the Prometheus text exposition format (version 0.0.4)"""
+
+    def __init__(self, prefix: str = PREFIX):
+        self.prefix = prefix
+        self.lines: List[str] = []
+
+    def _header(self, name: str, kind: str, help_text: str) -> str:
+        name = f"{self.prefix}_{name}"
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+        return name
+
+    def counter(self, name: str, help_text: str, samples: Iterable[Tuple[Dict, float]]):
+        self._samples(name, "counter", help_text, samples)
+
+    def gauge(self, name: str, help_text: str, samples: Iterable[Tuple[Dict, float]]):
+        self._samples(name, "gauge", help_text, samples)
+
+    def _samples(self, name: str, kind: str, help_text: str, samples: Iterable[Tuple[Dict, float]]):
+        samples = list(samples)
+        if not samples:
+            return
+        name = self._header(name, kind, help_text)
+        for labels, value in samples:
+            self.lines.append(f"{name}{_labels(labels)} {float(value):g}")
+
+    def histogram(self, name: str, help_text: str, samples: Iterable[Tuple[Dict, Dict]]):
+        """``samples`` pair labels with a LatencyHistogram snapshot"""
+        samples = list(samples)
+        if not samples:
+            return
+        name = self._header(name, "histogram", help_text)
+        for labels, snapshot in samples:
+            for bound, count in snapshot["buckets"].items():
+                self.lines.append(f"{name}_bucket{_labels({**labels, 'le': bound})} {count}")
+            self.lines.append(f"{name}_sum{_labels(labels)} {snapshot['sum']:g}")
+            self.lines.append(f"{name}_count{_labels(labels)} {snapshot['count']}")
+
+    def render(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def _tracer_metrics(writer: PrometheusWriter, metrics_tracer: Tracer):
+    snapshot = metrics_tracer.metrics.snapshot()
+    writer.histogram("span_duration_seconds", "Duration of traced requests, graph nodes and tools", (
+        ({"kind": kind, "name": name}, histogram) for (kind, name), histogram in sorted(snapshot["durations"].items())
+    ))
+    writer.counter("span_errors_total", "Traced spans that raised", (
+        ({"kind": kind, "name": name}, count) for (kind, name), count in sorted(snapshot["errors"].items())
+    ))
+
+    counters: Dict[str, List[Tuple[Dict, float]]] = {}
+    for (name, labels), value in sorted(snapshot["counters"].items()):
+        counters.setdefault(name, []).append((dict(labels), value))
+    for name, samples in counters.items():
+        writer.counter(f"{name}_total", f"Counter {name} recorded by the tracer", samples)
+
+
+def _cache_metrics(writer: PrometheusWriter, caches: Dict[str, Dict]):
+    writer.counter("cache_hits_total", "Cache lookups answered from the cache", (
+        ({"cache": cache, "match": "near"} if key == "near_hits" else {"cache": cache}, stats[key])
+        for cache, stats in caches.items() for key in ("hits", "near_hits") if key in stats
+    ))
+    writer.counter("cache_misses_total", "Cache lookups that missed", (
+        ({"cache": cache}, stats["misses"]) for cache, stats in caches.items()
+    ))
+    writer.gauge("cache_entries", "Entries currently cached", (
+        ({"cache": cache}, stats["entries"]) for cache, stats in caches.items()
+    ))
+
+
+def _admission_metrics(writer: PrometheusWriter, admission: Dict):
+    writer.gauge("admission_in_flight", "Chat requests holding an in-flight slot", [({}, admission["in_flight"])])
+    writer.gauge("admission_in_flight_limit", "Maximum concurrent chat requests", [({}, admission["max_in_flight"])])
+    writer.gauge("admission_queue_depth", "Chat requests waiting for a slot", [({}, admission["queued"])])
+    writer.gauge("admission_queued_clients", "Client keys with waiting requests", [({}, admission["queued_keys"])])
+    writer.gauge("admission_service_time_seconds", "Moving average duration of admitted chat requests",
+                 [({}, admission["service_time"])])
+    writer.counter("admission_admitted_total", "Chat requests admitted", [({}, admission["admitted"])])
+    writer.counter("admission_shed_total", "Chat requests rejected with 429/503", (
+        ({"reason": reason}, count) for reason, count in sorted(admission["shed"].items())
+    ))
+    writer.histogram("admission_queue_wait_seconds", "Time admitted chat requests waited for a slot",
+                     [({}, admission["wait"])])
+
+
+def _rate_limiter_metrics(writer: PrometheusWriter, key: str, limiter: Dict):
+    labels = {"limiter": key}
+    writer.gauge("rate_limiter_queue_depth", "Callers in this process waiting for a rate limiter token",
+                 [(labels, limiter["queue_depth"])])
+    writer.counter("rate_limiter_granted_total", "Rate limiter tokens granted", [(labels, limiter["granted"])])
+    writer.counter("rate_limiter_rejected_total", "Calls refused by the rate limiter", [(labels, limiter["rejected"])])
+    # Borrowed tokens are paid back as the bucket refills, so this one goes down as well as up
+    writer.gauge("rate_limiter_shared_backlog", "Tokens borrowed ahead across every process sharing the bucket",
+                 [(labels, limiter["shared_backlog"])])
+
+
+def render_metrics(service=None, metrics_tracer: Tracer = default_tracer) -> str:
+    """
+    Everything the process measures, in Prometheus text format: span timings and
+    tracer counters, per-role LLM latency, and, given the chatbot service, tool
+    latency, router decisions, speculation, admission control, the search rate
+    limiter and cache hit counts.
+    """
+    from ..core.llm import llm_registry
+
+    writer = PrometheusWriter()
+    _tracer_metrics(writer, metrics_tracer)
+    writer.histogram("llm_latency_seconds", "LLM call latency per graph role", (
+        ({"role": role}, histogram) for role, histogram in sorted(llm_registry.latency_snapshot().items())
+    ))
+    if service is None:
+        return writer.render()
+
+    workflow = service.workflow
+    tools = workflow.tool_executor.latency_histograms()
+    writer.histogram("tool_latency_seconds", "Tool call latency inside the tools node", (
+        ({"tool": name}, histogram) for name, histogram in sorted(tools.items())
+    ))
+    writer.counter("tool_timeouts_total", "Tool calls answered with a timeout error", (
+        ({"tool": name}, histogram["timeouts"]) for name, histogram in sorted(tools.items())
+    ))
+
+    router = workflow.router.stats.snapshot()
+    writer.counter("router_decisions_total", "Pre-router decisions", (
+        ({"decision": decision}, router[decision]) for decision in ("accepted", "rejected", "ambiguous")
+    ))
+
+    speculation = workflow.speculation_stats.snapshot()
+    writer.counter("speculation_total", "Speculative model calls by judge outcome", (
+        ({"outcome": outcome}, speculation[outcome]) for outcome in ("accepted", "rejected", "cancelled")
+    ))
+    writer.counter("speculation_latency_saved_seconds_total", "Latency saved by speculative model calls",
+                   [({}, speculation["latency_saved"])])
+    writer.counter("speculation_wasted_tokens_total", "Tokens spent on speculative model calls that were thrown away", (
+        ({"direction": direction}, speculation[f"wasted_tokens_{direction}"]) for direction in ("in", "out")
+    ))
+
+    if getattr(service, "admission", None):
+        _admission_metrics(writer, service.admission.snapshot())
+
+    caches = {}
+    if service.response_cache:
+        caches["response"] = service.response_cache.stats()
+    from ..core.tools import rate_limiter, real_time_search
+    _rate_limiter_metrics(writer, rate_limiter.key, rate_limiter.stats())
+    if real_time_search.cache:
+        for level, stats in real_time_search.cache.stats().items():
+            caches[f"search_{level}"] = stats
+    _cache_metrics(writer, caches)
+    return writer.render()
@@ -0,0 +1,98 @@
+import re
+from typing import List, Tuple
+
+THINK_OPEN = "<think>"
+THINK_CLOSE = "</think>"
+
+# An unclosed block (cut off by max_tokens or a stop sequence) runs to the end of the text
+THINK_BLOCK = re.compile(r"<think>.*?(?:</think>|$)", re.DOTALL)
+
+
+def split_reasoning(text: str) -> Tuple[str, str]:
+    """Split model output into (visible text, reasoning text)"""
+    if not text or THINK_OPEN not in text:
+        return text or "", ""
+    reasoning = "".join(
+        block[len(THINK_OPEN):].removesuffix(THINK_CLOSE) for block in THINK_BLOCK.findall(text)
+    )
+    return THINK_BLOCK.sub("", text).strip(), reasoning
+
+
+def strip_reasoning(text: str) -> str:
+    return split_reasoning(text)[0]
+
+
+def is_reasoning_model(model_name: str, patterns: List[str]) -> bool:
+    return any(pattern and pattern in model_name.lower() for pattern in patterns)
+
+
+def _partial_tag(text: str, tag: str) -> int:
+    """Length of the longest suffix of ``text`` that could be the start of ``tag``"""
+    for size in range(min(len(tag) - 1, len(text)), 0, -1):
+        if text.endswith(tag[:size]):
+            return size
+    return 0
+
+
+class ThinkBlockFilter:
+    """
+    Removes <think>...</think> blocks from a token stream as it arrives.
+
+    ``feed`` returns the visible part of each chunk. Text that might be the
+    start of a tag split across chunks is held back until the next chunk
+    decides it, and whitespace between a leading block and the answer is
+    dropped. The removed reasoning is kept in ``reasoning``.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._inside = False
+        self._after_block = False
+        self._emitted = False
+        self.reasoning = ""
+
+    def feed(self, chunk: str) -> str:
+        self._buffer += chunk
+        visible = ""
+        while self._buffer:
+            if self._inside:
+                end = self._buffer.find(THINK_CLOSE)
+                if end == -1:
+                    keep = _partial_tag(self._buffer, THINK_CLOSE)
+                    self.reasoning += self._buffer[:len(self._buffer) - keep]
+                    self._buffer = self._buffer[len(self._buffer) - keep:]
+                    break
+                self.reasoning += self._buffer[:end]
+                self._buffer = self._buffer[end + len(THINK_CLOSE):]
+                self._inside = False
+                self._after_block = not self._emitted
+                continue
+
+            start = self._buffer.find(THINK_OPEN)
+            if start == -1:
+                keep = _partial_tag(self._buffer, THINK_OPEN)
+                text, self._buffer = self._buffer[:len(self._buffer) - keep], self._buffer[len(self._buffer) - keep:]
+                visible += self._visible(text)
+                break
+            visible += self._visible(self._buffer[:start])
+            self._buffer = self._buffer[start + len(THINK_OPEN):]
+            self._inside = True
+        return visible
+
+    def _visible(self, text: str) -> str:
+        if self._after_block:
+            text = text.lstrip()
+            self._after_block = not text
+        self._emitted = self._emitted or bool(text)
+        return text
+
+    def flush(self) -> str:
+        """End of the stream: release held-back text unless it belongs to an unclosed block"""
+        text, self._buffer = self._buffer, ""
+        if self._inside:
+            self.reasoning += text
+            return ""
+        return self._visible(text)
+
+    def reset(self):
+        self.__init__()
@@ -0,0 +1,368 @@
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+
+ACCEPT = "accept"
+REJECT = "reject"
+AMBIGUOUS = "ambiguous"
+
+# Intents that map one-to-one onto a local tool
+INTENT_TOOLS = {
+    "order_tracking": "get_order_tracking",
+    "profile": "get_personal_profile",
+    "last_purchases": "get_last_purchases",
+    "trending": "get_trending_product",
+    "about": "about_cashify",
+}
+
+# Templated replies for direct answers: (English, Hindi)
+DIRECT_ANSWER_TEMPLATES = {
+    "order_tracking": ("Here's the latest on your order:\n\n{result}", "आपके ऑर्डर की जानकारी:\n\n{result}"),
+    "profile": ("Here are your Cashify account details:\n\n{result}", "आपके Cashify खाते की जानकारी:\n\n{result}"),
+    "last_purchases": ("Here's your purchase history:\n\n{result}", "आपकी खरीदारी का इतिहास:\n\n{result}"),
+    "trending": ("Here's what's trending on Cashify right now:\n\n{result}", "Cashify पर अभी ट्रेंडिंग उत्पाद:\n\n{result}"),
+    "about": ("{result}", "{result}"),
+}
+
+DEVANAGARI = re.compile(r"[ऀ-ॿ]")
+
+
+def render_direct_answer(intent: str, query: str, result: str) -> str:
+    """Render a tool result with the intent's template, in Hindi for Devanagari queries"""
+    english, hindi = DIRECT_ANSWER_TEMPLATES.get(intent, ("{result}", "{result}"))
+    template = hindi if DEVANAGARI.search(query or "") else english
+    return template.format(result=result.strip())
+
+
+# A query only counts as in scope when it names Cashify or a device. Commerce and
+# tracking words ("buy", "price", "track", "my order", "coins") also fit countless
+# other topics, so on their own they add weight but cannot accept a query
+ANCHOR_PATTERN = re.compile(
+    r"\b(cashify|smart\s*phones?|phones?|mobiles?|laptops?|tablets?|gadgets?|smart\s*watch(es)?|earbuds|"
+    r"iphone|ipad|samsung|galaxy|oneplus|macbook|pixel|redmi|xiaomi|realme|vivo|oppo|poco|motorola|nokia|"
+    r"apple|google|lenovo|dell|hp|asus)\b"
+    r"|कैशिफाई|कैशिफ़ाई|फोन|फ़ोन|मोबाइल|लैपटॉप|स्मार्टफोन|गैजेट"
+)
+
+# Nor is naming a device enough ("apple stock price", "ceo of samsung", "root my
+# samsung phone"): the query must also ask for something Cashify does
+CASHIFY_INTENT_PATTERN = re.compile(
+    r"\b(cashify|sell(ing)?|buy(ing)?|refurbished|exchange|resale|trade[\s-]?in|orders?|deliver(y|ed)|"
+    r"coins?|gift\s*cards?|coupons?|purchases?|trending|in\s+stock|pickup|bech(na|ni|u)|kharid(na|u))\b"
+    r"|कैशिफाई|कैशिफ़ाई|बेचना|बेचनी|खरीदना|ऑर्डर|आर्डर|डिलीवरी|सिक्के|खरीदारी|ट्रेंडिंग|एक्सचेंज"
+)
+
+# Other retailers and apps: their orders, coins and prices are not ours to answer
+FOREIGN_PATTERN = re.compile(
+    r"\b(amazon|flipkart|myntra|meesho|snapdeal|ebay|walmart|croma|olx|quikr|jiomart|ajio|nykaa|"
+    r"swiggy|zomato|blinkit|zepto|bigbasket|paytm|phonepe|uber|ola)\b"
+    r"|अमेज़न|अमेजन|फ्लिपकार्ट"
+)
+
+# Patterns that only match queries that are in scope by themselves
+SELF_ANCHORED_INTENTS = {"greeting"}
+
+# Regex score of a pattern hit in an unanchored query, below any accept threshold
+WEAK_MATCH_SCORE = 0.45
+
+ACCEPT_PATTERNS = {
+    "order_tracking": [
+        r"\b(my|mera|meri|mere|the)\s+orders?\b",
+        r"\borders?\s*(status|id|tracking|details|kab|kaha|kahan)\b",
+        r"\btrack(ing)?\b",
+        r"\bdeliver(y|ed)\b",
+        r"ऑर्डर|आर्डर|डिलीवरी|ट्रैक",
+    ],
+    "profile": [
+        r"\bcoins?\b",
+        r"\bgift\s*cards?\b",
+        r"\bcoupons?\b",
+        r"\b(my|mera|meri)\s+(profile|account|balance)\b",
+        r"\b(sikke|sikka|khata)\b",
+        r"सिक्के|सिक्का|कॉइन|प्रोफाइल|खाता|गिफ्ट\s*कार्ड",
+    ],
+    "last_purchases": [
+        r"\bpurchase\s*history\b",
+        r"\b(last|recent|previous|my)\s+purchases?\b",
+        r"\bwhat\s+(did\s+)?i\s+(buy|bought|purchase)",
+        r"\b(kharidari|kharida)\b",
+        r"खरीदारी|खरीदा",
+    ],
+    "trending": [
+        r"\btrending\b",
+        r"\b(available|popular)\s+(products?|phones?|mobiles?|laptops?)\b",
+        r"\bin\s+stock\b",
+        r"ट्रेंडिंग|उपलब्ध\s*(उत्पाद|फोन|मोबाइल)",
+    ],
+    "about": [
+        r"\b(what|who)\s+is\s+cashify\b",
+        r"\babout\s+cashify\b",
+        r"\bcashify\s+(kya|company|cities|pickup|timings?)\b",
+        r"\bpickup\s+timings?\b",
+        r"कैशिफाई|कैशिफ़ाई",
+    ],
+    "greeting": [
+        r"^(hi+|hello+|hey+|namaste|namaskar|good\s+(morning|afternoon|evening))[\s!.]*$",
+        r"^(नमस्ते|नमस्कार|हेलो|हाय)[\s!.।]*$",
+    ],
+    # Device names are anchors, not an intent; only what is asked about them counts here
+    "gadget": [
+        r"\b(price|prices|sell|buy|refurbished|exchange|resale|keemat|daam)\b",
+        r"कीमत|दाम|बेचना|खरीदना",
+    ],
+}
+
+REJECT_PATTERNS = {
+    "harmful": [
+        r"\b(suicide|self[\s-]?harm|kill\s+(my\s*self|myself|someone|him|her)|bomb|weapons?|guns?|pistols?|rifles?|exploit|hack(ed|ing|er)?|drugs?)\b",
+        r"\b(stalk(ing)?|spy(ing)?\s+on|track(ing)?\s+(my\s+)?(ex|wife|husband|girlfriend|boyfriend|someone|somebody))\b",
+        r"\b(marna\s+chahta|marna\s+chahti|khudkushi|aatmahatya)\b",
+        r"आत्महत्या|खुदकुशी|मरना\s+चाहता|मरना\s+चाहती|बम|हथियार",
+    ],
+    "off_topic": [
+        r"\b(prime\s+minister|pm\s+of|president\s+of|capital\s+of|meaning\s+of\s+life|religion|politics|election|weather|recipe|horoscope)\b",
+        r"\b(pradhan\s*mantri|rajneeti|dharm|mausam)\b",
+        r"प्रधानमंत्री|राजनीति|धर्म|मौसम|चुनाव",
+    ],
+    "personal": [
+        r"\b(i\s+am|i'm|feeling)\s+(sad|depressed|lonely|upset|anxious)\b",
+        r"\b(relationship|girlfriend|boyfriend|breakup)\b",
+        r"\b(doctor|medicine|fever|headache|diet)\b",
+        r"\b(pareshan|udaas|dukhi)\b",
+        r"परेशान|उदास|दुखी|दवा|बुखार|डॉक्टर",
+    ],
+}
+
+# Prototype phrases for the character n-gram fallback, which catches typos and
+# transliteration variants that the regexes miss ("odr status", "mera oder kaha hai")
+ACCEPT_PROTOTYPES = {
+    "order_tracking": [
+        "where is my order", "order status", "track my order", "when will my order arrive",
+        "mera order kaha hai", "order kab aayega", "मेरा ऑर्डर कहाँ है", "ऑर्डर की स्थिति",
+    ],
+    "profile": [
+        "how many coins do i have", "my cashify coins", "show my gift cards", "my profile",
+        "mere coins kitne hai", "मेरे सिक्के कितने हैं", "मेरा प्रोफाइल",
+    ],
+    "last_purchases": [
+        "my last purchase", "purchase history", "what did i buy",
+        "meri kharidari", "मेरी पिछली खरीदारी",
+    ],
+    "trending": [
+        "trending products", "what products are available", "show trending phones",
+        "trending phones dikhao", "ट्रेंडिंग उत्पाद दिखाओ",
+    ],
+    "about": [
+        "what is cashify", "tell me about cashify", "cashify kya hai", "कैशिफाई क्या है",
+    ],
+    "gadget": [
+        "iphone price", "price of my old phone", "sell my old phone", "buy a refurbished phone",
+        "phone ki keemat", "purana phone bechna hai", "फोन की कीमत क्या है", "मेरा पुराना फोन बेचना है",
+    ],
+}
+
+REJECT_PROTOTYPES = {
+    "harmful": ["how to commit suicide", "how to make a bomb", "aatmahatya kaise kare", "आत्महत्या कैसे करें"],
+    "off_topic": ["who is the prime minister of india", "what is the meaning of life", "desh ka pradhan mantri kaun hai"],
+    "personal": ["i am feeling sad", "main pareshan hoon", "मैं परेशान हूँ"],
+}
+
+NGRAM_SIZE = 3
+
+
+@dataclass
+class RouteDecision:
+    """Outcome of the local pre-router"""
+    decision: str
+    intent: Optional[str] = None
+    confidence: float = 0.0
+    intents: List[str] = field(default_factory=list)
+    # Strong enough evidence to answer from the intent's tool without the judge or the model
+    direct: bool = False
+
+
+class RouterStats:
+    """Thread-safe counters for pre-router hit rate and judge latency saved"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.total = 0
+        self.decisions = Counter()
+        self.judge_calls = 0
+        self.judge_latency_total = 0.0
+        self.hit_route_latency = 0.0
+
+    @property
+    def avg_judge_latency(self) -> float:
+        return self.judge_latency_total / self.judge_calls if self.judge_calls else 0.0
+
+    @property
+    def hits(self) -> int:
+        return self.decisions[ACCEPT] + self.decisions[REJECT]
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.total if self.total else 0.0
+
+    @property
+    def latency_saved(self) -> float:
+        """Judge calls skipped, priced at the measured average judge latency"""
+        return max(self.hits * self.avg_judge_latency - self.hit_route_latency, 0.0)
+
+    def record_route(self, decision: str, route_latency: float):
+        with self._lock:
+            self.total += 1
+            self.decisions[decision] += 1
+            if decision != AMBIGUOUS:
+                self.hit_route_latency += route_latency
+
+    def record_judge(self, latency: float):
+        with self._lock:
+            self.judge_calls += 1
+            self.judge_latency_total += latency
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "total": self.total,
+                "accepted": self.decisions[ACCEPT],
+                "rejected": self.decisions[REJECT],
+                "ambiguous": self.decisions[AMBIGUOUS],
+                "hit_rate": self.hit_rate,
+                "avg_judge_latency": self.avg_judge_latency,
+                "latency_saved": self.latency_saved,
+            }
+
+
+class IntentRouter:
+    """
+    Deterministic intent classifier that runs in front of the LLM judge.
+    Scores English, Devanagari and transliterated Hindi queries with regexes
+    plus character n-gram similarity, and only answers when it is confident.
+    """
+
+    def __init__(self, accept_threshold: float = 0.6, reject_threshold: float = 0.6,
+                 conflict_threshold: float = 0.5, agreement_threshold: float = 0.6,
+                 direct_threshold: float = 0.85, direct_prototype_threshold: float = 0.5):
+        self.accept_threshold = accept_threshold
+        self.reject_threshold = reject_threshold
+        self.conflict_threshold = conflict_threshold
+        self.agreement_threshold = agreement_threshold
+        self.direct_threshold = direct_threshold
+        self.direct_prototype_threshold = direct_prototype_threshold
+        self.stats = RouterStats()
+
+        self._accept_patterns = self._compile(ACCEPT_PATTERNS)
+        self._reject_patterns = self._compile(REJECT_PATTERNS)
+        self._accept_prototypes = self._profile(ACCEPT_PROTOTYPES)
+        self._reject_prototypes = self._profile(REJECT_PROTOTYPES)
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Lowercase, NFC-normalize and strip punctuation while keeping Devanagari"""
+        text = unicodedata.normalize("NFC", text or "").lower()
+        text = re.sub(r"[^\w\sऀ-ॿ']", " ", text)
+        return " ".join(text.split())
+
+    @staticmethod
+    def _ngrams(text: str) -> Counter:
+        padded = f" {text} "
+        return Counter(padded[i:i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1))
+
+    @staticmethod
+    def _cosine(a: Counter, a_norm: float, b: Counter, b_norm: float) -> float:
+        if not a_norm or not b_norm:
+            return 0.0
+        if len(a) > len(b):
+            a, b = b, a
+        return sum(count * b[gram] for gram, count in a.items()) / (a_norm * b_norm)
+
+    @staticmethod
+    def _norm(vector: Counter) -> float:
+        return math.sqrt(sum(count * count for count in vector.values()))
+
+    def _compile(self, patterns: Dict[str, List[str]]) -> Dict[str, List[re.Pattern]]:
+        return {intent: [re.compile(p) for p in items] for intent, items in patterns.items()}
+
+    def _profile(self, prototypes: Dict[str, List[str]]) -> Dict[str, List]:
+        profiled = {}
+        for intent, phrases in prototypes.items():
+            vectors = [self._ngrams(self.normalize(phrase)) for phrase in phrases]
+            profiled[intent] = [(vector, self._norm(vector)) for vector in vectors]
+        return profiled
+
+    def _prototype_score(self, grams: Counter, grams_norm: float, intent: str) -> float:
+        return max(
+            (self._cosine(grams, grams_norm, vector, norm) for vector, norm in self._accept_prototypes.get(intent, [])),
+            default=0.0
+        )
+
+    def _score(self, text: str, grams: Counter, grams_norm: float,
+               patterns: Dict[str, List[re.Pattern]], prototypes: Dict[str, List],
+               anchored: bool = True) -> Dict[str, float]:
+        """
+        Per-intent confidence. Unless the query is anchored (names Cashify or
+        a device and asks for a Cashify intent) a regex hit only counts in full
+        when the intent's n-gram prototypes agree; otherwise it scores
+        WEAK_MATCH_SCORE.
+        """
+        scores = {}
+        for intent, compiled in patterns.items():
+            hits = sum(1 for pattern in compiled if pattern.search(text))
+            ngram_score = max(
+                (self._cosine(grams, grams_norm, vector, norm) for vector, norm in prototypes.get(intent, [])),
+                default=0.0
+            )
+            if not hits:
+                regex_score = 0.0
+            elif anchored or intent in SELF_ANCHORED_INTENTS or ngram_score >= self.agreement_threshold:
+                regex_score = min(0.9 + 0.05 * (hits - 1), 1.0)
+            else:
+                regex_score = WEAK_MATCH_SCORE
+            scores[intent] = max(regex_score, ngram_score)
+        return scores
+
+    def classify(self, query: str) -> RouteDecision:
+        text = self.normalize(query)
+        if not text:
+            return RouteDecision(decision=AMBIGUOUS)
+
+        grams = self._ngrams(text)
+        grams_norm = self._norm(grams)
+        anchored = bool(ANCHOR_PATTERN.search(text)) and bool(CASHIFY_INTENT_PATTERN.search(text))
+        accept_scores = self._score(text, grams, grams_norm, self._accept_patterns, self._accept_prototypes,
+                                    anchored=anchored)
+        reject_scores = self._score(text, grams, grams_norm, self._reject_patterns, self._reject_prototypes)
+
+        best_accept = max(accept_scores.values())
+        best_reject = max(reject_scores.values())
+
+        if best_reject >= self.reject_threshold and best_accept < self.conflict_threshold:
+            intent = max(reject_scores, key=reject_scores.get)
+            return RouteDecision(decision=REJECT, intent=intent, confidence=best_reject)
+
+        # Another retailer's order or price is left to the judge
+        foreign = bool(FOREIGN_PATTERN.search(text))
+        if best_accept >= self.accept_threshold and best_reject < self.conflict_threshold and not foreign:
+            intents = sorted(
+                (intent for intent, score in accept_scores.items() if score >= self.accept_threshold),
+                key=accept_scores.get,
+                reverse=True
+            )
+            tool_intents = [intent for intent in intents if intent in INTENT_TOOLS]
+            intent = tool_intents[0] if len(tool_intents) == 1 else (None if tool_intents else intents[0])
+            # Answering from account data with no LLM in the loop needs a confident match that also
+            # reads like one of the intent's own phrasings
+            direct = (
+                intent in INTENT_TOOLS
+                and accept_scores[intent] >= self.direct_threshold
+                and self._prototype_score(grams, grams_norm, intent) >= self.direct_prototype_threshold
+            )
+            return RouteDecision(decision=ACCEPT, intent=intent, confidence=best_accept, intents=intents, direct=direct)
+
+        return RouteDecision(decision=AMBIGUOUS, confidence=max(best_accept, best_reject))
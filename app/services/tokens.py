@@ -0,0 +1,186 @@
+import json
+import math
+import os
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+
+from ..logs.logger import Logger
+
+try:
+    from tokenizers import Tokenizer
+except ImportError:  # tokenizers is optional, counts fall back to an estimate
+    Tokenizer = None
+
+
+# Chat template tokens around every message (role header and end-of-turn)
+MESSAGE_OVERHEAD = 4
+TRUNCATION_MARKER = "\n...[truncated {tokens} tokens]"
+
+# Workers build a counter per workflow; the fallback is reported once per process
+_fallback_warned = False
+
+
+class TokenCounter:
+    """
+    Local token counts for the configured model.
+
+    Uses the model's own tokenizer, read from the local ``tokenizer_path``
+    (a Hugging Face tokenizer.json) with the ``tokenizers`` package; nothing is
+    fetched over the network. Without either it estimates about one token per
+    four UTF-8 bytes, which also keeps Hindi text from being undercounted.
+    """
+
+    def __init__(self, model_name: str, tokenizer_path: str = ""):
+        self.model_name = model_name
+        self.logger = Logger(__name__).get_logger()
+        self.tokenizer = self._load_tokenizer(tokenizer_path)
+
+    def _load_tokenizer(self, tokenizer_path: str):
+        if Tokenizer is None:
+            reason = "the tokenizers package is not installed"
+        elif not tokenizer_path:
+            reason = "TOKENIZER_PATH is not set"
+        elif not os.path.isfile(tokenizer_path):
+            reason = f"{tokenizer_path} does not exist"
+        else:
+            try:
+                return Tokenizer.from_file(tokenizer_path)
+            except Exception as e:
+                reason = f"{tokenizer_path} could not be loaded: {e}"
+        self._warn_fallback(reason)
+        return None
+
+    def _warn_fallback(self, reason: str):
+        global _fallback_warned
+        if not _fallback_warned:
+            _fallback_warned = True
+            self.logger.warning("No tokenizer for %s (%s), estimating token counts", self.model_name, reason)
+
+    @property
+    def exact(self) -> bool:
+        return self.tokenizer is not None
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self.tokenizer is not None:
+            return len(self.tokenizer.encode(text, add_special_tokens=False).ids)
+        return math.ceil(len(text.encode("utf-8")) / 4)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cut ``text`` to about ``max_tokens`` tokens, marking how much was dropped"""
+        total = self.count(text)
+        if total <= max_tokens:
+            return text
+        if self.tokenizer is not None:
+            encoding = self.tokenizer.encode(text, add_special_tokens=False)
+            end = encoding.offsets[max_tokens - 1][1] if max_tokens > 0 else 0
+        else:
+            end = int(len(text) * max_tokens / total)
+        return text[:end] + TRUNCATION_MARKER.format(tokens=total - max_tokens)
+
+    def count_message(self, message: BaseMessage) -> int:
+        content = message.content if isinstance(message.content, str) else json.dumps(message.content, ensure_ascii=False)
+        tokens = MESSAGE_OVERHEAD + self.count(content)
+        for tool_call in getattr(message, "tool_calls", None) or []:
+            tokens += self.count(tool_call.get("name", "")) + self.count(json.dumps(tool_call.get("args", {}), ensure_ascii=False))
+        return tokens
+
+    def count_messages(self, messages: Sequence[BaseMessage]) -> int:
+        return sum(self.count_message(message) for message in messages)
+
+
+class PromptBudget:
+    """
+    Fits a prompt into ``max_input_tokens`` before it is sent, without touching graph state:
+
+    1. every tool output is capped at ``max_tool_tokens``
+    2. tool outputs from earlier tool rounds shrink to ``old_tool_tokens``
+    3. earlier conversation turns are dropped, oldest first, at user-message boundaries
+
+    The system prompt, the latest tool round and the current user turn are always kept.
+    """
+
+    def __init__(self, counter: TokenCounter, max_input_tokens: int = 6000,
+                 max_tool_tokens: int = 1000, old_tool_tokens: int = 120):
+        self.counter = counter
+        self.max_input_tokens = max_input_tokens
+        self.max_tool_tokens = max_tool_tokens
+        self.old_tool_tokens = old_tool_tokens
+
+    def _cap(self, message: BaseMessage, max_tokens: int) -> BaseMessage:
+        content = message.content if isinstance(message.content, str) else str(message.content)
+        truncated = self.counter.truncate(content, max_tokens)
+        return message if truncated is content else message.model_copy(update={"content": truncated})
+
+    @staticmethod
+    def _last_tool_round(messages: List[BaseMessage]) -> int:
+        for index in range(len(messages) - 1, -1, -1):
+            if isinstance(messages[index], AIMessage) and messages[index].tool_calls:
+                return index
+        return len(messages)
+
+    def fit(self, messages: Sequence[BaseMessage]) -> Tuple[List[BaseMessage], int, int]:
+        """Returns (messages to send, their token count, tokens trimmed)"""
+        original = self.counter.count_messages(messages)
+        fitted = [
+            self._cap(message, self.max_tool_tokens) if isinstance(message, ToolMessage) else message
+            for message in messages
+        ]
+        total = self.counter.count_messages(fitted)
+
+        if total > self.max_input_tokens:
+            last_round = self._last_tool_round(fitted)
+            fitted = [
+                self._cap(message, self.old_tool_tokens) if isinstance(message, ToolMessage) and index < last_round else message
+                for index, message in enumerate(fitted)
+            ]
+            total = self.counter.count_messages(fitted)
+
+        if total > self.max_input_tokens:
+            head = [message for message in fitted if isinstance(message, SystemMessage)]
+            body = [message for message in fitted if not isinstance(message, SystemMessage)]
+            turns = [index for index, message in enumerate(body) if isinstance(message, HumanMessage)]
+            cut = 0
+            for start in turns:
+                if start == 0:
+                    continue
+                if total <= self.max_input_tokens:
+                    break
+                total -= self.counter.count_messages(body[cut:start])
+                cut = start
+            fitted = head + body[cut:]
+
+        return fitted, total, max(original - total, 0)
+
+
+class TokenStats:
+    """Thread-safe per-node token totals"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._nodes: Dict[str, Dict[str, int]] = {}
+
+    def record(self, node: str, tokens_in: int, tokens_out: int, trimmed: int = 0, reasoning: int = 0):
+        """``reasoning`` is the part of ``tokens_out`` spent on <think> blocks stripped from the output"""
+        with self._lock:
+            stats = self._nodes.setdefault(node, {"calls": 0, "tokens_in": 0, "tokens_out": 0, "trimmed": 0, "reasoning": 0})
+            stats["calls"] += 1
+            stats["tokens_in"] += tokens_in
+            stats["tokens_out"] += tokens_out
+            stats["trimmed"] += trimmed
+            stats["reasoning"] += reasoning
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {node: dict(stats) for node, stats in self._nodes.items()}
+
+
+def usage_tokens(response) -> Optional[Tuple[int, int]]:
+    """Provider-reported (input, output) tokens of a chat model response, if any"""
+    usage = getattr(response, "usage_metadata", None)
+    if not usage:
+        return None
+    return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
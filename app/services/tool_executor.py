@@ -0,0 +1,131 @@
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, List, Optional
+
+from langchain_core.messages import AIMessage, ToolMessage
+
+from ..core.metrics_primitives import LatencyHistogram
+from ..logs.logger import Logger
+
+
+class ConcurrentToolExecutor:
+    """
+    Graph node running all tool calls of one model turn concurrently.
+
+    Sync tools run on a bounded thread pool, tools with a native coroutine are
+    awaited directly, so a turn takes as long as its slowest tool. A call that
+    exceeds its timeout is answered with an error ToolMessage while the others
+    still return their results; its worker thread is left to finish on its own.
+    """
+
+    def __init__(self, tools, max_workers: int = 8, timeout: float = 10.0,
+                 tool_timeouts: Optional[Dict[str, float]] = None):
+        self.tools_by_name = {tool.name: tool for tool in tools}
+        self.timeout = timeout
+        self.tool_timeouts = tool_timeouts or {}
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+        self.logger = Logger(__name__).get_logger()
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._timeouts: Dict[str, int] = {}
+
+    def _timeout_for(self, name: str) -> float:
+        return self.tool_timeouts.get(name, self.timeout)
+
+    @staticmethod
+    def _tool_calls(state) -> List[Dict]:
+        last = state["messages"][-1] if state.get("messages") else None
+        return list(last.tool_calls) if isinstance(last, AIMessage) and last.tool_calls else []
+
+    def _record(self, name: str, seconds: float):
+        with self._lock:
+            self._histograms.setdefault(name, LatencyHistogram()).record(seconds)
+
+    def _run(self, call: Dict, config) -> ToolMessage:
+        """Invoke one tool call, turning failures into an error ToolMessage as ToolNode does"""
+        tool = self.tools_by_name.get(call["name"])
+        if tool is None:
+            return ToolMessage(
+                content=f"Error: {call['name']} is not a valid tool, try one of [{', '.join(self.tools_by_name)}].",
+                name=call["name"], tool_call_id=call["id"], status="error"
+            )
+        start = time.perf_counter()
+        try:
+            if getattr(tool, "func", True) is None:
+                # Coroutine-only tool on the sync path: give it its own loop in this worker
+                return asyncio.run(tool.ainvoke({**call, "type": "tool_call"}, config))
+            return tool.invoke({**call, "type": "tool_call"}, config)
+        except Exception as e:
+            return ToolMessage(content=f"Error: {e!r}", name=call["name"], tool_call_id=call["id"], status="error")
+        finally:
+            self._record(call["name"], time.perf_counter() - start)
+
+    async def _arun(self, call: Dict, config) -> ToolMessage:
+        tool = self.tools_by_name.get(call["name"])
+        if tool is not None and getattr(tool, "coroutine", None) is not None:
+            start = time.perf_counter()
+            try:
+                return await tool.ainvoke({**call, "type": "tool_call"}, config)
+            except Exception as e:
+                return ToolMessage(content=f"Error: {e!r}", name=call["name"], tool_call_id=call["id"], status="error")
+            finally:
+                self._record(call["name"], time.perf_counter() - start)
+        # A copied context keeps the tool's span under the tools node span
+        return await asyncio.get_running_loop().run_in_executor(
+            self.pool, functools.partial(contextvars.copy_context().run, self._run, call, config)
+        )
+
+    def _timed_out(self, call: Dict) -> ToolMessage:
+        timeout = self._timeout_for(call["name"])
+        with self._lock:
+            self._timeouts[call["name"]] = self._timeouts.get(call["name"], 0) + 1
+        self.logger.warning(f"Tool {call['name']} timed out after {timeout}s, returning partial results")
+        return ToolMessage(
+            content=f"Error: {call['name']} timed out after {timeout:g}s",
+            name=call["name"], tool_call_id=call["id"], status="error"
+        )
+
+    def invoke(self, state, config=None):
+        calls = self._tool_calls(state)
+        start = time.monotonic()
+        futures = [self.pool.submit(contextvars.copy_context().run, self._run, call, config) for call in calls]
+
+        messages = []
+        for call, future in zip(calls, futures):
+            remaining = start + self._timeout_for(call["name"]) - time.monotonic()
+            try:
+                messages.append(future.result(timeout=max(remaining, 0)))
+            except FutureTimeoutError:
+                messages.append(self._timed_out(call))
+
+        self.logger.info("Ran %d tool call(s) in %.3fs", len(calls), time.monotonic() - start)
+        return {"messages": messages}
+
+    async def ainvoke(self, state, config=None):
+        calls = self._tool_calls(state)
+        start = time.monotonic()
+
+        async def run(call):
+            try:
+                return await asyncio.wait_for(self._arun(call, config), timeout=self._timeout_for(call["name"]))
+            except asyncio.TimeoutError:
+                return self._timed_out(call)
+
+        messages = await asyncio.gather(*(run(call) for call in calls))
+        self.logger.info("Ran %d tool call(s) in %.3fs", len(calls), time.monotonic() - start)
+        return {"messages": list(messages)}
+
+    def latency_histograms(self) -> Dict[str, Dict]:
+        """Per-tool latency histograms; a timed-out call is recorded once its worker finishes"""
+        with self._lock:
+            return {
+                name: {**histogram.snapshot(), "timeouts": self._timeouts.get(name, 0)}
+                for name, histogram in self._histograms.items()
+            }
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
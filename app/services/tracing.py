@@ -0,0 +1,358 @@
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..core.metrics_primitives import LatencyHistogram
+from ..logs.logger import Logger, add_context_provider
+from ..utils.config import get_tracing_config
+
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """One timed operation: a request, a graph node or a tool call"""
+
+    def __init__(self, name: str, kind: str, parent: Optional["Span"] = None, attributes: Optional[Dict] = None):
+        self.name = name
+        self.kind = kind
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.status = "ok"
+        self.error: Optional[str] = None
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.duration = 0.0
+        self._start = time.perf_counter()
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def add(self, key: str, value: float):
+        """Accumulate a numeric attribute, e.g. tokens over several LLM calls in one node"""
+        self.attributes[key] = self.attributes.get(key, 0) + value
+
+    def fail(self, error: BaseException):
+        self.status = "error"
+        self.error = f"{type(error).__name__}: {error}"
+
+    def finish(self):
+        self.duration = time.perf_counter() - self._start
+        self.end_ns = self.start_ns + int(self.duration * 1e9)
+
+    def to_dict(self) -> Dict:
+        """OpenTelemetry-shaped record, as written by the file exporter"""
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": round(self.duration * 1000, 3),
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class SpanExporter:
+    """Receives every span when it starts and when it ends"""
+    name = "base"
+
+    def on_start(self, span: Span):
+        pass
+
+    def export(self, span: Span):
+        pass
+
+    def shutdown(self):
+        pass
+
+
+class ConsoleSpanExporter(SpanExporter):
+    """One log line per finished span"""
+    name = "console"
+
+    def export(self, span: Span):
+        attributes = " ".join(f"{key}={value}" for key, value in span.attributes.items())
+        Logger(__name__).get_logger().info(
+            f"span {span.kind}:{span.name} {span.duration * 1000:.1f}ms {span.status} "
+            f"trace={span.trace_id[:8]} {attributes}".rstrip()
+        )
+
+
+class FileSpanExporter(SpanExporter):
+    """Finished spans appended to a JSON lines file, for offline analysis"""
+    name = "file"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._handle = None
+
+    def export(self, span: Span):
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str)
+        with self._lock:
+            if self._handle is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._handle = open(self.path, 'a', encoding='utf-8', buffering=1)
+            self._handle.write(line + "\n")
+
+    def shutdown(self):
+        with self._lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+
+
+class OTelSpanExporter(SpanExporter):
+    """
+    Mirrors spans into the OpenTelemetry SDK, which batches them to an OTLP
+    collector (Jaeger, Tempo, Honeycomb ...). The SDK is imported here so it
+    stays an optional dependency.
+    """
+    name = "otlp"
+
+    def __init__(self, service_name: str, endpoint: str = ""):
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+        from opentelemetry.trace import SpanKind, Status, StatusCode, set_span_in_context
+
+        self._set_span_in_context = set_span_in_context
+        self._error_status = lambda message: Status(StatusCode.ERROR, message)
+        self._kinds = {"request": SpanKind.SERVER, "tool": SpanKind.CLIENT}
+        self._internal = SpanKind.INTERNAL
+        self.provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+        exporter = OTLPSpanExporter(endpoint=endpoint) if endpoint else OTLPSpanExporter()
+        self.provider.add_span_processor(BatchSpanProcessor(exporter))
+        self.tracer = self.provider.get_tracer("cashify.chatbot")
+        self._open: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def on_start(self, span: Span):
+        with self._lock:
+            parent = self._open.get(span.parent_id)
+        otel_span = self.tracer.start_span(
+            span.name,
+            context=self._set_span_in_context(parent) if parent else None,
+            kind=self._kinds.get(span.kind, self._internal),
+            start_time=span.start_ns,
+        )
+        with self._lock:
+            self._open[span.span_id] = otel_span
+
+    def export(self, span: Span):
+        with self._lock:
+            otel_span = self._open.pop(span.span_id, None)
+        if otel_span is None:
+            return
+        otel_span.set_attributes({
+            key: value for key, value in span.attributes.items() if isinstance(value, (str, bool, int, float))
+        })
+        otel_span.set_attribute("span.kind", span.kind)
+        if span.error:
+            otel_span.set_status(self._error_status(span.error))
+        otel_span.end(end_time=span.end_ns)
+
+    def shutdown(self):
+        self.provider.shutdown()
+
+
+def create_exporters(config) -> List[SpanExporter]:
+    exporters = []
+    for name in (name.strip() for name in config.exporters):
+        if name == "console":
+            exporters.append(ConsoleSpanExporter())
+        elif name == "file":
+            exporters.append(FileSpanExporter(config.file_path))
+        elif name == "otlp":
+            try:
+                exporters.append(OTelSpanExporter(config.service_name, config.otlp_endpoint))
+            except ImportError:
+                Logger(__name__).get_logger().warning(
+                    "TRACING_EXPORTERS includes otlp but opentelemetry-sdk / opentelemetry-exporter-otlp "
+                    "are not installed, skipping it"
+                )
+        elif name and name != "none":
+            raise ValueError(f"Unknown span exporter: {name}")
+    return exporters
+
+
+class TraceMetrics:
+    """Span latency histograms, error counts and counters, aggregated for /metrics"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._durations: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self._errors: Dict[Tuple[str, str], int] = {}
+        self._counters: Dict[Tuple[str, Tuple], float] = {}
+
+    def record_span(self, span: Span):
+        key = (span.kind, span.name)
+        with self._lock:
+            self._durations.setdefault(key, LatencyHistogram()).record(span.duration)
+            if span.status == "error":
+                self._errors[key] = self._errors.get(key, 0) + 1
+
+    def increment(self, name: str, value: float = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "durations": {key: histogram.snapshot() for key, histogram in self._durations.items()},
+                "errors": dict(self._errors),
+                "counters": dict(self._counters),
+            }
+
+
+class Tracer:
+    """
+    Records spans for requests, graph nodes and tools.
+
+    The current span lives in a context variable, so spans opened inside it
+    (including in worker threads started with a copied context) become its
+    children. Every finished span feeds the in-process metrics behind
+    /metrics and is handed to the exporters named in TRACING_EXPORTERS, which
+    are created on the first span.
+    """
+
+    def __init__(self, config=None, exporters: Optional[List[SpanExporter]] = None):
+        self.config = config
+        self._exporters = exporters
+        self._lock = threading.Lock()
+        self.metrics = TraceMetrics()
+
+    @property
+    def enabled(self) -> bool:
+        return (self.config or get_tracing_config()).enabled
+
+    @property
+    def exporters(self) -> List[SpanExporter]:
+        if self._exporters is None:
+            with self._lock:
+                if self._exporters is None:
+                    self._exporters = create_exporters(self.config or get_tracing_config())
+        return self._exporters
+
+    @staticmethod
+    def current_span() -> Optional[Span]:
+        return _current_span.get()
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", **attributes):
+        if not self.enabled:
+            yield None
+            return
+        parent = _current_span.get()
+        span = Span(name, kind, parent, attributes)
+        token = _current_span.set(span)
+        for exporter in self.exporters:
+            exporter.on_start(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.fail(e)
+            raise
+        finally:
+            span.finish()
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                # An async generator resumed in another context; just put the parent back
+                _current_span.set(parent)
+            self._export(span)
+
+    def _export(self, span: Span):
+        self.metrics.record_span(span)
+        for exporter in self.exporters:
+            try:
+                exporter.export(span)
+            except Exception as e:
+                Logger(__name__).get_logger().error(f"Span exporter {exporter.name} failed: {e}")
+
+    def annotate(self, **attributes):
+        """Set attributes on the current span, if there is one"""
+        span = _current_span.get()
+        if span is not None:
+            span.set(**attributes)
+
+    def add(self, key: str, value: float):
+        span = _current_span.get()
+        if span is not None:
+            span.add(key, value)
+
+    def count(self, name: str, value: float = 1, **labels):
+        """Bump a counter exported on /metrics"""
+        self.metrics.increment(name, value, **labels)
+
+    def wrap(self, func: Callable, name: str, kind: str = "internal",
+             describe: Optional[Callable[[Span, tuple, Any], None]] = None) -> Callable:
+        """
+        ``func`` with every call traced as a span; ``describe(span, args, result)``
+        can add attributes once the call returns. The signature is kept, so
+        LangChain still sees parameters such as ``config``.
+        """
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def traced_async(*args, **kwargs):
+                with self.span(name, kind) as span:
+                    result = await func(*args, **kwargs)
+                    if span is not None and describe:
+                        describe(span, args, result)
+                    return result
+            return traced_async
+
+        @functools.wraps(func)
+        def traced(*args, **kwargs):
+            with self.span(name, kind) as span:
+                result = func(*args, **kwargs)
+                if span is not None and describe:
+                    describe(span, args, result)
+                return result
+        return traced
+
+    def shutdown(self):
+        for exporter in self._exporters or []:
+            exporter.shutdown()
+
+
+tracer = Tracer()
+
+
+def _log_context() -> Dict:
+    """Log records written inside a span carry its ids"""
+    span = _current_span.get()
+    return {"trace_id": span.trace_id, "span_id": span.span_id} if span is not None else {}
+
+
+add_context_provider(_log_context)
+
+
+def _describe_tool(span: Span, args: tuple, result: Any):
+    span.set(result_chars=len(result) if isinstance(result, str) else 0)
+
+
+def trace_tools(tools: List, tool_tracer: Tracer = tracer) -> List:
+    """Trace every call of the given LangChain tools (their sync and async bodies) as ``tool`` spans"""
+    for tool in tools:
+        if getattr(tool, "func", None) is not None:
+            tool.func = tool_tracer.wrap(tool.func, tool.name, kind="tool", describe=_describe_tool)
+        if getattr(tool, "coroutine", None) is not None:
+            tool.coroutine = tool_tracer.wrap(tool.coroutine, tool.name, kind="tool", describe=_describe_tool)
+    return tools
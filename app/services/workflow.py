@@ -1,30 +1,34 @@
 from langgraph.graph import StateGraph, END
-from langgraph.prebuilt import ToolNode
-from app.models.state import AgentState, QueryResponses
-from langchain_core.messages import AIMessage, SystemMessage, HumanMessage, ToolMessage
+from langchain_core.runnables import RunnableLambda
+from app.models.state import AgentState, QueryResponses, SinglePassOutput
+from langchain_core.messages import AIMessage, SystemMessage, HumanMessage, ToolMessage, RemoveMessage
+from app.services.router import IntentRouter, ACCEPT, AMBIGUOUS, REJECT, INTENT_TOOLS, render_direct_answer
 from ..logs.logger import Logger
+from app.services.reasoning import THINK_OPEN, ThinkBlockFilter, split_reasoning
+from app.services.tool_executor import ConcurrentToolExecutor
+from app.services.tracing import Span, tracer as default_tracer
+from app.services.tokens import MESSAGE_OVERHEAD, PromptBudget, TokenCounter, TokenStats, usage_tokens
+from ..utils.config import (
+    get_router_config, get_checkpoint_config, get_groq_config, get_token_budget_config, get_tool_executor_config,
+    get_workflow_config
+)
+import asyncio
+import functools
+import logging
 import re
-from typing import List
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import cached_property
+from typing import AsyncIterator, Dict, List, Optional
 import uuid
 
-class WorkflowOrchestrator:
-    """Orchestrates the chatbot workflow - Fixed Version"""
-    
-    def __init__(self, llm, llm_with_tools, tools):
-        self.llm = llm
-        self.llm_with_tools = llm_with_tools
-        self.tools = tools
-        self.max_tool_iterations = 3
-        self.max_global_iterations = 2
-        self.workflow = self._create_workflow()
-        self.logger = Logger().get_logger()
+# strict: judge call, then model call; single_pass: one structured call validates and plans the turn;
+# speculative: judge and first model call start together
+WORKFLOW_MODES = ("strict", "single_pass", "speculative")
 
-    def _judge_query(self, state: AgentState) -> AgentState:
-        user_query = state["user_query"]
-        
-        judge_prompt = SystemMessage(content="""You are a strict Cashify customer service query validator. Handle queries in ANY language (English, Hindi, etc.).
-
-    ACCEPT ONLY these Cashify-related topics:
+# Topic restrictions shared by the judge prompt and the single-pass prompt
+TOPIC_POLICY = """    ACCEPT ONLY these Cashify-related topics:
     • Order status, tracking, delivery (ऑर्डर स्थिति, ट्रैकिंग, डिलीवरी)
     • Account/profile/coins (खाता, प्रोफाइल, सिक्के)
     • Purchase history (खरीदारी का इतिहास)
@@ -47,24 +51,346 @@ class WorkflowOrchestrator:
     "iPhone की कीमत क्या है?" → ACCEPT  
     "मैं परेशान हूँ" → REJECT
     "how to commit suicide" → REJECT
-    "what is the meaning of life" → REJECT
+    "what is the meaning of life" → REJECT"""
 
-    Respond with exactly: ACCEPT or REJECT""")
+
+class SpeculationStats:
+    """Thread-safe counters weighing the tokens spent on discarded speculative model calls against the latency saved"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.accepted = 0
+        self.rejected = 0
+        self.cancelled = 0
+        self.latency_saved = 0.0
+        self.wasted_tokens_in = 0
+        self.wasted_tokens_out = 0
+
+    def record_accept(self, judge_latency: float, model_latency: float):
+        # Sequential would take judge + model, speculative takes the longer of the two
+        with self._lock:
+            self.accepted += 1
+            self.latency_saved += min(judge_latency, model_latency)
+
+    def record_reject(self, cancelled: bool):
+        with self._lock:
+            self.rejected += 1
+            self.cancelled += cancelled
+
+    def record_waste(self, tokens_in: int, tokens_out: int = 0):
+        with self._lock:
+            self.wasted_tokens_in += tokens_in
+            self.wasted_tokens_out += tokens_out
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            wasted = self.wasted_tokens_in + self.wasted_tokens_out
+            return {
+                "accepted": self.accepted,
+                "rejected": self.rejected,
+                "cancelled": self.cancelled,
+                "latency_saved": round(self.latency_saved, 3),
+                "wasted_tokens_in": self.wasted_tokens_in,
+                "wasted_tokens_out": self.wasted_tokens_out,
+                "wasted_tokens_per_second_saved": round(wasted / self.latency_saved, 1) if self.latency_saved else None,
+            }
+
+
+class WorkflowOrchestrator:
+    """Orchestrates the chatbot workflow - Fixed Version"""
+    
+    def __init__(self, llm, llm_with_tools, tools, router_config=None, checkpointer=None, checkpoint_config=None,
+                 token_budget_config=None, tool_executor_config=None, workflow_config=None, role_llms=None, tracer=None):
+        self.llm = llm
+        self.llm_with_tools = llm_with_tools
+        self.tools = tools
+        # Optional per-role clients ("judge", "answer"); without them every role uses llm / llm_with_tools
+        self.role_llms = role_llms or {}
+        self.judge_llm = self.role_llms.get("judge", llm)
+        self.answer_llm_with_tools = (
+            self.role_llms["answer"].bind_tools(tools) if "answer" in self.role_llms else llm_with_tools
+        )
+        self.tools_by_name = {tool.name: tool for tool in tools}
+        self.max_tool_iterations = 3
+        self.max_global_iterations = 2
+        self.router_config = router_config or get_router_config()
+        self.router = IntentRouter(
+            accept_threshold=self.router_config.accept_threshold,
+            reject_threshold=self.router_config.reject_threshold,
+            conflict_threshold=self.router_config.conflict_threshold,
+            direct_threshold=self.router_config.direct_answer_min_confidence,
+            direct_prototype_threshold=self.router_config.direct_answer_min_prototype
+        )
+        self.token_budget_config = token_budget_config or get_token_budget_config()
+        self.token_counter = TokenCounter(get_groq_config().model_name, self.token_budget_config.tokenizer_path)
+        self.prompt_budget = PromptBudget(
+            self.token_counter,
+            max_input_tokens=self.token_budget_config.max_input_tokens,
+            max_tool_tokens=self.token_budget_config.max_tool_tokens,
+            old_tool_tokens=self.token_budget_config.old_tool_tokens
+        )
+        self.token_stats = TokenStats()
+        tool_executor_config = tool_executor_config or get_tool_executor_config()
+        self.tool_executor = ConcurrentToolExecutor(
+            tools,
+            max_workers=tool_executor_config.max_workers,
+            timeout=tool_executor_config.timeout,
+            tool_timeouts=tool_executor_config.tool_timeouts
+        )
+        self.workflow_config = workflow_config or get_workflow_config()
+        if self.workflow_config.mode not in WORKFLOW_MODES:
+            raise ValueError(f"Unknown workflow mode '{self.workflow_config.mode}', expected one of {WORKFLOW_MODES}")
+        # Forced tool choice makes the model answer with SinglePassOutput arguments only
+        self.single_pass_llm = (
+            llm.bind_tools([SinglePassOutput], tool_choice="SinglePassOutput")
+            if self.workflow_config.mode == "single_pass" else None
+        )
+        self.speculation_stats = SpeculationStats()
+        # Sync graph runs need a thread for the model call racing the judge
+        self.speculation_pool = (
+            ThreadPoolExecutor(max_workers=self.workflow_config.speculation_workers, thread_name_prefix="speculate")
+            if self.workflow_config.mode == "speculative" else None
+        )
+        self.tracer = tracer or default_tracer
+        self.checkpointer = checkpointer
+        self.checkpoint_config = checkpoint_config or get_checkpoint_config()
+        self.workflow = self._create_workflow(checkpointer)
+        self.logger = Logger(__name__).get_logger()
+
+    @cached_property
+    def stateless_workflow(self):
+        """Turns without a thread id cannot use a checkpointed graph; compiled on the first such turn"""
+        return self._create_workflow() if self.checkpointer else self.workflow
+
+    def _fit_prompt(self, messages: List):
+        if self.token_budget_config.enabled:
+            return self.prompt_budget.fit(messages)
+        return messages, self.token_counter.count_messages(messages), 0
+
+    def _strip_reasoning(self, response) -> int:
+        """Drop <think> blocks that still reached the output; returns the tokens they took"""
+        content = getattr(response, 'content', None)
+        if not isinstance(content, str) or THINK_OPEN not in content:
+            return 0
+        response.content, reasoning = split_reasoning(content)
+        return self.token_counter.count(reasoning)
+
+    def _record_tokens(self, node: str, tokens_in: int, trimmed: int, response):
+        reasoning = self._strip_reasoning(response)
+        reported = usage_tokens(response)
+        tokens_out = reported[1] if reported else self.token_counter.count_message(response) - MESSAGE_OVERHEAD + reasoning
+        self.token_stats.record(node, tokens_in, tokens_out, trimmed, reasoning)
+        self.tracer.add("llm.calls", 1)
+        self.tracer.add("llm.tokens_in", tokens_in)
+        self.tracer.add("llm.tokens_out", tokens_out)
+        self.tracer.count("llm_tokens", tokens_in, node=node, direction="in")
+        self.tracer.count("llm_tokens", tokens_out, node=node, direction="out")
+        if reasoning:
+            self.tracer.count("llm_tokens", reasoning, node=node, direction="reasoning")
+        self.logger.info(
+            "Tokens [%s] in=%d out=%d trimmed=%d reasoning=%d reported_in=%s",
+            node, tokens_in, tokens_out, trimmed, reasoning, reported[0] if reported else None
+        )
+
+    def _call_llm(self, node: str, llm, messages: List):
+        """Invoke ``llm`` within the prompt token budget, recording tokens in/out for ``node``; the reply comes back without <think> blocks"""
+        messages, tokens_in, trimmed = self._fit_prompt(messages)
+        response = llm.invoke(messages)
+        self._record_tokens(node, tokens_in, trimmed, response)
+        return response
+
+    async def _acall_llm(self, node: str, llm, messages: List):
+        messages, tokens_in, trimmed = self._fit_prompt(messages)
+        response = await llm.ainvoke(messages)
+        self._record_tokens(node, tokens_in, trimmed, response)
+        return response
+
+    def _memory_cut(self, messages) -> int:
+        """Index of the first message to keep; older ones leave the thread. Cuts only at a user turn so tool calls stay paired"""
+        if len(messages) <= self.checkpoint_config.max_messages:
+            return 0
+        start = max(len(messages) - self.checkpoint_config.keep_messages, 0)
+        for index in range(start, len(messages)):
+            if isinstance(messages[index], HumanMessage):
+                return index
+        return 0
+
+    def _summary_messages(self, summary: Optional[str], dropped) -> List:
+        lines = []
+        for message in dropped:
+            role = "User" if isinstance(message, HumanMessage) else "Tool" if isinstance(message, ToolMessage) else "Assistant"
+            content = str(message.content or "")[:500]
+            if content:
+                lines.append(f"{role}: {content}")
+        previous = f"Current summary: {summary}\n\n" if summary else ""
+        prompt = SystemMessage(content="""Summarize this Cashify support conversation in under 80 words.
+Keep order ids, product names, prices and user preferences. Reply with the summary only.""")
+        return [prompt, HumanMessage(content=previous + "\n".join(lines))]
+
+    def _memory_result(self, state: AgentState, cut: int, summary: Optional[str]) -> AgentState:
+        self.logger.info("Conversation window: dropping %d of %d messages (summary=%s)", cut, len(state['messages']), bool(summary))
+        return {
+            **state,
+            "messages": [RemoveMessage(id=message.id) for message in state["messages"][:cut]],
+            "summary": summary
+        }
+
+    def _compact_memory(self, state: AgentState) -> AgentState:
+        """Keep the checkpointed thread bounded: drop old turns, optionally folding them into a running summary"""
+        cut = self._memory_cut(state["messages"])
+        if not cut:
+            return state
+        
+        summary = state.get("summary")
+        if self.checkpoint_config.summarize:
+            try:
+                response = self._call_llm("memory", self.llm, self._summary_messages(summary, state["messages"][:cut]))
+                summary = (response.content or "").strip() or summary
+            except Exception as e:
+                self.logger.error(f"Conversation summary failed, keeping window only: {e}")
+        return self._memory_result(state, cut, summary)
+
+    async def _acompact_memory(self, state: AgentState) -> AgentState:
+        cut = self._memory_cut(state["messages"])
+        if not cut:
+            return state
+        
+        summary = state.get("summary")
+        if self.checkpoint_config.summarize:
+            try:
+                response = await self._acall_llm("memory", self.llm, self._summary_messages(summary, state["messages"][:cut]))
+                summary = (response.content or "").strip() or summary
+            except Exception as e:
+                self.logger.error(f"Conversation summary failed, keeping window only: {e}")
+        return self._memory_result(state, cut, summary)
+
+    def _pre_route(self, state: AgentState) -> AgentState:
+        """Classify obvious intents locally so only ambiguous queries pay for the LLM judge"""
+        start = time.perf_counter()
+        route = self.router.classify(state["user_query"])
+        elapsed = time.perf_counter() - start
         
+        self.router.stats.record_route(route.decision, elapsed)
+        self.logger.info(
+            "Pre-router decision for '%s': %s (intent=%s, confidence=%.2f, %.2fms)",
+            state['user_query'], route.decision, route.intent, route.confidence, elapsed * 1000
+        )
+        if self.logger.isEnabledFor(logging.DEBUG):
+            stats = self.router.stats.snapshot()
+            self.logger.debug(
+                "Pre-router hit rate %.0f%% over %d queries, judge time saved %.2fs",
+                stats['hit_rate'] * 100, stats['total'], stats['latency_saved']
+            )
+        return {
+            **state,
+            "route": route.decision,
+            "intent": route.intent,
+            "direct_eligible": route.direct,
+            "is_valid": route.decision == ACCEPT
+        }
+
+    def _direct_tool(self, state: AgentState):
+        tool_name = INTENT_TOOLS.get(state.get("intent"))
+        return self.tools_by_name.get(tool_name) if tool_name else None
+
+    def _polish_messages(self, user_query: str, draft: str) -> List:
+        prompt = SystemMessage(content="""You are a Cashify customer service chatbot.
+Rewrite the drafted answer below as a short, friendly reply to the user's question.
+Keep every fact, number and link exactly as given. Reply in the user's language.""")
+        return [prompt, HumanMessage(content=f"Question: {user_query}\nDraft answer: {draft}")]
+
+    def _direct_result(self, state: AgentState, tool, result: str, answer: str) -> AgentState:
+        tool_call_id = f"direct_{uuid.uuid4().hex[:12]}"
+        self.logger.info("Direct answer for '%s' via %s (polish=%s)", state['user_query'], tool.name, self.router_config.direct_answer_polish)
+        return {
+            **state,
+            "messages": state["messages"] + [
+                AIMessage(content="", tool_calls=[{"name": tool.name, "args": {}, "id": tool_call_id}]),
+                ToolMessage(content=result, tool_call_id=tool_call_id, name=tool.name),
+                AIMessage(content=answer)
+            ],
+            "answer_satisfied": True
+        }
+
+    def _direct_answer(self, state: AgentState) -> AgentState:
+        """Answer single-tool intents from the tool output without a tool-calling LLM turn"""
+        tool = self._direct_tool(state)
         try:
-            judge_messages = [judge_prompt, HumanMessage(content=f"Query: {user_query}")]
-            judge_response = self.llm.invoke(judge_messages)
-            decision_text = judge_response.content.strip().upper()
+            result = str(tool.invoke({}))
+            if result.startswith("Error"):
+                raise ValueError(result)
             
-            is_valid = "ACCEPT" in decision_text
-            decision = "ACCEPT" if is_valid else "REJECT"
+            answer = render_direct_answer(state["intent"], state["user_query"], result)
+            if self.router_config.direct_answer_polish:
+                try:
+                    answer = self._call_llm("direct_answer", self.llm, self._polish_messages(state["user_query"], answer)).content or answer
+                except Exception as e:
+                    self.logger.error(f"Direct answer polish failed, keeping template: {e}")
+            
+            return self._direct_result(state, tool, result, answer)
+            
+        except Exception as e:
+            self.logger.error(f"Direct answer failed, falling back to model call: {e}")
+            return {**state, "intent": None}
+
+    async def _adirect_answer(self, state: AgentState) -> AgentState:
+        tool = self._direct_tool(state)
+        try:
+            result = str(await tool.ainvoke({}))
+            if result.startswith("Error"):
+                raise ValueError(result)
+            
+            answer = render_direct_answer(state["intent"], state["user_query"], result)
+            if self.router_config.direct_answer_polish:
+                try:
+                    answer = (await self._acall_llm("direct_answer", self.llm, self._polish_messages(state["user_query"], answer))).content or answer
+                except Exception as e:
+                    self.logger.error(f"Direct answer polish failed, keeping template: {e}")
+            
+            return self._direct_result(state, tool, result, answer)
+            
+        except Exception as e:
+            self.logger.error(f"Direct answer failed, falling back to model call: {e}")
+            return {**state, "intent": None}
+
+    def _judge_messages(self, user_query: str) -> List:
+        judge_prompt = SystemMessage(content=f"""You are a strict Cashify customer service query validator. Handle queries in ANY language (English, Hindi, etc.).
+
+{TOPIC_POLICY}
+
+    Respond with exactly: ACCEPT or REJECT""")
+        return [judge_prompt, HumanMessage(content=f"Query: {user_query}")]
+
+    def _judge_result(self, state: AgentState, content: str) -> AgentState:
+        decision_text = content.strip().upper()
+        
+        is_valid = "ACCEPT" in decision_text
+        decision = "ACCEPT" if is_valid else "REJECT"
+        
+        self.logger.info("Judge decision for '%s': %s -> %s", state['user_query'], decision, is_valid)
+        return {**state, "is_valid": is_valid}
+
+    def _judge_query(self, state: AgentState) -> AgentState:
+        try:
+            start = time.perf_counter()
+            judge_response = self._call_llm("judge", self.judge_llm, self._judge_messages(state["user_query"]))
+            self.router.stats.record_judge(time.perf_counter() - start)
+            return self._judge_result(state, judge_response.content)
             
-            self.logger.info(f"Judge decision for '{user_query}': {decision} -> {is_valid}")
-            return {**state, "is_valid": is_valid}
+        except Exception as e:
+            self.logger.error(f"Judge error, defaulting to REJECT: {e}")
+            return {**state, "is_valid": False, "degraded": True}
+
+    async def _ajudge_query(self, state: AgentState) -> AgentState:
+        try:
+            start = time.perf_counter()
+            judge_response = await self._acall_llm("judge", self.judge_llm, self._judge_messages(state["user_query"]))
+            self.router.stats.record_judge(time.perf_counter() - start)
+            return self._judge_result(state, judge_response.content)
             
         except Exception as e:
             self.logger.error(f"Judge error, defaulting to REJECT: {e}")
-            return {**state, "is_valid": False}
+            return {**state, "is_valid": False, "degraded": True}
 
     def _handle_invalid_query(self, state: AgentState) -> AgentState:
         return {
@@ -75,11 +401,12 @@ class WorkflowOrchestrator:
             "answer_satisfied": True
         }
 
-    def _model_call(self, state: AgentState) -> AgentState:
-        current_iteration = state.get('iteration_count', 0)
+    def _system_prompt(self, state: AgentState) -> str:
         context_text = state.get('context_text', '')
+        if state.get('summary'):
+            context_text += f"\nConversation summary: {state['summary']}"
         
-        system_prompt = SystemMessage(content=f"""You are a Cashify customer service chatbot.{context_text}
+        return f"""You are a Cashify customer service chatbot.{context_text}
 
     ABSOLUTE RESTRICTIONS:
     - ONLY answer Cashify, gadgets, smartphones, laptops queries
@@ -94,32 +421,208 @@ class WorkflowOrchestrator:
     - about_cashify: Company info
     - get_real_time_search: Gadget searches
 
-    IMPORTANT: For order status questions, you MUST call get_order_tracking tool.""")
+    IMPORTANT: For order status questions, you MUST call get_order_tracking tool."""
+
+    def _model_messages(self, state: AgentState) -> List:
+        return [SystemMessage(content=self._system_prompt(state))] + state['messages']
+
+    def _single_pass_messages(self, state: AgentState) -> List:
+        system_prompt = SystemMessage(content=f"""{self._system_prompt(state)}
+
+    TOPIC CHECK - decide on the user's latest query first:
+{TOPIC_POLICY}
+
+    Reply ONLY by calling SinglePassOutput with:
+    - decision: "ACCEPT" or "REJECT"
+    - tool_calls: the tools needed to answer (name and args), empty if none is needed
+    - answer: the final answer if no tool is needed, otherwise empty""")
+        return [system_prompt] + state['messages']
+
+    def _single_pass_plan(self, response) -> Optional[SinglePassOutput]:
+        for tool_call in getattr(response, 'tool_calls', None) or []:
+            if tool_call.get("name") == "SinglePassOutput":
+                try:
+                    return SinglePassOutput.model_validate(tool_call.get("args", {}))
+                except ValueError as e:
+                    self.logger.error(f"Invalid single-pass output: {e}")
+        return None
+
+    def _single_pass_result(self, state: AgentState, response) -> AgentState:
+        plan = self._single_pass_plan(response)
+        if plan is None:
+            self.logger.warning(f"No single-pass output for '{state['user_query']}', falling back to the judge")
+            return {**state, "route": AMBIGUOUS}
         
-        messages_to_send = [system_prompt] + state['messages']
+        tool_calls = [
+            {"name": call.name, "args": call.args, "id": f"call_{uuid.uuid4().hex[:12]}"}
+            for call in plan.tool_calls if call.name in self.tools_by_name
+        ]
+        self.logger.info(
+            "Single-pass decision for '%s': %s (tools=%s, answer=%s)",
+            state['user_query'], plan.decision, [call['name'] for call in tool_calls], bool(plan.answer.strip())
+        )
+        if plan.decision == "REJECT":
+            return {**state, "is_valid": False, "route": REJECT}
         
+        if tool_calls:
+            message = AIMessage(content="", tool_calls=tool_calls)
+        elif plan.answer.strip():
+            message = AIMessage(content=plan.answer.strip())
+        else:
+            # Accepted but nothing planned: let the regular model turn handle it
+            return {**state, "is_valid": True, "route": ACCEPT}
+        
+        return {
+            **state,
+            "is_valid": True,
+            "route": ACCEPT,
+            "messages": state['messages'] + [message],
+            "iteration_count": state.get('iteration_count', 0) + 1
+        }
+
+    def _single_pass(self, state: AgentState) -> AgentState:
+        """Validate the query, pick tools and possibly answer it with one structured LLM call"""
         try:
-            response = self.llm_with_tools.invoke(messages_to_send)
-            
-            if not hasattr(response, 'content') or not response.content:
-                response.content = "Let me help you with your Cashify query."
-            
-            self.logger.info(f"Model response - Content: '{response.content[:50]}...', Tool calls: {bool(getattr(response, 'tool_calls', None))}")
+            response = self._call_llm("single_pass", self.single_pass_llm, self._single_pass_messages(state))
+            return self._single_pass_result(state, response)
+        except Exception as e:
+            self.logger.error(f"Single-pass call error, falling back to the judge: {e}")
+            return {**state, "route": AMBIGUOUS}
+
+    async def _asingle_pass(self, state: AgentState) -> AgentState:
+        try:
+            response = await self._acall_llm("single_pass", self.single_pass_llm, self._single_pass_messages(state))
+            return self._single_pass_result(state, response)
+        except Exception as e:
+            self.logger.error(f"Single-pass call error, falling back to the judge: {e}")
+            return {**state, "route": AMBIGUOUS}
+
+    def _model_result(self, state: AgentState, response) -> AgentState:
+        if not hasattr(response, 'content') or not response.content:
+            response.content = "Let me help you with your Cashify query."
+        
+        self.logger.debug(
+            "Model response - Content: '%.50s...', Tool calls: %s", response.content, bool(getattr(response, 'tool_calls', None))
+        )
+        
+        # APPEND to existing messages instead of replacing
+        return {
+            **state,
+            "messages": state['messages'] + [response],
+            "iteration_count": state.get('iteration_count', 0) + 1
+        }
+
+    def _model_error(self, state: AgentState, error: Exception) -> AgentState:
+        self.logger.error(f"Model call error: {error}")
+        return {
+            **state,
+            "messages": state['messages'] + [AIMessage(content="Let me help you with your Cashify query.")],
+            "iteration_count": state.get('iteration_count', 0) + 1,
+            "degraded": True
+        }
+
+    def _process_llm(self, state: AgentState):
+        """Tool selection model until the turn has tool results, then the answer model"""
+        if any(isinstance(message, ToolMessage) for message in self._current_turn(state['messages'])):
+            return self.answer_llm_with_tools
+        return self.llm_with_tools
+
+    def _model_call(self, state: AgentState) -> AgentState:
+        try:
+            response = self._call_llm("process", self._process_llm(state), self._model_messages(state))
+            return self._model_result(state, response)
+        except Exception as e:
+            return self._model_error(state, e)
+
+    async def _amodel_call(self, state: AgentState) -> AgentState:
+        try:
+            response = await self._acall_llm("process", self._process_llm(state), self._model_messages(state))
+            return self._model_result(state, response)
+        except Exception as e:
+            return self._model_error(state, e)
+
+    def _speculative_model_call(self, messages: List):
+        start = time.perf_counter()
+        response = self.llm_with_tools.invoke(messages)
+        return response, time.perf_counter() - start
+
+    async def _aspeculative_model_call(self, messages: List):
+        start = time.perf_counter()
+        response = await self.llm_with_tools.ainvoke(messages)
+        return response, time.perf_counter() - start
+
+    def _discarded_tokens(self, response) -> int:
+        reasoning = self._strip_reasoning(response)
+        reported = usage_tokens(response)
+        return reported[1] if reported else self.token_counter.count_message(response) - MESSAGE_OVERHEAD + reasoning
+
+    def _waste_on_done(self, future: Future, tokens_in: int):
+        """A rejected speculative call that was already running: count its tokens once it finishes"""
+        if future.cancelled() or future.exception() is not None:
+            self.speculation_stats.record_waste(tokens_in)
+        else:
+            self.speculation_stats.record_waste(tokens_in, self._discarded_tokens(future.result()[0]))
+
+    def _speculation_rejected(self, judged: AgentState, cancelled: bool) -> AgentState:
+        self.speculation_stats.record_reject(cancelled)
+        self.logger.info("Speculative model call discarded for '%s' (cancelled=%s)", judged['user_query'], cancelled)
+        return judged
+
+    def _speculation_accepted(self, judged: AgentState, response, judge_latency: float, model_latency: float,
+                              tokens_in: int, trimmed: int) -> AgentState:
+        self._record_tokens("process", tokens_in, trimmed, response)
+        self.speculation_stats.record_accept(judge_latency, model_latency)
+        self.logger.info(
+            "Speculative model call kept for '%s', saved %.3fs", judged['user_query'], min(judge_latency, model_latency)
+        )
+        return self._model_result(judged, response)
+
+    def _speculate(self, state: AgentState) -> AgentState:
+        """Run the judge and the first model call at the same time; drop the model output if the judge rejects"""
+        messages, tokens_in, trimmed = self._fit_prompt(self._model_messages(state))
+        model_future = self.speculation_pool.submit(self._speculative_model_call, messages)
+        
+        start = time.perf_counter()
+        judged = self._judge_query(state)
+        judge_latency = time.perf_counter() - start
+        
+        if not judged["is_valid"]:
+            cancelled = model_future.cancel()
+            model_future.add_done_callback(lambda future: self._waste_on_done(future, 0 if cancelled else tokens_in))
+            return self._speculation_rejected(judged, cancelled)
+        
+        try:
+            response, model_latency = model_future.result()
+        except Exception as e:
+            return self._model_error(judged, e)
+        return self._speculation_accepted(judged, response, judge_latency, model_latency, tokens_in, trimmed)
+
+    async def _aspeculate(self, state: AgentState) -> AgentState:
+        messages, tokens_in, trimmed = self._fit_prompt(self._model_messages(state))
+        model_task = asyncio.create_task(self._aspeculative_model_call(messages))
+        
+        try:
+            start = time.perf_counter()
+            judged = await self._ajudge_query(state)
+            judge_latency = time.perf_counter() - start
             
-            # APPEND to existing messages instead of replacing
-            return {
-                **state,
-                "messages": state['messages'] + [response],
-                "iteration_count": current_iteration + 1
-            }
+            if not judged["is_valid"]:
+                if model_task.done() and not model_task.cancelled() and model_task.exception() is None:
+                    self.speculation_stats.record_waste(tokens_in, self._discarded_tokens(model_task.result()[0]))
+                    return self._speculation_rejected(judged, False)
+                # Cancelling closes the request, so only the prompt was paid for
+                model_task.cancel()
+                self.speculation_stats.record_waste(tokens_in)
+                return self._speculation_rejected(judged, True)
             
-        except Exception as e:
-            self.logger.error(f"Model call error: {e}")
-            return {
-                **state,
-                "messages": state['messages'] + [AIMessage(content="Let me help you with your Cashify query.")],
-                "iteration_count": current_iteration + 1
-            }
+            try:
+                response, model_latency = await model_task
+            except Exception as e:
+                return self._model_error(judged, e)
+            return self._speculation_accepted(judged, response, judge_latency, model_latency, tokens_in, trimmed)
+        finally:
+            if not model_task.done():
+                model_task.cancel()
 
     def _clean_response(self, content: str) -> str:
         """Clean up response content"""
@@ -132,35 +635,43 @@ class WorkflowOrchestrator:
         
         return content.strip() if content.strip() else "I'll help you with that information."
 
+    @staticmethod
+    def _current_turn(messages) -> List:
+        """The last user message and everything after it; earlier turns come from the checkpoint"""
+        for index in range(len(messages) - 1, -1, -1):
+            if isinstance(messages[index], HumanMessage):
+                return list(messages[index:])
+        return list(messages)
+
     def _check_answer_quality(self, state: AgentState) -> AgentState:
         user_query = state["user_query"]
         last_message = state['messages'][-1]
         answer = getattr(last_message, 'content', '')
         
         tool_results = []
-        for msg in state['messages']:
+        for msg in self._current_turn(state['messages']):
             if isinstance(msg, ToolMessage):
                 tool_results.append(msg.content)
         
-        self.logger.info(f"Answer quality check - Tool results found: {len(tool_results)}, Answer length: {len(answer)}")
+        self.logger.debug("Answer quality check - Tool results found: %d, Answer length: %d", len(tool_results), len(answer))
         
         if answer and any(keyword in answer.lower() for keyword in ['order', 'ord', 'samsung', 'iphone', 'tracking', 'delivery', 'cashify']):
-            self.logger.info("Answer quality: SATISFIED (contains order/product information)")
+            self.logger.debug("Answer quality: SATISFIED (contains order/product information)")
             return {**state, "answer_satisfied": True}
         
         if tool_results:
-            self.logger.info("Answer quality: SATISFIED (tool results available)")
+            self.logger.debug("Answer quality: SATISFIED (tool results available)")
             return {**state, "answer_satisfied": True}
         
         if answer and len(answer.strip()) > 50:
-            self.logger.info("Answer quality: SATISFIED (substantial response)")
+            self.logger.debug("Answer quality: SATISFIED (substantial response)")
             return {**state, "answer_satisfied": True}
         
         if "order" in user_query.lower() and not tool_results and len(answer.strip()) < 50:
-            self.logger.info("Answer quality: NOT SATISFIED (order query without tool results)")
+            self.logger.debug("Answer quality: NOT SATISFIED (order query without tool results)")
             return {**state, "answer_satisfied": False}
         
-        self.logger.info("Answer quality: SATISFIED (default)")
+        self.logger.debug("Answer quality: SATISFIED (default)")
         return {**state, "answer_satisfied": True}
     
 
@@ -184,6 +695,7 @@ class WorkflowOrchestrator:
 
     def _retry_processing(self, state: AgentState) -> AgentState:
         """Reset for retry"""
+        self.tracer.count("graph_retries")
         return {
             **state,
             "messages": state["messages"][:-1] if state["messages"] else [],
@@ -203,6 +715,40 @@ class WorkflowOrchestrator:
         has_tool_calls = hasattr(last_msg, 'tool_calls') and last_msg.tool_calls
         return "continue" if has_tool_calls else "check_answer"
 
+    def _route_after_pre_route(self, state: AgentState) -> str:
+        """Route confident local decisions directly, fall through to the judge otherwise"""
+        if state.get("route") == ACCEPT:
+            if not self._direct_tool(state):
+                return "process"
+            if not state.get("direct_eligible"):
+                # Weak evidence for an account-data intent: let the judge and the model decide
+                return "judge"
+            return "direct_answer" if self.router_config.direct_answer else "process"
+        if state.get("route") == REJECT:
+            return "invalid"
+        return "judge"
+
+    def _route_after_direct_answer(self, state: AgentState) -> str:
+        """Finish on a direct answer, hand over to the model if the tool failed"""
+        return "end" if state.get("answer_satisfied") else "process"
+
+    def _route_after_single_pass(self, state: AgentState) -> str:
+        """Run planned tools or finish on the planned answer; unparseable output goes to the judge"""
+        if state.get("route") == AMBIGUOUS:
+            return "judge"
+        if not state["is_valid"]:
+            return "invalid"
+        last_msg = state['messages'][-1]
+        if not isinstance(last_msg, AIMessage):
+            return "process"
+        return "tools" if last_msg.tool_calls else "check_answer"
+
+    def _route_after_speculate(self, state: AgentState) -> str:
+        """Rejected queries end as invalid, accepted ones continue from the speculative model turn"""
+        if not state["is_valid"]:
+            return "invalid"
+        return self._should_continue_tools(state)
+
     def _route_after_judge(self, state: AgentState) -> str:
         """Route after validation"""
         return "process" if state["is_valid"] else "invalid"
@@ -216,29 +762,95 @@ class WorkflowOrchestrator:
         
         return "end" if state["answer_satisfied"] else "retry"
 
-    def _create_workflow(self):
+    @staticmethod
+    def _describe_node(span: Span, args: tuple, result):
+        """Iteration counters and routing decisions of a node run, as span attributes"""
+        state = result if isinstance(result, dict) else {}
+        for key in ("iteration_count", "global_iteration", "route", "is_valid", "answer_satisfied"):
+            if state.get(key) is not None:
+                span.set(**{f"graph.{key}": state[key]})
+        if "messages" in state:
+            span.set(**{"graph.messages_out": len(state["messages"])})
+
+    def _node(self, name: str, func, afunc=None) -> RunnableLambda:
+        """
+        A graph node traced as a span. LLM nodes carry both bodies: invoke() runs
+        the sync one, ainvoke() the async one; a node without an async body runs
+        its sync one inline on the event loop.
+        """
+        if afunc is None:
+            @functools.wraps(func)
+            async def afunc(*args, **kwargs):
+                return func(*args, **kwargs)
+        return RunnableLambda(
+            self.tracer.wrap(func, name, kind="node", describe=self._describe_node),
+            afunc=self.tracer.wrap(afunc, name, kind="node", describe=self._describe_node),
+            name=name
+        )
+
+    def _create_workflow(self, checkpointer=None):
         """Create the workflow graph"""
         
         graph = StateGraph(AgentState)
         
         # Add nodes
-        graph.add_node("judge", self._judge_query)
-        graph.add_node("process", self._model_call)
-        graph.add_node("tools", ToolNode(tools=self.tools))
-        graph.add_node("check_answer", self._check_answer_quality)
-        graph.add_node("invalid", self._handle_invalid_query)
-        graph.add_node("retry", self._retry_processing)
-        graph.add_node("max_retries", self._handle_max_retries)
+        graph.add_node("process", self._node("process", self._model_call, self._amodel_call))
+        graph.add_node("tools", self._node("tools", self.tool_executor.invoke, self.tool_executor.ainvoke))
+        graph.add_node("check_answer", self._node("check_answer", self._check_answer_quality))
+        graph.add_node("invalid", self._node("invalid", self._handle_invalid_query))
+        graph.add_node("retry", self._node("retry", self._retry_processing))
+        graph.add_node("max_retries", self._node("max_retries", self._handle_max_retries))
+        
+        # The single-pass and speculative nodes take the judge's place; the judge stays as the single-pass fallback
+        validator = "judge"
+        if self.workflow_config.mode == "single_pass":
+            validator = "single_pass"
+            graph.add_node("single_pass", self._node("single_pass", self._single_pass, self._asingle_pass))
+            graph.add_conditional_edges(
+                "single_pass",
+                self._route_after_single_pass,
+                {"judge": "judge", "invalid": "invalid", "tools": "tools", "check_answer": "check_answer", "process": "process"}
+            )
+        elif self.workflow_config.mode == "speculative":
+            validator = "speculate"
+            graph.add_node("speculate", self._node("speculate", self._speculate, self._aspeculate))
+            graph.add_conditional_edges(
+                "speculate",
+                self._route_after_speculate,
+                {"invalid": "invalid", "continue": "tools", "check_answer": "check_answer"}
+            )
         
         # Set entry point
-        graph.set_entry_point("judge")
+        first = "pre_route" if self.router_config.enabled else validator
+        if checkpointer:
+            graph.add_node("memory", self._node("memory", self._compact_memory, self._acompact_memory))
+            graph.set_entry_point("memory")
+            graph.add_edge("memory", first)
+        else:
+            graph.set_entry_point(first)
+        
+        if self.router_config.enabled:
+            graph.add_node("pre_route", self._node("pre_route", self._pre_route))
+            graph.add_node("direct_answer", self._node("direct_answer", self._direct_answer, self._adirect_answer))
+            graph.add_conditional_edges(
+                "pre_route",
+                self._route_after_pre_route,
+                {"process": "process", "invalid": "invalid", "judge": validator, "direct_answer": "direct_answer"}
+            )
+            graph.add_conditional_edges(
+                "direct_answer",
+                self._route_after_direct_answer,
+                {"end": END, "process": "process"}
+            )
         
         # Add edges
-        graph.add_conditional_edges(
-            "judge", 
-            self._route_after_judge, 
-            {"process": "process", "invalid": "invalid"}
-        )
+        if self.workflow_config.mode != "speculative":
+            graph.add_node("judge", self._node("judge", self._judge_query, self._ajudge_query))
+            graph.add_conditional_edges(
+                "judge", 
+                self._route_after_judge, 
+                {"process": "process", "invalid": "invalid"}
+            )
         
         graph.add_conditional_edges(
             "process", 
@@ -258,74 +870,231 @@ class WorkflowOrchestrator:
         graph.add_edge("invalid", END)
         graph.add_edge("max_retries", END)
         
-        return graph.compile()
+        return graph.compile(checkpointer=checkpointer)
     
-    def process_query_with_context(self, user_input: str, context_text: str = "") -> QueryResponses:
-        state = {
+    def _initial_state(self, user_input: str, context_text: str = "") -> AgentState:
+        # With a checkpointer the new HumanMessage is appended to the thread and summary is kept
+        return {
             "messages": [HumanMessage(content=user_input)],
             "user_query": user_input,
             "context_text": context_text,
             "is_valid": False,
             "iteration_count": 0,
             "global_iteration": 0,
-            "answer_satisfied": False
+            "answer_satisfied": False,
+            "route": None,
+            "intent": None,
+            "direct_eligible": None,
+            "degraded": False
         }
+
+    def _build_query_response(self, user_input: str, result) -> QueryResponses:
+        logger_messages = [HumanMessage(content=user_input)]
+        final_response = "I couldn't process your request."
+        degraded = not result or bool(result.get("degraded"))
         
-        try:
-            logger_messages = [HumanMessage(content=user_input)]
-            result = self.workflow.invoke(state)
-            
-            final_response = "I couldn't process your request."
-            
-            if result and result.get('messages'):
-                for message in result['messages']:
-                    if hasattr(message, 'content') and message.content:
-                        logger_messages.append(message)
-                    
-                    if hasattr(message, 'tool_calls') and message.tool_calls:
-                        for tool_call in message.tool_calls:
-                            tool_name = tool_call.get('name', 'unknown')
-                            tool_args = tool_call.get('args', {})
-                            tool_call_id = tool_call.get('id', str(uuid.uuid4()))
-                            tool_msg = ToolMessage(
-                                content=f"Tool: {tool_name}, Args: {tool_args}",
-                                tool_call_id=tool_call_id
-                            )
-                            logger_messages.append(tool_msg)
-                    
-                    if isinstance(message, ToolMessage):
-                        logger_messages.append(message)
+        if result and result.get('messages'):
+            turn_messages = self._current_turn(result['messages'])
+            for message in turn_messages:
+                if hasattr(message, 'content') and message.content:
+                    logger_messages.append(message)
                 
-                if result['messages']:
-                    last_msg = result['messages'][-1]
-                    if hasattr(last_msg, 'content') and last_msg.content:
-                        final_response = last_msg.content
-                    else:
-                        for msg in reversed(result['messages']):
-                            if isinstance(msg, ToolMessage) and msg.content:
-                                final_response = f"Here's the information:\n\n{msg.content}"
-                                break
-            else:
-                error_id = str(uuid.uuid4())
-                logger_messages.append(ToolMessage(
-                    content="No workflow result",
-                    tool_call_id=error_id
-                ))
-            
-            if not final_response or final_response == "None":
-                final_response = "I couldn't retrieve the information. Please try again."
+                if hasattr(message, 'tool_calls') and message.tool_calls:
+                    for tool_call in message.tool_calls:
+                        tool_name = tool_call.get('name', 'unknown')
+                        tool_args = tool_call.get('args', {})
+                        tool_call_id = tool_call.get('id', str(uuid.uuid4()))
+                        tool_msg = ToolMessage(
+                            content=f"Tool: {tool_name}, Args: {tool_args}",
+                            tool_call_id=tool_call_id
+                        )
+                        logger_messages.append(tool_msg)
+                
+                if isinstance(message, ToolMessage):
+                    logger_messages.append(message)
             
-            return QueryResponses(
-                final_response=final_response,
-                messages=logger_messages
+            if turn_messages:
+                last_msg = turn_messages[-1]
+                if hasattr(last_msg, 'content') and last_msg.content:
+                    final_response = last_msg.content
+                else:
+                    for msg in reversed(turn_messages):
+                        if isinstance(msg, ToolMessage) and msg.content:
+                            final_response = f"Here's the information:\n\n{msg.content}"
+                            break
+        else:
+            error_id = str(uuid.uuid4())
+            logger_messages.append(ToolMessage(
+                content="No workflow result",
+                tool_call_id=error_id
+            ))
+        
+        if not final_response or final_response == "None":
+            final_response = "I couldn't retrieve the information. Please try again."
+            degraded = True
+        
+        return QueryResponses(
+            final_response=final_response,
+            messages=logger_messages,
+            degraded=degraded
+        )
+
+    def _error_response(self, error: Exception) -> QueryResponses:
+        error_response = f"Error: {str(error)}"
+        return QueryResponses(
+            final_response=error_response,
+            messages=[ToolMessage(content=error_response, tool_call_id=str(uuid.uuid4()))],
+            degraded=True
+        )
+
+    def _run(self, thread_id: Optional[str] = None):
+        """Graph and run config for a turn; a thread id resumes that conversation from its checkpoint"""
+        if self.checkpointer and thread_id:
+            return self.workflow, {"configurable": {"thread_id": thread_id}}
+        return self.stateless_workflow, None
+
+    def _prune_thread(self, thread_id: Optional[str] = None):
+        """Only the newest checkpoint is needed to resume a thread"""
+        if thread_id and hasattr(self.checkpointer, "prune"):
+            try:
+                self.checkpointer.prune(thread_id)
+            except Exception as e:
+                self.logger.error(f"Checkpoint prune failed for {thread_id}: {e}")
+
+    def has_thread(self, thread_id: Optional[str] = None) -> bool:
+        """Whether a checkpointed conversation already exists for ``thread_id``"""
+        if not (self.checkpointer and thread_id):
+            return False
+        return self.checkpointer.get_tuple({"configurable": {"thread_id": thread_id}}) is not None
+
+    def record_turn(self, thread_id: Optional[str], user_input: str, response: QueryResponses):
+        """Append a turn answered outside the graph (a cache hit) to the thread, so follow-ups see it"""
+        if not (self.checkpointer and thread_id):
+            return
+        try:
+            self.workflow.update_state(
+                {"configurable": {"thread_id": thread_id}},
+                {
+                    "messages": [HumanMessage(content=user_input), AIMessage(content=response.final_response)],
+                    "user_query": user_input,
+                    "global_iteration": 0,
+                    "answer_satisfied": True
+                },
+                # As if the answer had just passed the check, so the thread ends here with nothing pending
+                as_node="check_answer"
             )
+            self._prune_thread(thread_id)
+        except Exception as e:
+            self.logger.error(f"Recording cached turn failed for {thread_id}: {e}")
+
+    def clear_thread(self, thread_id: str):
+        if self.checkpointer:
+            self.checkpointer.delete_thread(thread_id)
+
+    def process_query_with_context(self, user_input: str, context_text: str = "", thread_id: Optional[str] = None) -> QueryResponses:
+        try:
+            workflow, config = self._run(thread_id)
+            result = workflow.invoke(self._initial_state(user_input, context_text), config)
+            self._prune_thread(thread_id)
+            return self._build_query_response(user_input, result)
+        except Exception as e:
+            return self._error_response(e)
+
+    async def aprocess_query_with_context(self, user_input: str, context_text: str = "", thread_id: Optional[str] = None) -> QueryResponses:
+        """Async variant of process_query_with_context, safe to await from the API event loop"""
+        try:
+            workflow, config = self._run(thread_id)
+            result = await workflow.ainvoke(self._initial_state(user_input, context_text), config)
+            await asyncio.to_thread(self._prune_thread, thread_id)
+            return self._build_query_response(user_input, result)
+        except Exception as e:
+            return self._error_response(e)
+    
+    def _stream_event(self, event: Dict, think_filter: Optional[ThinkBlockFilter] = None) -> Dict:
+        """Map a LangGraph astream_events (v2) event to a client-facing event, or None"""
+        kind = event["event"]
+        name = event.get("name", "")
+        node = event.get("metadata", {}).get("langgraph_node")
+        data = event.get("data", {})
+        
+        # Direct children of the graph run are the node executions
+        is_node = len(event.get("parent_ids", [])) == 1 and name == node and not name.startswith("__")
+        
+        if kind == "on_chain_start" and is_node:
+            return {"type": "node_start", "node": node}
+        
+        if kind == "on_chain_end" and is_node:
+            payload = {"type": "node_end", "node": node}
+            output = data.get("output")
+            if node in ("judge", "single_pass", "speculate") and isinstance(output, dict):
+                payload["is_valid"] = output.get("is_valid", False)
+            if node == "pre_route" and isinstance(output, dict):
+                payload["route"] = output.get("route")
+                payload["intent"] = output.get("intent")
+            return payload
+        
+        if kind == "on_chat_model_stream" and node == "process":
+            content = getattr(data.get("chunk"), "content", "")
+            if content and think_filter:
+                content = think_filter.feed(content)
+            return {"type": "token", "node": node, "content": content} if content else None
+        
+        if kind == "on_chat_model_end" and node == "process":
+            if think_filter:
+                # Held-back tail of this reply; the next model turn starts clean
+                tail = think_filter.flush()
+                think_filter.reset()
+                if tail:
+                    return {"type": "token", "node": node, "content": tail}
+            tool_calls = getattr(data.get("output"), "tool_calls", None) or []
+            if tool_calls:
+                return {
+                    "type": "tool_calls",
+                    "node": node,
+                    "tool_calls": [{"name": call.get("name"), "args": call.get("args", {})} for call in tool_calls]
+                }
+            return None
+        
+        if kind == "on_tool_start":
+            return {"type": "tool_start", "tool": name, "args": data.get("input", {})}
+        
+        if kind == "on_tool_end":
+            output = data.get("output")
+            return {"type": "tool_result", "tool": name, "content": str(getattr(output, "content", output))}
+        
+        return None
+
+    async def astream_query_events(self, user_input: str, context_text: str = "", thread_id: Optional[str] = None) -> AsyncIterator[Dict]:
+        """
+        Run the graph and yield node transitions, tool activity and model tokens as they happen.
+        The last event is always {"type": "final", "response": QueryResponses}.
+        """
+        result = None
+        think_filter = ThinkBlockFilter()
+        start = time.perf_counter()
+        first_token = None
+        try:
+            workflow, config = self._run(thread_id)
+            async for event in workflow.astream_events(
+                self._initial_state(user_input, context_text), config, version="v2"
+            ):
+                if event["event"] == "on_chain_end" and not event.get("parent_ids"):
+                    result = event["data"].get("output")
+                    continue
+                
+                payload = self._stream_event(event, think_filter)
+                if payload:
+                    if payload["type"] == "token" and first_token is None:
+                        first_token = time.perf_counter() - start
+                        self.logger.info("First visible token for '%s' after %.0fms", user_input, first_token * 1000)
+                    yield payload
+            
+            await asyncio.to_thread(self._prune_thread, thread_id)
+            yield {"type": "final", "response": self._build_query_response(user_input, result)}
             
         except Exception as e:
-            error_response = f"Error: {str(e)}"
-            return QueryResponses(
-                final_response=error_response,
-                messages=[ToolMessage(content=error_response, tool_call_id=str(uuid.uuid4()))]
-            )
+            self.logger.error(f"Streaming workflow error: {e}")
+            yield {"type": "final", "response": self._error_response(e)}
     
     def process_query(self, user_input: str) -> QueryResponses:
         """Process user query and return QueryResponses object"""
@@ -339,7 +1108,7 @@ class WorkflowOrchestrator:
         }
         
         try:
-            result = self.workflow.invoke(state)
+            result = self.stateless_workflow.invoke(state)
             
             if result and result.get('messages'):
                 final_msg = result['messages'][-1]
@@ -355,16 +1124,19 @@ class WorkflowOrchestrator:
                 
                 return QueryResponses(
                     final_response=final_response,
-                    messages=result['messages']
+                    messages=result['messages'],
+                    degraded=bool(result.get("degraded")) or final_response.startswith("I couldn't")
                 )
             else:
                 return QueryResponses(
                     final_response="I encountered an issue processing your request.",
-                    messages=[HumanMessage(content=user_input)]
+                    messages=[HumanMessage(content=user_input)],
+                    degraded=True
                 )
             
         except Exception as e:
             return QueryResponses(
                 final_response=f"Error processing query: {str(e)}",
-                messages=[HumanMessage(content=user_input)]
+                messages=[HumanMessage(content=user_input)],
+                degraded=True
             )
\ No newline at end of file
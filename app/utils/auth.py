@@ -1,10 +1,12 @@
-from fastapi import HTTPException, Security, status
+import hashlib
+
+from fastapi import HTTPException, Request, Security, status
 from fastapi.security.api_key import APIKeyHeader
 from .config import get_settings
 from ..logs.logger import Logger
 
 
-logger = Logger()
+logger = Logger(__name__)
 
 settings = get_settings()
 
@@ -18,7 +20,8 @@ async def verify_api_key(
     api_key: str = Security(api_key_header),
 ) -> str:
     """
-    Verify that the provided API key matches the expected value.
+    Verify that the provided API key matches the expected value, or one of
+    them when API_AUTH_KEY lists several.
 
     Raises:
         HTTPException: If the API key is missing or invalid.
@@ -42,7 +45,7 @@ async def verify_api_key(
             detail="Missing API Key"
         )
 
-    if api_key.strip() != expected_api_key.strip():
+    if api_key.strip() not in {key.strip() for key in expected_api_key.split(",")}:
         logger.warning("Invalid API Key attempt.")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -51,3 +54,23 @@ async def verify_api_key(
 
     logger.debug("API Key successfully validated.")
     return api_key
+
+
+async def client_key(
+    request: Request,
+    api_key: str = Security(api_key_header),
+) -> str:
+    """
+    Identify the caller for admission control fairness.
+
+    When API keys are configured the key is verified with verify_api_key and
+    the client is identified by a fingerprint of it, so the key itself never
+    reaches logs or metrics. Without keys, the client address is used.
+
+    Returns:
+        str: A stable, non-secret client identifier.
+    """
+    if not str(settings.api_key):
+        return f"addr:{request.client.host if request.client else 'unknown'}"
+    api_key = await verify_api_key(api_key)
+    return "key:" + hashlib.sha256(api_key.strip().encode("utf-8")).hexdigest()[:12]
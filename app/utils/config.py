@@ -1,6 +1,7 @@
 """Configuration settings for Cashify Chatbot"""
 from functools import lru_cache
 import os
+from typing import Dict, List
 from pydantic_settings import BaseSettings
 from pydantic import Field, BaseModel
 from dotenv import load_dotenv
@@ -17,6 +18,60 @@ class GROQConfig(BaseModel):
         extra = "allow"
 
 
+class ModelProfile(BaseModel):
+    """Model and generation settings for one graph role"""
+    model_name: str
+    temperature: float
+    max_tokens: int
+
+
+def _model_profile(role: str, model_name: str = None, max_tokens: int = None, temperature: float = None) -> ModelProfile:
+    """Profile from <ROLE>_MODEL_NAME / <ROLE>_TEMPERATURE / <ROLE>_MAX_TOKENS, defaulting to the main GROQ settings"""
+    return ModelProfile(
+        model_name=os.getenv(f"{role}_MODEL_NAME", model_name or os.getenv("MODEL_NAME", "deepseek-r1-distill-llama-70b")),
+        temperature=float(os.getenv(f"{role}_TEMPERATURE", temperature if temperature is not None else os.getenv("TEMPERATURE", "0.1"))),
+        max_tokens=int(os.getenv(f"{role}_MAX_TOKENS", max_tokens or os.getenv("MAX_TOKENS", "4000")))
+    )
+
+
+class ModelProfilesConfig(BaseModel):
+    """Per-role models: a small fast model for one-word verdicts and term rewrites, the main model for the rest"""
+    judge: ModelProfile = Field(default_factory=lambda: _model_profile("JUDGE", "llama-3.1-8b-instant", 8, 0.0))
+    tool_selection: ModelProfile = Field(default_factory=lambda: _model_profile("TOOL_SELECTION"))
+    answer: ModelProfile = Field(default_factory=lambda: _model_profile("ANSWER"))
+    search_rewrite: ModelProfile = Field(default_factory=lambda: _model_profile("SEARCH_REWRITE", "llama-3.1-8b-instant", 16, 0.0))
+
+    class Config:
+        extra = "allow"
+
+
+class ReasoningConfig(BaseModel):
+    """Keep reasoning models from spending output tokens on <think> blocks nobody sees"""
+    suppress: bool = Field(default_factory=lambda: os.getenv("REASONING_SUPPRESSION", "True").lower() == "true")
+    # Sent as Groq's reasoning_format to models matching model_patterns: hidden, parsed or raw
+    reasoning_format: str = Field(default_factory=lambda: os.getenv("REASONING_FORMAT", "hidden"))
+    model_patterns: List[str] = Field(default_factory=lambda: os.getenv("REASONING_MODEL_PATTERNS", "deepseek-r1,qwq,qwen3").split(","))
+    # Roles whose answer is one line stop at the first newline (non-reasoning models only)
+    single_line_roles: List[str] = Field(default_factory=lambda: os.getenv("REASONING_SINGLE_LINE_ROLES", "judge,search_rewrite").split(","))
+
+    class Config:
+        extra = "allow"
+
+
+class LLMClientConfig(BaseModel):
+    """HTTP connection pool shared by every LLM client in the process"""
+    max_connections: int = Field(default_factory=lambda: int(os.getenv("LLM_MAX_CONNECTIONS", "20")))
+    max_keepalive_connections: int = Field(default_factory=lambda: int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "10")))
+    keepalive_expiry: float = Field(default_factory=lambda: float(os.getenv("LLM_KEEPALIVE_EXPIRY_SECONDS", "60")))
+    # HTTP/2 needs the h2 package, HTTP/1.1 is used without it
+    http2: bool = Field(default_factory=lambda: os.getenv("LLM_HTTP2", "True").lower() == "true")
+    connect_timeout: float = Field(default_factory=lambda: float(os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", "5")))
+    timeout: float = Field(default_factory=lambda: float(os.getenv("LLM_TIMEOUT_SECONDS", "60")))
+
+    class Config:
+        extra = "allow"
+
+
 class LocalData(BaseModel):
     """Local Data file paths for JSON files"""
     trending_products: str = Field(default="trending_products.json")
@@ -24,6 +79,234 @@ class LocalData(BaseModel):
     about_info: str = Field(default="about.txt")
     last_purchase: str = Field(default="last_purchase.json")
     personal_info: str = Field(default="points.json")
+    reload_interval: float = Field(default_factory=lambda: float(os.getenv("DATA_RELOAD_INTERVAL", "1.0")))
+
+    class Config:
+        extra = "allow"
+
+
+class SearchConfig(BaseModel):
+    """Real-time search backend and cache configuration"""
+    backend: str = Field(default_factory=lambda: os.getenv("SEARCH_BACKEND", "duckduckgo"))
+    max_results: int = Field(default_factory=lambda: int(os.getenv("SEARCH_MAX_RESULTS", "3")))
+    selection: str = Field(default_factory=lambda: os.getenv("SEARCH_BACKEND_SELECTION", "latency"))
+    local_docs_dir: str = Field(default_factory=lambda: os.getenv("SEARCH_LOCAL_DOCS_DIR", "data/search_docs"))
+    local_index_path: str = Field(default_factory=lambda: os.getenv("SEARCH_LOCAL_INDEX_PATH", "data/cache/search_index.bin"))
+    local_min_score: float = Field(default_factory=lambda: float(os.getenv("SEARCH_LOCAL_MIN_SCORE", "1.0")))
+    stub_latency: float = Field(default_factory=lambda: float(os.getenv("SEARCH_STUB_LATENCY", "0")))
+    cache_enabled: bool = Field(default_factory=lambda: os.getenv("SEARCH_CACHE_ENABLED", "True").lower() == "true")
+    cache_path: str = Field(default_factory=lambda: os.getenv("SEARCH_CACHE_PATH", "data/cache/search.json"))
+    cache_max_entries: int = Field(default_factory=lambda: int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "1024")))
+    terms_ttl: float = Field(default_factory=lambda: float(os.getenv("SEARCH_TERMS_TTL_SECONDS", "86400")))
+    results_ttl: float = Field(default_factory=lambda: float(os.getenv("SEARCH_RESULTS_TTL_SECONDS", "3600")))
+
+    class Config:
+        extra = "allow"
+
+
+class SearchRateLimitConfig(BaseModel):
+    """Real-time search rate limit configuration"""
+    rate: float = Field(default_factory=lambda: float(os.getenv("SEARCH_RATE_PER_SECOND", "0.33")))
+    burst: float = Field(default_factory=lambda: float(os.getenv("SEARCH_RATE_BURST", "1")))
+    max_wait: float = Field(default_factory=lambda: float(os.getenv("SEARCH_RATE_MAX_WAIT", "5")))
+    fail_fast: bool = Field(default_factory=lambda: os.getenv("SEARCH_RATE_FAIL_FAST", "False").lower() == "true")
+    store: str = Field(default_factory=lambda: os.getenv("SEARCH_RATE_STORE", "memory"))
+    sqlite_path: str = Field(default_factory=lambda: os.getenv("SEARCH_RATE_SQLITE_PATH", "data/rate_limits.db"))
+
+    class Config:
+        extra = "allow"
+
+
+class WorkflowConfig(BaseModel):
+    """Graph variant configuration"""
+    # strict: LLM judge, then model call; single_pass: one structured call decides and answers;
+    # speculative: judge and first model call run concurrently, the model output is dropped on REJECT
+    mode: str = Field(default_factory=lambda: os.getenv("WORKFLOW_MODE", "strict"))
+    speculation_workers: int = Field(default_factory=lambda: int(os.getenv("WORKFLOW_SPECULATION_WORKERS", "8")))
+
+    class Config:
+        extra = "allow"
+
+
+class RouterConfig(BaseModel):
+    """Local pre-router configuration, evaluated before the LLM judge"""
+    enabled: bool = Field(default_factory=lambda: os.getenv("PRE_ROUTER_ENABLED", "True").lower() == "true")
+    accept_threshold: float = Field(default_factory=lambda: float(os.getenv("PRE_ROUTER_ACCEPT_THRESHOLD", "0.6")))
+    reject_threshold: float = Field(default_factory=lambda: float(os.getenv("PRE_ROUTER_REJECT_THRESHOLD", "0.6")))
+    conflict_threshold: float = Field(default_factory=lambda: float(os.getenv("PRE_ROUTER_CONFLICT_THRESHOLD", "0.5")))
+    direct_answer: bool = Field(default_factory=lambda: os.getenv("DIRECT_ANSWER_ENABLED", "True").lower() == "true")
+    direct_answer_polish: bool = Field(default_factory=lambda: os.getenv("DIRECT_ANSWER_POLISH", "False").lower() == "true")
+    # Direct answers skip the judge and the model, so they need a confident match that also
+    # resembles one of the intent's prototype phrasings; other accepted tool intents go to the judge
+    direct_answer_min_confidence: float = Field(default_factory=lambda: float(os.getenv("DIRECT_ANSWER_MIN_CONFIDENCE", "0.85")))
+    direct_answer_min_prototype: float = Field(default_factory=lambda: float(os.getenv("DIRECT_ANSWER_MIN_PROTOTYPE", "0.5")))
+
+    class Config:
+        extra = "allow"
+
+
+class CacheConfig(BaseModel):
+    """Response cache configuration"""
+    enabled: bool = Field(default_factory=lambda: os.getenv("RESPONSE_CACHE_ENABLED", "True").lower() == "true")
+    max_entries: int = Field(default_factory=lambda: int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "512")))
+    ttl_seconds: float = Field(default_factory=lambda: float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "3600")))
+    near_duplicate: bool = Field(default_factory=lambda: os.getenv("RESPONSE_CACHE_NEAR_DUPLICATE", "False").lower() == "true")
+    similarity_threshold: float = Field(default_factory=lambda: float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0.85")))
+
+    class Config:
+        extra = "allow"
+
+
+class HistoryConfig(BaseModel):
+    """Chat history log configuration"""
+    history_file: str = Field(default_factory=lambda: os.getenv("CHAT_HISTORY_FILE", "data/chat_history.txt"))
+    max_history: int = Field(default_factory=lambda: int(os.getenv("CHAT_HISTORY_MAX", "5")))
+    compact_threshold: int = Field(default_factory=lambda: int(os.getenv("CHAT_HISTORY_COMPACT_THRESHOLD", "1000")))
+    fsync_every: int = Field(default_factory=lambda: int(os.getenv("CHAT_HISTORY_FSYNC_EVERY", "20")))
+    fsync_interval: float = Field(default_factory=lambda: float(os.getenv("CHAT_HISTORY_FSYNC_INTERVAL", "1.0")))
+
+    class Config:
+        extra = "allow"
+
+
+class SessionConfig(BaseModel):
+    """Per-session conversation memory configuration"""
+    backend: str = Field(default_factory=lambda: os.getenv("SESSION_BACKEND", "sqlite"))
+    sqlite_path: str = Field(default_factory=lambda: os.getenv("SESSION_SQLITE_PATH", "data/sessions.db"))
+    max_sessions: int = Field(default_factory=lambda: int(os.getenv("SESSION_MAX_IN_MEMORY", "10000")))
+    idle_ttl: float = Field(default_factory=lambda: float(os.getenv("SESSION_IDLE_TTL_SECONDS", "1800")))
+    max_history: int = Field(default_factory=lambda: int(os.getenv("SESSION_MAX_HISTORY", "5")))
+
+    class Config:
+        extra = "allow"
+
+
+class CheckpointConfig(BaseModel):
+    """Graph checkpointer and conversation window configuration"""
+    backend: str = Field(default_factory=lambda: os.getenv("CHECKPOINT_BACKEND", "sqlite"))
+    sqlite_path: str = Field(default_factory=lambda: os.getenv("CHECKPOINT_SQLITE_PATH", "data/checkpoints.db"))
+    max_messages: int = Field(default_factory=lambda: int(os.getenv("CHECKPOINT_MAX_MESSAGES", "20")))
+    keep_messages: int = Field(default_factory=lambda: int(os.getenv("CHECKPOINT_KEEP_MESSAGES", "8")))
+    summarize: bool = Field(default_factory=lambda: os.getenv("CHECKPOINT_SUMMARIZE", "False").lower() == "true")
+
+    class Config:
+        extra = "allow"
+
+
+class TokenBudgetConfig(BaseModel):
+    """Prompt token budget configuration"""
+    enabled: bool = Field(default_factory=lambda: os.getenv("TOKEN_BUDGET_ENABLED", "True").lower() == "true")
+    max_input_tokens: int = Field(default_factory=lambda: int(os.getenv("TOKEN_BUDGET_MAX_INPUT", "6000")))
+    max_tool_tokens: int = Field(default_factory=lambda: int(os.getenv("TOKEN_BUDGET_MAX_TOOL_OUTPUT", "1000")))
+    old_tool_tokens: int = Field(default_factory=lambda: int(os.getenv("TOKEN_BUDGET_OLD_TOOL_OUTPUT", "120")))
+    tokenizer_path: str = Field(default_factory=lambda: os.getenv("TOKENIZER_PATH", "data/tokenizer.json"))
+
+    class Config:
+        extra = "allow"
+
+
+def _parse_timeouts(value: str) -> Dict[str, float]:
+    """Parse "tool=seconds,tool=seconds" into a dict"""
+    timeouts = {}
+    for item in value.split(","):
+        if "=" in item:
+            name, seconds = item.split("=", 1)
+            timeouts[name.strip()] = float(seconds)
+    return timeouts
+
+
+class ToolExecutorConfig(BaseModel):
+    """Concurrent tool execution configuration"""
+    max_workers: int = Field(default_factory=lambda: int(os.getenv("TOOL_EXECUTOR_MAX_WORKERS", "8")))
+    timeout: float = Field(default_factory=lambda: float(os.getenv("TOOL_TIMEOUT_SECONDS", "10")))
+    tool_timeouts: Dict[str, float] = Field(default_factory=lambda: _parse_timeouts(os.getenv("TOOL_TIMEOUTS", "get_real_time_search=8")))
+
+    class Config:
+        extra = "allow"
+
+
+def _parse_levels(value: str) -> Dict[str, str]:
+    """Parse "module=LEVEL,module=LEVEL" into a dict"""
+    levels = {}
+    for item in value.split(","):
+        if "=" in item:
+            name, level = item.split("=", 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+class LoggingConfig(BaseModel):
+    """Log levels, format, rotation, and the queue that keeps log I/O off request threads"""
+    level: str = Field(default_factory=lambda: os.getenv("LOG_LEVEL", "DEBUG").upper())
+    # Per-module overrides, e.g. "app.services.workflow=INFO,httpx=WARNING"
+    module_levels: Dict[str, str] = Field(default_factory=lambda: _parse_levels(os.getenv("LOG_MODULE_LEVELS", "httpx=WARNING,httpcore=WARNING")))
+    # Records are handed to a background thread that does the formatting and I/O
+    queue: bool = Field(default_factory=lambda: os.getenv("LOG_QUEUE", "True").lower() == "true")
+    queue_size: int = Field(default_factory=lambda: int(os.getenv("LOG_QUEUE_SIZE", "10000")))
+    # text or json
+    console_format: str = Field(default_factory=lambda: os.getenv("LOG_CONSOLE_FORMAT", "text"))
+    file_format: str = Field(default_factory=lambda: os.getenv("LOG_FILE_FORMAT", "json"))
+    log_dir: str = Field(default_factory=lambda: os.getenv("LOG_DIR", "logs"))
+    file_name: str = Field(default_factory=lambda: os.getenv("LOG_FILE", "app.log"))
+    # size: roll over at max_bytes; time: roll over at rotate_when (see TimedRotatingFileHandler)
+    rotation: str = Field(default_factory=lambda: os.getenv("LOG_ROTATION", "size"))
+    max_bytes: int = Field(default_factory=lambda: int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024))))
+    rotate_when: str = Field(default_factory=lambda: os.getenv("LOG_ROTATE_WHEN", "midnight"))
+    backup_count: int = Field(default_factory=lambda: int(os.getenv("LOG_BACKUP_COUNT", "7")))
+    # Keep the first and then every Nth DEBUG record of each log call site; 1 keeps them all
+    debug_sample_every: int = Field(default_factory=lambda: int(os.getenv("LOG_DEBUG_SAMPLE_EVERY", "1")))
+
+    class Config:
+        extra = "allow"
+
+
+class TracingConfig(BaseModel):
+    """Span tracing of graph nodes and tools, and where finished spans are exported"""
+    enabled: bool = Field(default_factory=lambda: os.getenv("TRACING_ENABLED", "True").lower() == "true")
+    # Comma separated: none, console, file, otlp (otlp needs opentelemetry-sdk and opentelemetry-exporter-otlp)
+    exporters: List[str] = Field(default_factory=lambda: os.getenv("TRACING_EXPORTERS", "none").split(","))
+    file_path: str = Field(default_factory=lambda: os.getenv("TRACING_FILE_PATH", "logs/traces.jsonl"))
+    service_name: str = Field(default_factory=lambda: os.getenv("OTEL_SERVICE_NAME", "cashify-chatbot"))
+    # Empty uses the OTLP exporter's own default (OTEL_EXPORTER_OTLP_* variables, then localhost:4318)
+    otlp_endpoint: str = Field(default_factory=lambda: os.getenv("TRACING_OTLP_ENDPOINT", ""))
+
+    class Config:
+        extra = "allow"
+
+
+class AdmissionConfig(BaseModel):
+    """Admission control in front of /chat: concurrency limit, bounded fair queue and load shedding, per worker"""
+    enabled: bool = Field(default_factory=lambda: os.getenv("ADMISSION_ENABLED", "True").lower() == "true")
+    max_in_flight: int = Field(default_factory=lambda: int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "16")))
+    max_queue: int = Field(default_factory=lambda: int(os.getenv("ADMISSION_MAX_QUEUE", "64")))
+    # One client key may hold at most this many queued requests; more get a 429
+    max_queue_per_key: int = Field(default_factory=lambda: int(os.getenv("ADMISSION_MAX_QUEUE_PER_KEY", "16")))
+    # Longest a request waits for a slot; clients can ask for less with an X-Request-Timeout header
+    queue_timeout: float = Field(default_factory=lambda: float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "10")))
+    # Initial guess of a request's duration, refined as requests complete; drives the wait estimate
+    service_time: float = Field(default_factory=lambda: float(os.getenv("ADMISSION_SERVICE_TIME", "3")))
+
+    class Config:
+        extra = "allow"
+
+
+class ServerConfig(BaseModel):
+    """Production server: a gunicorn master forking uvicorn workers (``python -m api.server``)"""
+    host: str = Field(default_factory=lambda: os.getenv("SERVER_HOST", "0.0.0.0"))
+    port: int = Field(default_factory=lambda: int(os.getenv("SERVER_PORT", "8000")))
+    workers: int = Field(default_factory=lambda: int(os.getenv("WEB_CONCURRENCY", "2")))
+    # Build the graph, LLM clients and data store once in the master; workers share them copy-on-write
+    preload: bool = Field(default_factory=lambda: os.getenv("SERVER_PRELOAD", "True").lower() == "true")
+    # Seconds a stopping worker keeps serving in-flight requests and streams before they are cancelled
+    graceful_timeout: int = Field(default_factory=lambda: int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30")))
+    # A worker silent for this long is restarted by the master
+    timeout: int = Field(default_factory=lambda: int(os.getenv("SERVER_TIMEOUT", "120")))
+    keepalive: int = Field(default_factory=lambda: int(os.getenv("SERVER_KEEPALIVE", "5")))
+    # Recycle a worker after this many requests (0 never), jittered so they do not restart together
+    max_requests: int = Field(default_factory=lambda: int(os.getenv("SERVER_MAX_REQUESTS", "0")))
+    max_requests_jitter: int = Field(default_factory=lambda: int(os.getenv("SERVER_MAX_REQUESTS_JITTER", "0")))
+    # Each worker sends one tiny request per LLM role before reporting ready, so the first user skips the TLS handshake
+    warmup_llm: bool = Field(default_factory=lambda: os.getenv("SERVER_WARMUP_LLM", "False").lower() == "true")
 
     class Config:
         extra = "allow"
@@ -36,10 +319,28 @@ class Settings(BaseSettings):
     app_description: str = "AI Agentic Chatbot for Cashify's Customers"
     debug: bool = Field(default_factory=lambda: os.getenv("DEBUG", "False").lower() == "true")
     api_key_name: str = "x-api-key"
+    # Comma separated to give each client its own key, which admission control queues fairly
     api_key: str = Field(default_factory=lambda: os.getenv("API_AUTH_KEY", ""))
     
     groq: GROQConfig = Field(default_factory=GROQConfig)
+    llm_client: LLMClientConfig = Field(default_factory=LLMClientConfig)
+    models: ModelProfilesConfig = Field(default_factory=ModelProfilesConfig)
+    reasoning: ReasoningConfig = Field(default_factory=ReasoningConfig)
     local_data: LocalData = Field(default_factory=LocalData)
+    search: SearchConfig = Field(default_factory=SearchConfig)
+    search_rate_limit: SearchRateLimitConfig = Field(default_factory=SearchRateLimitConfig)
+    workflow: WorkflowConfig = Field(default_factory=WorkflowConfig)
+    router: RouterConfig = Field(default_factory=RouterConfig)
+    cache: CacheConfig = Field(default_factory=CacheConfig)
+    history: HistoryConfig = Field(default_factory=HistoryConfig)
+    session: SessionConfig = Field(default_factory=SessionConfig)
+    checkpoint: CheckpointConfig = Field(default_factory=CheckpointConfig)
+    tokens: TokenBudgetConfig = Field(default_factory=TokenBudgetConfig)
+    tool_executor: ToolExecutorConfig = Field(default_factory=ToolExecutorConfig)
+    tracing: TracingConfig = Field(default_factory=TracingConfig)
+    logging: LoggingConfig = Field(default_factory=LoggingConfig)
+    server: ServerConfig = Field(default_factory=ServerConfig)
+    admission: AdmissionConfig = Field(default_factory=AdmissionConfig)
     
     class Config:
         extra = "allow"
@@ -69,7 +370,92 @@ def get_groq_config() -> GROQConfig:
     return get_settings().groq
 
 
+def get_llm_client_config() -> LLMClientConfig:
+    """Get shared LLM HTTP client configuration"""
+    return get_settings().llm_client
+
+
+def get_model_profiles_config() -> ModelProfilesConfig:
+    """Get per-role model profiles"""
+    return get_settings().models
+
+
+def get_reasoning_config() -> ReasoningConfig:
+    """Get reasoning suppression configuration"""
+    return get_settings().reasoning
+
+
 def get_local_data_config() -> LocalData:
     """Get local data configuration"""
     return get_settings().local_data
 
+
+def get_search_config() -> SearchConfig:
+    """Get real-time search configuration"""
+    return get_settings().search
+
+
+def get_search_rate_limit_config() -> SearchRateLimitConfig:
+    """Get real-time search rate limit configuration"""
+    return get_settings().search_rate_limit
+
+
+def get_workflow_config() -> WorkflowConfig:
+    """Get graph variant configuration"""
+    return get_settings().workflow
+
+
+def get_router_config() -> RouterConfig:
+    """Get pre-router configuration"""
+    return get_settings().router
+
+
+def get_cache_config() -> CacheConfig:
+    """Get response cache configuration"""
+    return get_settings().cache
+
+
+def get_history_config() -> HistoryConfig:
+    """Get chat history log configuration"""
+    return get_settings().history
+
+
+def get_session_config() -> SessionConfig:
+    """Get session memory configuration"""
+    return get_settings().session
+
+
+
+def get_checkpoint_config() -> CheckpointConfig:
+    """Get graph checkpointer configuration"""
+    return get_settings().checkpoint
+
+
+def get_token_budget_config() -> TokenBudgetConfig:
+    """Get prompt token budget configuration"""
+    return get_settings().tokens
+
+
+def get_tool_executor_config() -> ToolExecutorConfig:
+    """Get concurrent tool executor configuration"""
+    return get_settings().tool_executor
+
+
+def get_tracing_config() -> TracingConfig:
+    """Get span tracing configuration"""
+    return get_settings().tracing
+
+
+def get_logging_config() -> LoggingConfig:
+    """Get logging pipeline configuration"""
+    return get_settings().logging
+
+
+def get_server_config() -> ServerConfig:
+    """Get production server configuration"""
+    return get_settings().server
+
+
+def get_admission_config() -> AdmissionConfig:
+    """Get admission control configuration"""
+    return get_settings().admission
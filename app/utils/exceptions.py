@@ -17,4 +17,11 @@ class ProcessingError(Exception):
     """Exception raised during processing failures"""
     def __init__(self, message: str):
         self.message = message
-        super().__init__(self.message)
\ No newline at end of file
+        super().__init__(self.message)
+
+class RateLimitExceeded(Exception):
+    """Exception raised when a rate limit cannot be satisfied within the allowed wait"""
+    def __init__(self, message: str, retry_after: float):
+        self.message = message
+        self.retry_after = retry_after
+        super().__init__(self.message)
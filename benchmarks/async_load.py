@@ -0,0 +1,84 @@
+"""
+Load benchmark for the /chat request path against a stub LLM.
+
+Runs the same batch of queries three ways:
+  * serial     - one sync process_query_with_context after another
+  * blocking   - concurrent coroutines that call the sync path (the old endpoint)
+  * async      - concurrent aprocess_query_with_context (the new endpoint)
+
+With a working async path the "async" wall time stays close to a single query
+while the other two grow linearly with the number of clients.
+
+Usage:
+    python -m benchmarks.async_load --clients 20 --latency 0.2
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("GROQ_API_KEY", "stub")
+
+from app.core.tools import AVAILABLE_TOOLS
+from app.services.workflow import WorkflowOrchestrator
+from benchmarks.stub_llm import StubChatModel
+
+
+QUERIES = [
+    "Where is my order?",
+    "What is Cashify?",
+    "मेरा ऑर्डर कहाँ है?",
+    "Tell me about selling my old phone",
+]
+
+
+def build_orchestrator(latency: float) -> WorkflowOrchestrator:
+    llm = StubChatModel(latency=latency)
+    return WorkflowOrchestrator(llm, llm.bind_tools(AVAILABLE_TOOLS), AVAILABLE_TOOLS)
+
+
+def run_serial(orchestrator: WorkflowOrchestrator, queries) -> float:
+    start = time.perf_counter()
+    for query in queries:
+        orchestrator.process_query_with_context(query)
+    return time.perf_counter() - start
+
+
+async def run_blocking(orchestrator: WorkflowOrchestrator, queries) -> float:
+    async def handler(query):
+        return orchestrator.process_query_with_context(query)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(handler(q) for q in queries))
+    return time.perf_counter() - start
+
+
+async def run_async(orchestrator: WorkflowOrchestrator, queries) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(orchestrator.aprocess_query_with_context(q) for q in queries))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=20, help="concurrent requests per run")
+    parser.add_argument("--latency", type=float, default=0.2, help="stub LLM latency per call in seconds")
+    args = parser.parse_args()
+
+    orchestrator = build_orchestrator(args.latency)
+    queries = [QUERIES[i % len(QUERIES)] for i in range(args.clients)]
+
+    single = run_serial(orchestrator, queries[:1])
+    serial = run_serial(orchestrator, queries)
+    blocking = asyncio.run(run_blocking(orchestrator, queries))
+    concurrent = asyncio.run(run_async(orchestrator, queries))
+
+    print(f"clients={args.clients} stub_latency={args.latency:.3f}s single_query={single:.3f}s")
+    print(f"{'mode':<10} {'wall (s)':>10} {'req/s':>10} {'overlap':>10}")
+    for name, wall in (("serial", serial), ("blocking", blocking), ("async", concurrent)):
+        overlap = serial / wall if wall else 0.0
+        print(f"{name:<10} {wall:>10.3f} {args.clients / wall:>10.1f} {overlap:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Microbenchmark for tool data access: per-call file read + json.loads (the old
+read_file path) versus the in-memory DataStore.
+
+Usage:
+    python -m benchmarks.data_store --calls 20000
+"""
+import argparse
+import json
+import os
+import timeit
+
+os.environ.setdefault("GROQ_API_KEY", "stub")
+
+from app.core.data_store import DataStore
+from app.core.tools import get_data_dir, get_order_tracking, get_trending_product
+
+
+FILES = ["trending_products.json", "order_tracking.json", "last_purchase.json", "points.json"]
+
+
+def legacy_read_json(filename: str):
+    """The per-call path tools used before DataStore"""
+    data_dir = get_data_dir()
+    with open(os.path.join(data_dir, filename), 'r', encoding='utf-8') as f:
+        return json.loads(f.read())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20000, help="lookups per measurement")
+    args = parser.parse_args()
+
+    store = DataStore(get_data_dir())
+    store.preload(FILES)
+    stat_every_call = DataStore(get_data_dir(), check_interval=0)
+    stat_every_call.preload(FILES)
+
+    print(f"{'file':<24} {'legacy (us)':>12} {'store (us)':>12} {'store+stat (us)':>16}")
+    for filename in FILES:
+        legacy = timeit.timeit(lambda: legacy_read_json(filename), number=args.calls) / args.calls
+        cached = timeit.timeit(lambda: store.get_json(filename), number=args.calls) / args.calls
+        stat = timeit.timeit(lambda: stat_every_call.get_json(filename), number=args.calls) / args.calls
+        print(f"{filename:<24} {legacy * 1e6:>12.2f} {cached * 1e6:>12.2f} {stat * 1e6:>16.2f}")
+
+    calls = max(args.calls // 10, 1)
+    for tool in (get_trending_product, get_order_tracking):
+        per_call = timeit.timeit(lambda: tool.invoke({}), number=calls) / calls
+        print(f"tool {tool.name:<19} {per_call * 1e6:>12.2f} us per invoke (served from DataStore)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Latency benchmark for direct tool dispatch on the most common query types.
+
+Runs each query through WorkflowOrchestrator with direct answers disabled,
+enabled, and enabled with the LLM polish pass, against a stub LLM with a
+fixed per-call latency, and prints p50/p95 per mode.
+
+Usage:
+    python -m benchmarks.direct_answer --latency 0.8 --rounds 5
+"""
+import argparse
+import os
+import statistics
+import time
+
+os.environ.setdefault("GROQ_API_KEY", "stub")
+
+from app.core.tools import AVAILABLE_TOOLS
+from app.services.workflow import WorkflowOrchestrator
+from app.utils.config import get_router_config
+from benchmarks.stub_llm import StubChatModel
+
+
+QUERIES = [
+    "Where is my order?",
+    "मेरा ऑर्डर कहाँ है?",
+    "How many coins do I have?",
+    "Show me trending products",
+    "What did I buy last time?",
+]
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * pct), len(ordered) - 1)]
+
+
+def measure(direct_answer: bool, polish: bool, latency: float, rounds: int):
+    llm = StubChatModel(latency=latency)
+    config = get_router_config().model_copy(update={"direct_answer": direct_answer, "direct_answer_polish": polish})
+    orchestrator = WorkflowOrchestrator(llm, llm.bind_tools(AVAILABLE_TOOLS), AVAILABLE_TOOLS, router_config=config)
+
+    samples = []
+    for _ in range(rounds):
+        for query in QUERIES:
+            start = time.perf_counter()
+            orchestrator.process_query_with_context(query)
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.8, help="stub LLM latency per call in seconds")
+    parser.add_argument("--rounds", type=int, default=3, help="passes over the query set")
+    args = parser.parse_args()
+
+    print(f"{'mode':<16} {'p50 (ms)':>10} {'p95 (ms)':>10} {'mean (ms)':>10}")
+    for name, direct, polish in (("llm tool turn", False, False), ("direct", True, False), ("direct + polish", True, True)):
+        samples = measure(direct, polish, args.latency, args.rounds)
+        print(f"{name:<16} {percentile(samples, 0.5) * 1000:>10.1f} "
+              f"{percentile(samples, 0.95) * 1000:>10.1f} {statistics.mean(samples) * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
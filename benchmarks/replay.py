@@ -0,0 +1,370 @@
+"""
+Offline replay benchmark for the whole graph.
+
+Replays a corpus of chat turns (benchmarks/corpus/replay.jsonl: English and
+Hindi, on- and off-topic) through WorkflowOrchestrator against the stub chat
+model. The stub answers from the corpus script, so every run makes the same
+judge decisions and tool calls, and sleeps for a latency drawn from a seeded
+distribution. Searches go to the offline stub backend with the cache off.
+
+Reported, per workflow mode:
+  * per-node latency (p50 / p95 / mean) and end-to-end latency
+  * LLM calls and tool calls per query, and accuracy against the expected label
+  * throughput and latency at N concurrent clients
+  * memory allocated per query (tracemalloc peak) and retained after the corpus
+
+``--output`` writes the report as JSON; ``--baseline`` compares against a
+previous report and exits with status 1 when a metric regressed: the LLM and
+tool call counts and the accuracy on any change, end-to-end latency and
+allocations when worse by more than ``--tolerance`` and by more than a few ms
+or KB, and throughput only with ``--gate-throughput``. The corpus may also be a chat history file (JSON array or
+JSON lines of {"timestamp", "user", "bot"}); turns without an "expected"
+label are answered by the keyword stub and left out of the accuracy.
+
+Usage:
+    python -m benchmarks.replay
+    python -m benchmarks.replay --mode single_pass --distribution lognormal --spread 0.5
+    python -m benchmarks.replay --baseline benchmarks/fixtures/replay_baseline.json
+    python -m benchmarks.replay --output benchmarks/fixtures/replay_baseline.json   # refresh the baseline
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Any, Dict, List
+
+os.environ.setdefault("GROQ_API_KEY", "stub")
+# Searches stay offline and uncached so every run does the same work
+os.environ.setdefault("SEARCH_BACKEND", "stub")
+os.environ.setdefault("SEARCH_CACHE_ENABLED", "false")
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import ToolMessage
+
+from app.core.llm import llm_registry
+from app.core.tools import AVAILABLE_TOOLS
+from app.services.workflow import WORKFLOW_MODES, WorkflowOrchestrator
+from app.utils.config import get_router_config, get_workflow_config
+from benchmarks.stub_llm import ScriptedResponder, StubChatModel
+
+
+CORPUS = os.path.join(os.path.dirname(__file__), "corpus", "replay.jsonl")
+
+# Metrics where a higher value is a regression; throughput and accuracy regress when they drop
+HIGHER_IS_WORSE = ("mean_ms", "p95_ms", "llm_calls_per_query", "tool_calls_per_query", "peak_kb_p50", "retained_kb")
+LOWER_IS_WORSE = ("accuracy", "qps")
+# Fixed by the corpus and the stub's script, so any change is real and no tolerance applies
+DETERMINISTIC = ("llm_calls_per_query", "tool_calls_per_query", "accuracy")
+# Timings and allocations jitter between clean runs; a change smaller than this is noise whatever its ratio
+NOISE_FLOORS = {"mean_ms": 5.0, "p95_ms": 5.0, "qps": 2.0, "peak_kb_p50": 32.0, "retained_kb": 32.0}
+
+
+class NodeTimer(BaseCallbackHandler):
+    """Per-node wall time and LLM calls of the graph runs it is attached to"""
+
+    def __init__(self):
+        self.nodes: Dict[str, List[float]] = defaultdict(list)
+        self.llm_calls = 0
+        self._started: Dict[Any, tuple] = {}
+        self._lock = threading.Lock()
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        node = (metadata or {}).get("langgraph_node")
+        # Only the node's own run: not the same-named RunnableLambda inside it, nor LangGraph's __start__
+        if node and kwargs.get("name") == node and not node.startswith("__") and parent_run_id not in self._started:
+            self._started[run_id] = (node, time.perf_counter())
+
+    def _finished(self, run_id):
+        started = self._started.pop(run_id, None)
+        if started:
+            node, start = started
+            with self._lock:
+                self.nodes[node].append(time.perf_counter() - start)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._finished(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._finished(run_id)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        with self._lock:
+            self.llm_calls += 1
+
+
+def load_corpus(path: str) -> List[Dict]:
+    """Chat turns from a JSON lines file or a JSON array, in the chat history format"""
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read().strip()
+    if text.startswith("["):
+        records = json.loads(text)
+    else:
+        records = [json.loads(line) for line in text.splitlines() if line.strip()]
+    return [record for record in records if record.get("user")]
+
+
+def build_orchestrator(corpus: List[Dict], mode: str, router: bool, latency: float, distribution: str,
+                       spread: float, seed: int) -> WorkflowOrchestrator:
+    script = {record["user"]: record for record in corpus if record.get("expected")}
+    llm = StubChatModel(
+        latency=latency, distribution=distribution, spread=spread, seed=seed,
+        responder=ScriptedResponder(script)
+    )
+    # get_real_time_search rewrites queries with the search_rewrite client; hand it the stub before the first search
+    llm_registry.get("search_rewrite", lambda: llm)
+    router_config = get_router_config().model_copy(update={"enabled": router})
+    workflow_config = get_workflow_config().model_copy(update={"mode": mode})
+    return WorkflowOrchestrator(
+        llm, llm.bind_tools(AVAILABLE_TOOLS), AVAILABLE_TOOLS,
+        router_config=router_config, workflow_config=workflow_config
+    )
+
+
+def decision(result) -> str:
+    """REJECT when the turn ended on one of the restricted-topic replies"""
+    return "REJECT" if result["messages"][-1].content.startswith("I am a Cashify Chatbot") else "ACCEPT"
+
+
+async def run_turn(orchestrator: WorkflowOrchestrator, query: str, callbacks=None):
+    config = {"callbacks": callbacks} if callbacks else None
+    return await orchestrator.stateless_workflow.ainvoke(orchestrator._initial_state(query), config)
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "p50_ms": round(statistics.median(ordered) * 1000, 2),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 2),
+        "mean_ms": round(statistics.mean(ordered) * 1000, 2),
+    }
+
+
+async def measure_latency(orchestrator: WorkflowOrchestrator, corpus: List[Dict], rounds: int) -> Dict:
+    """Sequential turns, each under its own NodeTimer"""
+    nodes: Dict[str, List[float]] = defaultdict(list)
+    totals, llm_calls, tool_calls = [], [], []
+    by_lang: Dict[str, List[float]] = defaultdict(list)
+    labelled = correct = 0
+    for _ in range(rounds):
+        for record in corpus:
+            timer = NodeTimer()
+            start = time.perf_counter()
+            result = await run_turn(orchestrator, record["user"], [timer])
+            elapsed = time.perf_counter() - start
+
+            totals.append(elapsed)
+            by_lang[record.get("lang", "unknown")].append(elapsed)
+            llm_calls.append(timer.llm_calls)
+            # ToolMessages count the direct-answer tool runs too, which bypass the tools node
+            tool_calls.append(sum(isinstance(message, ToolMessage) for message in result["messages"]))
+            for node, samples in timer.nodes.items():
+                nodes[node].extend(samples)
+            if record.get("expected"):
+                labelled += 1
+                correct += decision(result) == record["expected"]
+
+    return {
+        "end_to_end": percentiles(totals),
+        "nodes": {node: {"count": len(samples), **percentiles(samples)} for node, samples in sorted(nodes.items())},
+        "by_lang": {lang: percentiles(samples) for lang, samples in sorted(by_lang.items())},
+        "llm_calls_per_query": round(statistics.mean(llm_calls), 3),
+        "tool_calls_per_query": round(statistics.mean(tool_calls), 3),
+        "accuracy": round(correct / labelled, 3) if labelled else None,
+    }
+
+
+async def measure_throughput(orchestrator: WorkflowOrchestrator, corpus: List[Dict], clients: int, rounds: int) -> Dict:
+    """``clients`` workers draining the corpus from a shared queue"""
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(rounds):
+        for record in corpus:
+            queue.put_nowait(record["user"])
+    samples: List[float] = []
+
+    async def client():
+        while not queue.empty():
+            query = queue.get_nowait()
+            start = time.perf_counter()
+            await run_turn(orchestrator, query)
+            samples.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    wall = time.perf_counter() - start
+    return {"queries": len(samples), "wall_s": round(wall, 3), "qps": round(len(samples) / wall, 2), **percentiles(samples)}
+
+
+async def measure_allocations(orchestrator: WorkflowOrchestrator, corpus: List[Dict]) -> Dict:
+    """tracemalloc peak per turn, and what the whole corpus leaves allocated afterwards"""
+    gc.collect()
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    peaks = []
+    for record in corpus:
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        await run_turn(orchestrator, record["user"])
+        peaks.append((tracemalloc.get_traced_memory()[1] - before) / 1024)
+    gc.collect()
+    retained = (tracemalloc.get_traced_memory()[0] - baseline) / 1024
+    tracemalloc.stop()
+    return {
+        "peak_kb_p50": round(statistics.median(peaks), 1),
+        "peak_kb_max": round(max(peaks), 1),
+        "retained_kb": round(retained, 1),
+    }
+
+
+async def run(args, corpus: List[Dict]) -> Dict:
+    orchestrator = build_orchestrator(
+        corpus, args.mode, not args.no_router, args.latency, args.distribution, args.spread, args.seed
+    )
+    # One untimed pass so imports, graph compilation and first-use caches stay out of the numbers
+    for record in corpus:
+        await run_turn(orchestrator, record["user"])
+
+    report = {
+        "config": {
+            "mode": args.mode,
+            "router": not args.no_router,
+            "corpus": os.path.relpath(args.corpus),
+            "queries": len(corpus),
+            "rounds": args.rounds,
+            "latency": args.latency,
+            "distribution": args.distribution,
+            "spread": args.spread,
+            "seed": args.seed,
+            "python": sys.version.split()[0],
+        },
+        "latency": await measure_latency(orchestrator, corpus, args.rounds),
+        "throughput": {
+            str(clients): await measure_throughput(orchestrator, corpus, clients, args.rounds)
+            for clients in args.clients
+        },
+    }
+    if not args.no_allocations:
+        report["allocations"] = await measure_allocations(orchestrator, corpus)
+    return report
+
+
+def _metrics(report: Dict) -> Dict[str, float]:
+    """
+    The flat set of compared metrics, named by their path in the report.
+    Per-node timings and the end-to-end median are left out: over a corpus
+    this size they flip between clean runs (the median sits between the
+    direct answers and the LLM round trips), so they are reported only.
+    """
+    latency = report["latency"]
+    metrics = {
+        "latency.end_to_end.mean_ms": latency["end_to_end"]["mean_ms"],
+        "latency.end_to_end.p95_ms": latency["end_to_end"]["p95_ms"],
+        "latency.llm_calls_per_query": latency["llm_calls_per_query"],
+        "latency.tool_calls_per_query": latency["tool_calls_per_query"],
+        "latency.accuracy": latency["accuracy"],
+    }
+    for clients, stats in report["throughput"].items():
+        metrics[f"throughput.{clients}.qps"] = stats["qps"]
+        metrics[f"throughput.{clients}.p95_ms"] = stats["p95_ms"]
+    for name, value in report.get("allocations", {}).items():
+        metrics[f"allocations.{name}"] = value
+    return {name: value for name, value in metrics.items() if value is not None}
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float, throughput: bool = False) -> List[str]:
+    """
+    Metrics that got worse than the baseline. Deterministic counts regress on
+    any change; measured ones only when worse by more than ``tolerance`` (a
+    fraction) and by more than their NOISE_FLOORS entry. Concurrent throughput
+    swings with the host's load, so it is only checked when ``throughput`` is set.
+    """
+    regressions = []
+    current = _metrics(report)
+    for name, before in _metrics(baseline).items():
+        after = current.get(name)
+        if after is None or (name.startswith("throughput.") and not throughput):
+            continue
+        metric = name.rsplit(".", 1)[-1]
+        allowed = 0.0 if metric in DETERMINISTIC else tolerance
+        floor = NOISE_FLOORS.get(metric, 0.0)
+        if metric in HIGHER_IS_WORSE and after - before > max(before * allowed, floor, 1e-9):
+            regressions.append(f"{name}: {before} -> {after}")
+        elif metric in LOWER_IS_WORSE and before - after > max(before * allowed, floor, 1e-9):
+            regressions.append(f"{name}: {before} -> {after}")
+    return regressions
+
+
+def print_report(report: Dict):
+    config, latency = report["config"], report["latency"]
+    print(f"mode={config['mode']} router={config['router']} queries={config['queries']}x{config['rounds']} "
+          f"stub latency={config['latency']}s ({config['distribution']}, spread {config['spread']})")
+
+    print(f"\n{'node':<14} {'count':>6} {'p50 (ms)':>10} {'p95 (ms)':>10} {'mean (ms)':>10}")
+    for node, stats in [*latency["nodes"].items(), ("end_to_end", latency["end_to_end"])]:
+        print(f"{node:<14} {stats.get('count', ''):>6} {stats['p50_ms']:>10.1f} {stats['p95_ms']:>10.1f} {stats['mean_ms']:>10.1f}")
+    for lang, stats in latency["by_lang"].items():
+        print(f"{'  ' + lang:<14} {'':>6} {stats['p50_ms']:>10.1f} {stats['p95_ms']:>10.1f} {stats['mean_ms']:>10.1f}")
+
+    accuracy = "n/a" if latency["accuracy"] is None else f"{latency['accuracy']:.1%}"
+    print(f"\nLLM calls/query {latency['llm_calls_per_query']:.2f}  tool calls/query "
+          f"{latency['tool_calls_per_query']:.2f}  accuracy {accuracy}")
+
+    print(f"\n{'clients':>7} {'queries':>8} {'wall (s)':>9} {'req/s':>8} {'p50 (ms)':>10} {'p95 (ms)':>10}")
+    for clients, stats in report["throughput"].items():
+        print(f"{clients:>7} {stats['queries']:>8} {stats['wall_s']:>9.2f} {stats['qps']:>8.1f} "
+              f"{stats['p50_ms']:>10.1f} {stats['p95_ms']:>10.1f}")
+
+    if "allocations" in report:
+        allocations = report["allocations"]
+        print(f"\nallocated per query: p50 {allocations['peak_kb_p50']:.0f} KB, max {allocations['peak_kb_max']:.0f} KB; "
+              f"retained after corpus: {allocations['retained_kb']:.0f} KB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=CORPUS, help="chat turns to replay (JSON lines or JSON array)")
+    parser.add_argument("--mode", default="strict", choices=WORKFLOW_MODES, help="graph variant")
+    parser.add_argument("--no-router", action="store_true", help="send every query to the LLM validator")
+    parser.add_argument("--latency", type=float, default=0.05, help="stub LLM latency per call (median) in seconds")
+    parser.add_argument("--distribution", default="lognormal", choices=("fixed", "uniform", "lognormal"),
+                        help="stub LLM latency distribution")
+    parser.add_argument("--spread", type=float, default=0.3, help="uniform half-width in seconds, or lognormal sigma")
+    parser.add_argument("--seed", type=int, default=7, help="latency RNG seed")
+    parser.add_argument("--rounds", type=int, default=1, help="passes over the corpus per measurement")
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 4, 16], help="concurrency levels for throughput")
+    parser.add_argument("--no-allocations", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--output", help="write the report as JSON to this path")
+    parser.add_argument("--baseline", help="previous JSON report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression against the baseline")
+    parser.add_argument("--gate-throughput", action="store_true",
+                        help="also fail on throughput regressions (only meaningful on a quiet, dedicated host)")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args, load_corpus(args.corpus)))
+    print_report(report)
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nWrote {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(report, json.load(f), args.tolerance, args.gate_throughput)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {args.baseline} (tolerance {args.tolerance:.0%}):")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
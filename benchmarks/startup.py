@@ -0,0 +1,126 @@
+"""
+Cold start profile for the API (or any module).
+
+Imports the module in a fresh interpreter under ``python -X importtime`` and
+prints the slowest imports by self and cumulative time, plus the totals per
+top-level package. Then it starts the FastAPI app in another fresh interpreter
+and times each startup phase: the import, the startup hooks (chatbot service and
+graph), the first /health response and, unless --no-chat is given, the first /chat response.
+With --stub-llm the first /chat answers from the offline stub model, so no
+Groq call is made.
+
+Usage:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --module app.services.chatbot --top 25 --no-chat
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    entries = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append({
+                "module": module,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+                "depth": (len(indent) - 1) // 2,
+            })
+    return entries
+
+
+def profile_imports(module: str) -> List[Dict]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=os.environ.copy()
+    )
+    if result.returncode != 0:
+        sys.exit(f"import {module} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def print_import_report(module: str, entries: List[Dict], top: int):
+    total = next((entry["cumulative_ms"] for entry in reversed(entries) if entry["module"] == module), 0.0)
+    print(f"import {module}: {total:.1f} ms, {len(entries)} modules\n")
+
+    print(f"{'self (ms)':>10} {'cumul (ms)':>11}  module")
+    for entry in sorted(entries, key=lambda entry: entry["self_ms"], reverse=True)[:top]:
+        print(f"{entry['self_ms']:>10.1f} {entry['cumulative_ms']:>11.1f}  {entry['module']}")
+
+    packages = defaultdict(float)
+    for entry in entries:
+        packages[entry["module"].split(".")[0]] += entry["self_ms"]
+    print(f"\n{'self (ms)':>10}  package")
+    for package, self_ms in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"{self_ms:>10.1f}  {package}")
+
+
+def child(stub_llm: bool, chat: bool):
+    """Runs in the fresh interpreter: start the app and report phase timestamps on stdout"""
+    marks = {"import_start": time.time()}
+    if stub_llm:
+        from app.core.llm import llm_registry
+        from benchmarks.stub_llm import StubChatModel
+        llm_registry.get("groq", lambda: StubChatModel(latency=0.0))
+
+    from api.main import app
+    marks["imported"] = time.time()
+
+    from fastapi.testclient import TestClient
+    with TestClient(app) as client:
+        marks["started"] = time.time()
+        client.get("/health")
+        marks["first_health"] = time.time()
+        if chat:
+            client.post("/chat", json={"message": "Where is my order?"})
+            marks["first_chat"] = time.time()
+    print(json.dumps(marks))
+
+
+def time_to_first_request(stub_llm: bool, chat: bool) -> Dict[str, float]:
+    spawned = time.time()
+    command = [sys.executable, "-m", "benchmarks.startup", "--child"]
+    command += ["--stub-llm"] if stub_llm else []
+    command += [] if chat else ["--no-chat"]
+    result = subprocess.run(command, capture_output=True, text=True, env=os.environ.copy())
+    if result.returncode != 0:
+        sys.exit(f"API startup failed:\n{result.stderr[-2000:]}")
+    marks = json.loads(result.stdout.strip().splitlines()[-1])
+    return {name: (stamp - spawned) * 1000 for name, stamp in marks.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="api.main", help="module to profile the import of")
+    parser.add_argument("--top", type=int, default=15, help="rows per table")
+    parser.add_argument("--stub-llm", action="store_true", help="answer the first /chat with the offline stub model")
+    parser.add_argument("--no-chat", action="store_true", help="stop after the first /health request")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.stub_llm, not args.no_chat)
+        return
+
+    os.environ.setdefault("GROQ_API_KEY", "stub")
+    print_import_report(args.module, profile_imports(args.module), args.top)
+
+    print("\nTime to first request (ms since process spawn)")
+    for phase, elapsed in time_to_first_request(args.stub_llm, not args.no_chat).items():
+        print(f"{phase:<14} {elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
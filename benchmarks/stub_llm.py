@@ -0,0 +1,210 @@
+"""Deterministic stand-in for ChatGroq so the graph can be exercised offline"""
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+
+# Keyword -> tool the stub "chooses" on a tool-selection turn
+TOOL_KEYWORDS = [
+    (("order", "ऑर्डर"), "get_order_tracking"),
+    (("coin", "gift card", "profile", "सिक्के"), "get_personal_profile"),
+    (("trending",), "get_trending_product"),
+    (("buy", "bought", "purchase", "खरीदारी"), "get_last_purchases"),
+]
+
+# Off-topic phrases the stub judge rejects
+REJECT_KEYWORDS = ("suicide", "meaning of life", "परेशान", "recipe", "weather", "cricket", "election", "आत्महत्या")
+
+GREETING = "Cashify can help you buy and sell refurbished gadgets at the best price."
+
+
+def _call_id() -> str:
+    return f"call_{uuid.uuid4().hex[:8]}"
+
+
+def _tool_for(text: str) -> Optional[str]:
+    for keywords, tool_name in TOOL_KEYWORDS:
+        if any(keyword in text for keyword in keywords):
+            return tool_name
+    return None
+
+
+def _single_pass(text: str) -> AIMessage:
+    """SinglePassOutput arguments as the forced structured-output call would return them"""
+    tool_name = _tool_for(text)
+    output = {
+        "decision": "REJECT" if any(keyword in text for keyword in REJECT_KEYWORDS) else "ACCEPT",
+        "tool_calls": [{"name": tool_name, "args": {}}] if tool_name else [],
+        "answer": "" if tool_name else GREETING,
+    }
+    return AIMessage(
+        content="",
+        tool_calls=[{"name": "SinglePassOutput", "args": output, "id": _call_id()}]
+    )
+
+
+def default_responder(messages: List[BaseMessage]) -> AIMessage:
+    """Mimic the judge / single-pass / tool-selection / answer turns of the real model"""
+    system = messages[0].content if messages and isinstance(messages[0], SystemMessage) else ""
+    last = messages[-1]
+
+    if "SinglePassOutput" in system:
+        return _single_pass(str(last.content).lower())
+
+    if "ACCEPT or REJECT" in system:
+        query = str(last.content).lower()
+        return AIMessage(content="REJECT" if any(keyword in query for keyword in REJECT_KEYWORDS) else "ACCEPT")
+
+    if isinstance(last, ToolMessage):
+        return AIMessage(content=f"Here is what I found on Cashify: {last.content[:120]}")
+
+    tool_name = _tool_for(str(last.content).lower())
+    if tool_name:
+        return AIMessage(
+            content="",
+            tool_calls=[{"name": tool_name, "args": {}, "id": _call_id()}]
+        )
+
+    return AIMessage(content=GREETING)
+
+
+class ScriptedResponder:
+    """
+    Answers each query from a script instead of keywords.
+
+    ``script`` maps a user query to its record: ``expected`` (ACCEPT / REJECT)
+    is the judge's and the single-pass decision, ``tool_calls`` are the calls
+    made on the tool-selection turn and ``bot`` is the answer when there are
+    none. Search-term rewrites echo the first words of the question; queries
+    missing from the script fall back to ``default_responder``.
+    """
+
+    def __init__(self, script: Dict[str, Dict]):
+        self.script = script
+
+    @staticmethod
+    def _query(messages: List[BaseMessage]) -> str:
+        for message in reversed(messages):
+            if isinstance(message, HumanMessage):
+                return str(message.content).removeprefix("Query: ").removeprefix("User question: ")
+        return ""
+
+    def _tool_calls(self, record: Dict) -> List[Dict]:
+        return [{"name": call["name"], "args": call.get("args", {}), "id": _call_id()} for call in record.get("tool_calls", [])]
+
+    def __call__(self, messages: List[BaseMessage]) -> AIMessage:
+        system = messages[0].content if messages and isinstance(messages[0], SystemMessage) else ""
+        query = self._query(messages)
+        if "Convert to search terms" in system:
+            return AIMessage(content=" ".join(query.split()[:4]))
+
+        record = self.script.get(query)
+        if record is None:
+            return default_responder(messages)
+
+        if "SinglePassOutput" in system:
+            output = {
+                "decision": record["expected"],
+                "tool_calls": [{"name": call["name"], "args": call["args"]} for call in self._tool_calls(record)],
+                "answer": "" if record.get("tool_calls") else record.get("bot") or GREETING,
+            }
+            return AIMessage(content="", tool_calls=[{"name": "SinglePassOutput", "args": output, "id": _call_id()}])
+
+        if "ACCEPT or REJECT" in system:
+            return AIMessage(content=record["expected"])
+
+        if isinstance(messages[-1], ToolMessage):
+            return default_responder(messages)
+        if record.get("tool_calls"):
+            return AIMessage(content="", tool_calls=self._tool_calls(record))
+        return AIMessage(content=record.get("bot") or GREETING)
+
+
+class StubChatModel(BaseChatModel):
+    """
+    Chat model that sleeps for a latency and answers from a responder function.
+
+    ``distribution`` shapes the latency of each call: "fixed" always sleeps
+    ``latency``, "uniform" draws from latency +/- ``spread`` and "lognormal"
+    has median ``latency`` and log-space sigma ``spread`` (a long right tail,
+    like real API calls). Draws come from an RNG seeded with ``seed``.
+    """
+    latency: float = 0.2
+    responder: Callable[[List[BaseMessage]], AIMessage] = default_responder
+    distribution: str = "fixed"
+    spread: float = 0.0
+    seed: Optional[int] = None
+    _rng: Optional[random.Random] = PrivateAttr(default=None)
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub-chat"
+
+    def _delay(self) -> float:
+        if self.distribution == "fixed" or not self.latency:
+            return self.latency
+        if self._rng is None:
+            self._rng = random.Random(self.seed)
+        if self.distribution == "uniform":
+            return max(0.0, self._rng.uniform(self.latency - self.spread, self.latency + self.spread))
+        if self.distribution == "lognormal":
+            return self._rng.lognormvariate(math.log(self.latency), self.spread)
+        raise ValueError(f"Unknown latency distribution '{self.distribution}'")
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        time.sleep(self._delay())
+        return ChatResult(generations=[ChatGeneration(message=self.responder(messages))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self._delay())
+        return ChatResult(generations=[ChatGeneration(message=self.responder(messages))])
+
+    def _chunks(self, message: AIMessage) -> List[ChatGenerationChunk]:
+        words = message.content.split(" ") if message.content else []
+        chunks = [
+            ChatGenerationChunk(message=AIMessageChunk(content=word if i == 0 else f" {word}"))
+            for i, word in enumerate(words)
+        ]
+        if message.tool_calls:
+            chunks.append(ChatGenerationChunk(message=AIMessageChunk(
+                content="",
+                tool_call_chunks=[
+                    {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": i}
+                    for i, call in enumerate(message.tool_calls)
+                ]
+            )))
+        return chunks or [ChatGenerationChunk(message=AIMessageChunk(content=""))]
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Any = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        chunks = self._chunks(self.responder(messages))
+        delay = self._delay()
+        for chunk in chunks:
+            time.sleep(delay / len(chunks))
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager: Any = None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        chunks = self._chunks(self.responder(messages))
+        delay = self._delay()
+        for chunk in chunks:
+            await asyncio.sleep(delay / len(chunks))
+            if run_manager:
+                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "StubChatModel":
+        return self
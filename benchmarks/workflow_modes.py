@@ -0,0 +1,228 @@
+"""
+A/B harness comparing the strict (judge + model) and single-pass workflow modes.
+
+Replays recorded LLM responses, with their recorded latencies, through both
+graph variants and reports latency, LLM calls per query, and how often the
+two modes agree on accept/reject (with each other and with the expected
+label of every query). The pre-router and direct answers are disabled so
+every query reaches the LLM validator.
+
+Record fixtures with the offline stub, or against Groq with ``--live``
+(needs GROQ_API_KEY); replay never touches the network:
+
+    python -m benchmarks.workflow_modes --record [--live]
+    python -m benchmarks.workflow_modes
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from typing import Any, Dict, List, Optional
+
+os.environ.setdefault("GROQ_API_KEY", "stub")
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from app.core.tools import AVAILABLE_TOOLS
+from app.services.workflow import WorkflowOrchestrator
+from app.utils.config import get_router_config, get_workflow_config
+from benchmarks.stub_llm import StubChatModel
+
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "workflow_modes.json")
+
+# Modes whose LLM calls happen in a fixed order, so a recording can be replayed call by call
+MODES = ("strict", "single_pass")
+
+# Query, expected decision. Live search is left out so replay needs no search backend
+CORPUS = [
+    ("Where is my order?", "ACCEPT"),
+    ("मेरा ऑर्डर कहाँ है?", "ACCEPT"),
+    ("How many coins do I have in my profile?", "ACCEPT"),
+    ("Show me trending products", "ACCEPT"),
+    ("What did I buy last time?", "ACCEPT"),
+    ("मेरी खरीदारी का इतिहास दिखाओ", "ACCEPT"),
+    ("hello", "ACCEPT"),
+    ("नमस्ते", "ACCEPT"),
+    ("What is the meaning of life?", "REJECT"),
+    ("मैं परेशान हूँ", "REJECT"),
+    ("Give me a recipe for pasta", "REJECT"),
+    ("Who will win the election?", "REJECT"),
+]
+
+
+class CallRecorder(BaseCallbackHandler):
+    """Captures every chat model response of a run along with its latency"""
+
+    def __init__(self):
+        self.calls: List[Dict] = []
+        self._started: Dict[Any, float] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        latency = time.perf_counter() - self._started.pop(run_id, time.perf_counter())
+        message = response.generations[0][0].message
+        self.calls.append({"latency": round(latency, 4), "message": message_to_dict(message)})
+
+
+class ReplayChatModel(BaseChatModel):
+    """Returns a recorded sequence of responses, sleeping for each recorded latency"""
+    script: List[Dict] = []
+    cursor: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay-chat"
+
+    def load(self, script: List[Dict]):
+        self.script = script
+        self.cursor = 0
+
+    def _next(self) -> Dict:
+        if self.cursor >= len(self.script):
+            raise RuntimeError("Replay ran past the recorded responses; re-record the fixtures")
+        call = self.script[self.cursor]
+        self.cursor += 1
+        return call
+
+    def _result(self, call: Dict) -> ChatResult:
+        message = messages_from_dict([call["message"]])[0]
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(**message.model_dump(exclude={"type"})))])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        call = self._next()
+        time.sleep(call["latency"])
+        return self._result(call)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        call = self._next()
+        await asyncio.sleep(call["latency"])
+        return self._result(call)
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "ReplayChatModel":
+        return self
+
+
+def orchestrator(llm, mode: str) -> WorkflowOrchestrator:
+    router_config = get_router_config().model_copy(update={"enabled": False, "direct_answer": False})
+    workflow_config = get_workflow_config().model_copy(update={"mode": mode})
+    return WorkflowOrchestrator(
+        llm, llm.bind_tools(AVAILABLE_TOOLS), AVAILABLE_TOOLS,
+        router_config=router_config, workflow_config=workflow_config
+    )
+
+
+def decision(response) -> str:
+    """REJECT when the turn ended on the canned restricted-topic reply"""
+    return "REJECT" if response.final_response.startswith("I am a Cashify Chatbot") else "ACCEPT"
+
+
+def record(live: bool, latency: float):
+    recorder = CallRecorder()
+    if live:
+        from app.core.llm import LLMinitialize
+        llm = LLMinitialize().get_groq_llm()
+        llm.callbacks = [*(llm.callbacks or []), recorder]
+    else:
+        llm = StubChatModel(latency=latency, callbacks=[recorder])
+
+    runs = {}
+    for mode in MODES:
+        graph = orchestrator(llm, mode)
+        runs[mode] = {}
+        for query, _ in CORPUS:
+            recorder.calls = []
+            response = graph.process_query_with_context(query)
+            runs[mode][query] = {"decision": decision(response), "calls": recorder.calls}
+            print(f"[{mode}] {query} -> {runs[mode][query]['decision']} ({len(recorder.calls)} LLM calls)")
+
+    os.makedirs(os.path.dirname(FIXTURES), exist_ok=True)
+    with open(FIXTURES, 'w', encoding='utf-8') as f:
+        json.dump({
+            "recorded_with": "groq" if live else f"stub ({latency}s per call)",
+            "corpus": [{"query": query, "expected": expected} for query, expected in CORPUS],
+            "runs": runs
+        }, f, ensure_ascii=False, indent=2)
+    print(f"Wrote {FIXTURES}")
+
+
+def replay(rounds: int) -> Dict:
+    with open(FIXTURES, 'r', encoding='utf-8') as f:
+        fixtures = json.load(f)
+
+    llm = ReplayChatModel()
+    report = {"recorded_with": fixtures["recorded_with"], "modes": {}, "agreement": {}}
+    decisions = {}
+    for mode in fixtures["runs"]:
+        graph = orchestrator(llm, mode)
+        samples, calls, correct = [], [], 0
+        decisions[mode] = {}
+        for _ in range(rounds):
+            for item in fixtures["corpus"]:
+                recorded = fixtures["runs"][mode][item["query"]]
+                llm.load(recorded["calls"])
+                start = time.perf_counter()
+                response = graph.process_query_with_context(item["query"])
+                samples.append(time.perf_counter() - start)
+                calls.append(llm.cursor)
+                decisions[mode][item["query"]] = decision(response)
+                correct += decisions[mode][item["query"]] == item["expected"]
+
+        report["modes"][mode] = {
+            "p50_ms": round(statistics.median(samples) * 1000, 1),
+            "mean_ms": round(statistics.mean(samples) * 1000, 1),
+            "llm_calls_per_query": round(statistics.mean(calls), 2),
+            "expected_agreement": round(correct / len(samples), 3),
+        }
+
+    modes = list(decisions)
+    if len(modes) == 2:
+        first, second = (decisions[mode] for mode in modes)
+        disagreements = [query for query in first if first[query] != second.get(query)]
+        report["agreement"] = {
+            "between_modes": round(1 - len(disagreements) / max(len(first), 1), 3),
+            "disagreements": disagreements,
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--record", action="store_true", help="record fresh fixtures instead of replaying them")
+    parser.add_argument("--live", action="store_true", help="record against Groq instead of the offline stub")
+    parser.add_argument("--latency", type=float, default=0.5, help="stub LLM latency per call when recording")
+    parser.add_argument("--rounds", type=int, default=1, help="passes over the corpus when replaying")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.live, args.latency)
+        return
+
+    report = replay(args.rounds)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return
+
+    print(f"Fixtures recorded with {report['recorded_with']}")
+    print(f"{'mode':<12} {'p50 (ms)':>10} {'mean (ms)':>10} {'LLM calls':>10} {'vs expected':>12}")
+    for mode, stats in report["modes"].items():
+        print(f"{mode:<12} {stats['p50_ms']:>10.1f} {stats['mean_ms']:>10.1f} "
+              f"{stats['llm_calls_per_query']:>10.2f} {stats['expected_agreement']:>12.1%}")
+    if report["agreement"]:
+        print(f"accept/reject agreement between modes: {report['agreement']['between_modes']:.1%}")
+        for query in report["agreement"]["disagreements"]:
+            print(f"  disagree: {query}")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,21 +13,14 @@ from contextlib import redirect_stdout
 import time
 import traceback
 import logging
+import json
+import uuid
+import requests
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-try:
-    from app.services.chatbot import CashifyChatbotService
-    from app.models.state import QueryResponses
-    import_strategy = "Direct import successful"
-except ImportError as e:
-    import requests
-    CashifyChatbotService = None
-    QueryResponses = None
-    import_strategy = f"Using FastAPI fallback: {e}"
-
 st.set_page_config(page_title="Cashify AI Assistant", page_icon="🤖", layout="wide")
 
 def get_config():
@@ -56,19 +49,40 @@ if "agent_logs" not in st.session_state:
 if "processing" not in st.session_state:
     st.session_state.processing = False
 
+if "session_id" not in st.session_state:
+    st.session_state.session_id = str(uuid.uuid4())
+
 if "log_container" not in st.session_state:
     st.session_state.log_container = None
 
+@st.cache_resource(show_spinner="Loading the assistant...")
+def get_chatbot():
+    """
+    One chatbot service for all browser sessions; sessions are kept apart by session_id.
+    The graph stack is imported here rather than at the top so the page shell renders first.
+    """
+    try:
+        from app.services.chatbot import CashifyChatbotService
+    except ImportError as e:
+        return None, f"Using FastAPI fallback: {e}"
+    chatbot = CashifyChatbotService()
+    logger.info("✅ Streamlit chatbot initialized successfully")
+    return chatbot, "Direct import successful"
+
+@st.cache_resource
+def get_event_loop():
+    """One background loop for all sessions: the shared async LLM pool keeps its connections bound to it"""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="chatbot-loop", daemon=True).start()
+    return loop
+
 if "chatbot" not in st.session_state:
     try:
-        if CashifyChatbotService:
-            st.session_state.chatbot = CashifyChatbotService()
-            logger.info("✅ Streamlit chatbot initialized successfully")
-        else:
-            st.session_state.chatbot = None
+        st.session_state.chatbot, st.session_state.import_strategy = get_chatbot()
     except Exception as e:
         logger.error(f"❌ Failed to initialize chatbot: {str(e)}")
         st.session_state.chatbot = None
+        st.session_state.import_strategy = f"Using FastAPI fallback: {e}"
 
 class ThreadSafeLogCapture:
     def __init__(self, log_container):
@@ -127,89 +141,125 @@ def format_message_for_display(message) -> str:
     
     return str(message)
 
-def call_fastapi_endpoint(message: str) -> str:
+def iter_api_events(message: str):
+    """Consume the FastAPI /chat/stream Server-Sent Events feed"""
+    api_urls = [
+        "http://api:8000/chat/stream",
+        "http://localhost:8080/chat/stream",
+        "http://127.0.0.1:8080/chat/stream"
+    ]
+    
+    api_key = os.getenv("API_AUTH_KEY", "").split(",")[0].strip()
+    headers = {"x-api-key": api_key} if api_key else {}
+    
+    for url in api_urls:
+        try:
+            payload = {"message": message, "session_id": st.session_state.session_id}
+            with requests.post(url, json=payload, headers=headers, stream=True, timeout=(5, 60)) as response:
+                if response.status_code in (429, 503):
+                    retry_after = response.headers.get("Retry-After", "a few")
+                    yield {"type": "final", "response": f"⏳ The assistant is busy, please try again in {retry_after} seconds"}
+                    return
+                if response.status_code != 200:
+                    continue
+                for line in response.iter_lines(decode_unicode=True):
+                    if line and line.startswith("data: "):
+                        yield json.loads(line[len("data: "):])
+                return
+        except requests.exceptions.RequestException:
+            continue
+    
+    yield {"type": "final", "response": "❌ Could not connect to FastAPI service"}
+
+def iter_local_events(message: str):
+    """Drive the in-process chatbot's async event stream from Streamlit's script thread"""
+    loop = get_event_loop()
+    events = st.session_state.chatbot.astream_chat(message, st.session_state.session_id)
+    
+    async def next_event():
+        try:
+            return await events.__anext__()
+        except StopAsyncIteration:
+            return None
+    
     try:
-        api_urls = [
-            "http://api:8000/chat",
-            "http://localhost:8080/chat",
-            "http://127.0.0.1:8080/chat"
-        ]
-        
-        for url in api_urls:
-            try:
-                response = requests.post(
-                    url,
-                    json={"message": message},
-                    timeout=30
-                )
-                if response.status_code == 200:
-                    return response.json()["response"]
-            except requests.exceptions.RequestException:
-                continue
-        
-        return "❌ Could not connect to FastAPI service"
-        
-    except Exception as e:
-        return f"❌ API call error: {str(e)}"
+        while True:
+            event = asyncio.run_coroutine_threadsafe(next_event(), loop).result()
+            if event is None:
+                break
+            yield event
+    finally:
+        asyncio.run_coroutine_threadsafe(events.aclose(), loop).result()
 
-def run_agent_safe(query, log_capture):
+def shorten(text, limit=100) -> str:
+    text = str(text)
+    return f"{text[:limit]}..." if len(text) > limit else text
+
+def log_agent_event(event, log_capture):
+    """Translate one streamed workflow event into a log panel line"""
+    event_type = event.get("type")
+    
+    if event_type == "node_start":
+        log_capture.write(f"Step ▶️ {event.get('node')}")
+    elif event_type == "node_end" and "route" in event:
+        log_capture.write(f"🧭 PRE-ROUTER: {str(event['route']).upper()} (intent: {event.get('intent')})")
+    elif event_type == "node_end" and "is_valid" in event:
+        decision = "ACCEPT" if event["is_valid"] else "REJECT"
+        log_capture.write(f"⚖️ JUDGE: {decision}")
+    elif event_type == "tool_calls":
+        for tool_call in event.get("tool_calls", []):
+            log_capture.write(f"⚡ CALLING TOOL: {tool_call.get('name', 'unknown')} with args: {tool_call.get('args', {})}")
+    elif event_type == "tool_result":
+        log_capture.write(f"🔧 TOOL RESULT: {shorten(event.get('content', ''))}")
+    elif event_type == "error":
+        log_capture.write(f"❌ ERROR: {event.get('message', '')}")
+
+def run_agent_safe(query, log_capture, response_container=None):
     try:
-        if st.session_state.chatbot:
-            log_capture.write(f"👤 HUMAN: {query}")
-            log_capture.write(f"🔄 AI thinking and processing...")
+        log_capture.write(f"👤 HUMAN: {query}")
+        log_capture.write(f"🔄 AI thinking and processing...")
+        log_capture.update_display_safe()
+        
+        events = iter_local_events(query) if st.session_state.chatbot else iter_api_events(query)
+        
+        streamed_text = ""
+        final_response = ""
+        for event in events:
+            event_type = event.get("type")
             
-            response_obj = st.session_state.chatbot.chat(query)
+            if event_type == "token":
+                streamed_text += event.get("content", "")
+                if response_container:
+                    response_container.markdown(streamed_text)
+                continue
             
-            if hasattr(response_obj, 'final_response') and hasattr(response_obj, 'messages'):
-                final_response = response_obj.final_response
-                
-                # Use the messages from QueryResponses which contains all workflow messages
-                for i, message in enumerate(response_obj.messages):
-                    try:
-                        message_type = type(message).__name__
-                        content = getattr(message, 'content', '')
-                        
-                        if 'HumanMessage' in message_type:
-                            log_capture.write(f"👤 HUMAN: {content}")
-                        elif 'AIMessage' in message_type:
-                            if hasattr(message, 'tool_calls') and message.tool_calls:
-                                log_capture.write(f"🤖 AI: {content[:100]}..." if len(content) > 100 else f"🤖 AI: {content}")
-                                for tool_call in message.tool_calls:
-                                    tool_name = tool_call.get('name', 'unknown')
-                                    tool_args = tool_call.get('args', {})
-                                    log_capture.write(f"⚡ CALLING TOOL: {tool_name} with args: {tool_args}")
-                            else:
-                                log_capture.write(f"🤖 AI: {content[:100]}..." if len(content) > 100 else f"🤖 AI: {content}")
-                        elif 'ToolMessage' in message_type:
-                            if content.startswith("Tool:"):
-                                log_capture.write(f"🔧 {content}")
-                            else:
-                                log_capture.write(f"🔧 TOOL RESULT: {content[:100]}..." if len(content) > 100 else f"🔧 TOOL RESULT: {content}")
-                        else:
-                            log_capture.write(f"📋 {message_type}: {content[:100]}..." if len(content) > 100 else f"📋 {message_type}: {content}")
-                            
-                    except Exception as e:
-                        log_capture.write(f"❌ Error processing message {i}: {str(e)}")
-                
-                log_capture.write(f"✅ FINAL: {final_response[:100]}..." if len(final_response) > 100 else f"✅ FINAL: {final_response}")
-                return final_response if final_response else "I couldn't generate a response."
-            else:
-                return str(response_obj)
-        else:
-            return call_fastapi_endpoint(query)
+            if event_type == "node_start" and event.get("node") == "process":
+                streamed_text = ""
+            
+            if event_type == "final":
+                response = event.get("response")
+                final_response = getattr(response, "final_response", response)
+                final_response = final_response if isinstance(final_response, str) else str(final_response)
+                continue
+            
+            log_agent_event(event, log_capture)
+            log_capture.update_display_safe()
+        
+        log_capture.write(f"✅ FINAL: {shorten(final_response)}")
+        return final_response if final_response else "I couldn't generate a response."
             
     except Exception as e:
         log_capture.write(f"❌ ERROR: {str(e)}")
         logger.error(f"Agent error: {str(e)}")
         return f"Error: {str(e)}"
 
-def run_agent_with_realtime_logs(query, log_container):
+def run_agent_with_realtime_logs(query, log_container, response_container=None):
     log_capture = ThreadSafeLogCapture(log_container)
     
     try:
         log_capture.write(f"🔍 Processing: {query}")
         
-        response = run_agent_safe(query, log_capture)
+        response = run_agent_safe(query, log_capture, response_container)
         
         st.session_state.agent_logs = log_capture.logs
         
@@ -230,13 +280,13 @@ with st.sidebar:
     st.header("🤖 Agent Decision Steps")
     
     with st.expander("🔧 Debug Info"):
-        st.write(f"Import: {import_strategy}")
+        st.write(f"Import: {st.session_state.import_strategy}")
         st.write(f"Chatbot: {st.session_state.chatbot is not None}")
     
     with st.expander("📜 Chat History (Last 5)"):
         if st.session_state.chatbot:
             try:
-                history = st.session_state.chatbot.get_chat_history()
+                history = st.session_state.chatbot.get_chat_history(st.session_state.session_id)
                 if history:
                     for i, chat in enumerate(history):
                         st.text(f"💬 Chat {i+1}: {chat['user'][:30]}...")
@@ -286,7 +336,7 @@ with st.sidebar:
     with col2:
         if st.button("🚪 Exit", use_container_width=True, type="primary"):
             if st.session_state.chatbot:
-                st.session_state.chatbot.clear_chat_history()
+                st.session_state.chatbot.clear_chat_history(st.session_state.session_id)
             st.session_state.messages = []
             st.session_state.agent_logs = []
             st.session_state.processing = False
@@ -309,9 +359,10 @@ if prompt := st.chat_input("Ask me anything ..."):
             st.markdown(prompt)
         
         with st.chat_message("assistant"):
+            response_placeholder = st.empty()
             with st.spinner("Processing..."):
-                response = run_agent_with_realtime_logs(prompt, st.session_state.log_container)
-                st.markdown(response)
+                response = run_agent_with_realtime_logs(prompt, st.session_state.log_container, response_placeholder)
+                response_placeholder.markdown(response)
                 st.session_state.messages.append({"role": "assistant", "content": response})
         
         st.session_state.processing = False
\ No newline at end of file
@@ -0,0 +1,44 @@
+"""
+Test isolation: every file the app writes (chat history, sessions,
+checkpoints, caches, logs) goes to a throwaway directory, never to the
+checked-in data/ files, and every LLM role can be swapped for a stub.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Settings are read once and cached, so the environment is fixed before any app import
+_STATE_DIR = tempfile.mkdtemp(prefix="cashify-tests-")
+os.environ.update({
+    "GROQ_API_KEY": os.environ.get("GROQ_API_KEY", "test-key"),
+    "CHAT_HISTORY_FILE": os.path.join(_STATE_DIR, "chat_history.txt"),
+    "SESSION_SQLITE_PATH": os.path.join(_STATE_DIR, "sessions.db"),
+    "CHECKPOINT_SQLITE_PATH": os.path.join(_STATE_DIR, "checkpoints.db"),
+    "SEARCH_CACHE_PATH": os.path.join(_STATE_DIR, "search.json"),
+    "SEARCH_RATE_SQLITE_PATH": os.path.join(_STATE_DIR, "rate_limits.db"),
+    "SEARCH_BACKEND": "stub",
+    "LOG_DIR": os.path.join(_STATE_DIR, "logs"),
+    "TRACING_EXPORTERS": "none",
+})
+
+
+@pytest.fixture
+def stub_llm():
+    """Every graph role answered by one StubChatModel; the shared workflow is rebuilt around it"""
+    from benchmarks.stub_llm import StubChatModel
+    from app.core.llm import ROLES, llm_registry
+    from app.services.chatbot import get_workflow
+
+    stub = StubChatModel(latency=0)
+    saved = dict(llm_registry._clients)
+    llm_registry._clients.update({role: stub for role in ROLES})
+    get_workflow.cache_clear()
+    yield stub
+    llm_registry._clients.clear()
+    llm_registry._clients.update(saved)
+    get_workflow.cache_clear()
@@ -0,0 +1,31 @@
+import json
+
+from app.services.chatbot import ChatHistoryManager
+
+
+def test_history_is_appended_and_reloaded(tmp_path):
+    path = tmp_path / "history.txt"
+    history = ChatHistoryManager(history_file=str(path), max_history=3, compact_threshold=100)
+    for i in range(5):
+        history.save_query(f"question {i}", f"answer {i}")
+    history.close()
+
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 5
+    reloaded = ChatHistoryManager(history_file=str(path), max_history=3, compact_threshold=100)
+    assert [entry["user"] for entry in reloaded.get_history()] == ["question 2", "question 3", "question 4"]
+
+
+def test_legacy_json_array_is_migrated(tmp_path):
+    path = tmp_path / "history.txt"
+    path.write_text(json.dumps([{"timestamp": "t", "user": "old", "bot": "reply"}]), encoding="utf-8")
+
+    history = ChatHistoryManager(history_file=str(path), max_history=5)
+
+    assert history.get_history()[0]["user"] == "old"
+    assert json.loads(path.read_text(encoding="utf-8").splitlines()[0])["user"] == "old"
+
+
+def test_default_history_file_is_isolated():
+    from app.utils.config import get_history_config
+
+    assert "data/chat_history.txt" not in get_history_config().history_file
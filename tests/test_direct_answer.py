@@ -0,0 +1,66 @@
+import pytest
+from langchain_core.messages import SystemMessage, ToolMessage
+
+from benchmarks.stub_llm import default_responder
+
+
+@pytest.fixture
+def workflow(stub_llm):
+    from app.services.chatbot import get_workflow
+
+    calls = []
+
+    def recording_responder(messages):
+        system = messages[0].content if messages and isinstance(messages[0], SystemMessage) else ""
+        calls.append("judge" if "ACCEPT or REJECT" in system else "model")
+        return default_responder(messages)
+
+    stub_llm.responder = recording_responder
+    orchestrator = get_workflow()
+    orchestrator.calls = calls
+    return orchestrator
+
+
+def _direct_tool_calls(result):
+    return [
+        message for message in result.messages
+        if isinstance(message, ToolMessage) and message.tool_call_id.startswith("direct_")
+    ]
+
+
+def _route(workflow, query):
+    return workflow._route_after_pre_route(workflow._pre_route(workflow._initial_state(query)))
+
+
+@pytest.mark.parametrize("query", ["where is my order", "how many coins do i have", "मेरा ऑर्डर कहाँ है"])
+def test_clear_tool_intents_are_answered_directly(workflow, query):
+    result = workflow.process_query_with_context(query)
+
+    assert _direct_tool_calls(result)
+    assert workflow.calls == []
+
+
+@pytest.mark.parametrize("query", [
+    "Amazon order status",
+    "delivery of a baby at home",
+    "track my weight loss",
+    "coin flip probability",
+    "my account was hacked by someone",
+])
+def test_weak_or_foreign_matches_never_dispatch_directly(workflow, query):
+    assert _route(workflow, query) != "direct_answer"
+
+    result = workflow.process_query_with_context(query)
+
+    assert not _direct_tool_calls(result)
+
+
+@pytest.mark.parametrize("query", ["Amazon order status", "delivery of a baby at home"])
+def test_weak_matches_go_through_the_judge(workflow, query):
+    workflow.process_query_with_context(query)
+
+    assert workflow.calls[0] == "judge"
+
+
+def test_accepted_tool_intent_without_prototype_match_goes_to_judge(workflow):
+    assert _route(workflow, "is the pixel 8 in stock") == "judge"
@@ -0,0 +1,40 @@
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def client(stub_llm):
+    from api.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def _samples(body: str, name: str):
+    return [line for line in body.splitlines() if line.startswith(f"cashify_{name}")]
+
+
+def test_metrics_export_the_search_rate_limiter(client):
+    from app.core.tools import rate_limiter
+
+    rate_limiter.acquire()
+    body = client.get("/metrics").text
+
+    assert 'cashify_rate_limiter_queue_depth{limiter="duckduckgo"} 0' in body
+    assert "# TYPE cashify_rate_limiter_queue_depth gauge" in body
+    for name in ("granted_total", "rejected_total"):
+        assert "# TYPE cashify_rate_limiter_%s counter" % name in body
+        assert _samples(body, f"rate_limiter_{name}")
+    assert f'cashify_rate_limiter_granted_total{{limiter="duckduckgo"}} {rate_limiter.granted}' in body
+    assert _samples(body, "rate_limiter_shared_backlog")
+
+
+def test_metrics_compare_speculation_waste_with_latency_saved(client):
+    from app.services.chatbot import get_workflow
+
+    get_workflow().speculation_stats.record_waste(120, 30)
+    body = client.get("/metrics").text
+
+    assert 'cashify_speculation_wasted_tokens_total{direction="in"} 120' in body
+    assert 'cashify_speculation_wasted_tokens_total{direction="out"} 30' in body
+    assert _samples(body, "speculation_latency_saved_seconds_total")
@@ -0,0 +1,28 @@
+import os
+
+import pytest
+
+from app.core.rate_limiter import SQLiteBucketStore
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork()")
+def test_sqlite_store_reconnects_in_forked_children(tmp_path):
+    store = SQLiteBucketStore(str(tmp_path / "buckets.db"))
+    store.reserve("search", rate=0.01, capacity=2, max_wait=0)
+    parent_conn = store._conn
+
+    pid = os.fork()
+    if pid == 0:
+        # Child: a fresh connection that still sees the parent's bucket
+        try:
+            own = store._conn is not parent_conn
+            wait, granted = store.reserve("search", rate=0.01, capacity=2, max_wait=0)
+            os._exit(0 if own and granted and wait == 0 else 1)
+        except BaseException:
+            os._exit(2)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    # Both reservations came out of the one shared bucket
+    assert store.reserve("search", rate=0.01, capacity=2, max_wait=0)[1] is False
+    store.close()
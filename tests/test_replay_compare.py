@@ -0,0 +1,55 @@
+import copy
+
+from benchmarks.replay import compare
+
+
+BASELINE = {
+    "latency": {
+        "end_to_end": {"p50_ms": 40.0, "p95_ms": 230.0, "mean_ms": 80.0},
+        "nodes": {"pre_route": {"p50_ms": 0.9}},
+        "llm_calls_per_query": 0.917,
+        "tool_calls_per_query": 0.583,
+        "accuracy": 1.0,
+    },
+    "throughput": {"4": {"qps": 48.0, "p95_ms": 230.0}},
+    "allocations": {"peak_kb_p50": 52.0, "retained_kb": 8.0},
+}
+
+
+def _rerun(**changes):
+    report = copy.deepcopy(BASELINE)
+    for path, value in changes.items():
+        section = report
+        *parents, leaf = path.split("__")
+        for key in parents:
+            section = section[key]
+        section[leaf] = value
+    return report
+
+
+def test_noise_below_the_floors_is_not_a_regression():
+    report = _rerun(
+        latency__end_to_end__p50_ms=55.0,
+        latency__end_to_end__mean_ms=84.0,
+        latency__nodes__pre_route__p50_ms=2.1,
+        allocations__retained_kb=11.0,
+        throughput__4__qps=30.0,
+    )
+
+    assert compare(report, BASELINE, 0.2) == []
+
+
+def test_any_change_in_deterministic_counts_is_a_regression():
+    report = _rerun(latency__llm_calls_per_query=1.0, latency__accuracy=0.958)
+
+    assert compare(report, BASELINE, 0.2) == [
+        "latency.llm_calls_per_query: 0.917 -> 1.0",
+        "latency.accuracy: 1.0 -> 0.958",
+    ]
+
+
+def test_large_latency_and_throughput_regressions_are_reported():
+    report = _rerun(latency__end_to_end__mean_ms=120.0, throughput__4__qps=30.0)
+
+    assert compare(report, BASELINE, 0.2) == ["latency.end_to_end.mean_ms: 80.0 -> 120.0"]
+    assert "throughput.4.qps: 48.0 -> 30.0" in compare(report, BASELINE, 0.2, throughput=True)
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from benchmarks.stub_llm import default_responder
+
+
+@pytest.fixture
+def service(stub_llm):
+    from app.services.chatbot import CashifyChatbotService
+
+    chatbot = CashifyChatbotService()
+    chatbot.response_cache.clear()
+    yield chatbot
+    chatbot.close()
+
+
+def _failing_responder(messages):
+    raise RuntimeError("LLM unavailable")
+
+
+@pytest.mark.parametrize("query", [
+    # Goes to the model, whose failure falls back to a canned reply
+    "what is the resale value of my iphone 12",
+    # Goes to the judge, whose failure defaults to a refusal
+    "Amazon order status",
+])
+def test_llm_failures_are_not_cached(service, stub_llm, query):
+    stub_llm.responder = _failing_responder
+
+    response = service.process_query(query)
+
+    assert response.degraded
+    assert service.response_cache.stats()["entries"] == 0
+
+
+def test_llm_failures_are_not_cached_async(service, stub_llm):
+    stub_llm.responder = _failing_responder
+
+    response = asyncio.run(service.aprocess_query("what is the resale value of my iphone 12"))
+
+    assert response.degraded
+    assert service.response_cache.stats()["entries"] == 0
+
+
+def test_answers_are_cached(service):
+    response = service.process_query("what is the resale value of my iphone 12")
+
+    assert not response.degraded
+    assert service.response_cache.stats()["entries"] == 1
+
+
+def _thread_messages(service, session_id):
+    state = service.workflow.workflow.get_state({"configurable": {"thread_id": session_id}})
+    return [message.content for message in state.values.get("messages", [])]
+
+
+def test_follow_ups_are_not_shared_between_sessions(service, stub_llm):
+    calls = []
+
+    def counting_responder(messages):
+        calls.append(messages)
+        return default_responder(messages)
+
+    stub_llm.responder = counting_responder
+    service.process_query("what is the resale value of my iphone 12", session_id="alice")
+    service.process_query("what about its screen repair", session_id="alice")
+    entries = service.response_cache.stats()["entries"]
+
+    service.process_query("what is the resale value of my galaxy s21", session_id="bob")
+    calls.clear()
+    service.process_query("what about its screen repair", session_id="bob")
+
+    # Bob's follow-up ran through the model with Bob's context instead of reusing Alice's answer
+    assert calls
+    assert service.response_cache.stats()["hits"] == 0
+    assert service.response_cache.stats()["entries"] == entries + 1
+
+
+def test_cache_hits_are_recorded_in_the_session_thread(service):
+    query = "what is the resale value of my iphone 12"
+    answer = service.process_query(query, session_id="carol").final_response
+
+    response = service.process_query(query, session_id="dave")
+
+    assert service.response_cache.stats()["hits"] == 1
+    assert _thread_messages(service, "dave") == [query, answer]
+    assert service.get_chat_history("dave")[-1]["bot"] == answer
+    assert response.final_response == answer
+
+
+def test_clearing_a_session_keeps_the_shared_cache(service):
+    service.process_query("what is the resale value of my iphone 12", session_id="frank")
+
+    service.clear_chat_history("frank")
+
+    assert service.get_chat_history("frank") == []
+    assert service.response_cache.stats()["entries"] == 1
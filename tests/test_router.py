@@ -0,0 +1,72 @@
+import pytest
+
+from app.services.router import ACCEPT, REJECT, IntentRouter
+
+
+@pytest.fixture(scope="module")
+def router():
+    return IntentRouter()
+
+
+@pytest.mark.parametrize("query, intent", [
+    ("where is my order", "order_tracking"),
+    ("mera order kaha hai", "order_tracking"),
+    ("मेरा ऑर्डर कहाँ है", "order_tracking"),
+    ("where is my oder", "order_tracking"),
+    ("how many coins do i have", "profile"),
+    ("मेरे सिक्के कितने हैं", "profile"),
+    ("purchase history", "last_purchases"),
+    ("show trending phones", "trending"),
+    ("is the pixel 8 in stock", "trending"),
+    ("what is cashify", "about"),
+])
+def test_accepts_cashify_queries(router, query, intent):
+    decision = router.classify(query)
+    assert decision.decision == ACCEPT
+    assert decision.intent == intent
+
+
+@pytest.mark.parametrize("query", [
+    "iPhone 15 price",
+    "sell my old phone",
+    "hi",
+])
+def test_accepts_device_and_greeting_queries(router, query):
+    assert router.classify(query).decision == ACCEPT
+
+
+@pytest.mark.parametrize("query", [
+    "buy a gun",
+    "I want to buy a house",
+    "tell me the price of bitcoin",
+    "which phone should I use to stalk my ex",
+    "my account was hacked by someone",
+    "track my weight loss",
+    "coin flip probability",
+    "in stock market tips",
+    "Amazon order status",
+    "flipkart order kab aayega",
+    "delivery of a baby at home",
+])
+def test_generic_commerce_words_do_not_accept(router, query):
+    assert router.classify(query).decision != ACCEPT
+
+
+@pytest.mark.parametrize("query", [
+    "apple stock price today",
+    "dell share price",
+    "who is the ceo of samsung",
+    "write me a poem about my phone",
+    "how do I root my samsung phone to bypass the lock of a stolen phone",
+])
+def test_brand_or_device_mentions_alone_do_not_accept(router, query):
+    assert router.classify(query).decision != ACCEPT
+
+
+@pytest.mark.parametrize("query", [
+    "who is the prime minister of india",
+    "how to make a bomb",
+    "मैं परेशान हूँ",
+])
+def test_rejects_out_of_scope_queries(router, query):
+    assert router.classify(query).decision == REJECT
@@ -0,0 +1,37 @@
+import json
+import threading
+
+from app.core.search_cache import SearchCache
+
+
+def test_periodic_save_runs_off_the_calling_thread(tmp_path, monkeypatch):
+    path = tmp_path / "search.json"
+    cache = SearchCache(str(path), persist_interval=0)
+    saved = threading.Event()
+    writers = []
+    save = cache.save
+
+    def recording_save():
+        writers.append(threading.current_thread())
+        save()
+        saved.set()
+
+    monkeypatch.setattr(cache, "save", recording_save)
+    cache.results.put("iphone 12 price", "Rs 25,000")
+    cache.mark_dirty()
+
+    assert saved.wait(5)
+    assert writers and writers[0] is not threading.current_thread()
+    assert json.loads(path.read_text())["results"][0][:2] == ["iphone 12 price", "Rs 25,000"]
+
+
+def test_final_save_flushes_pending_entries(tmp_path):
+    path = tmp_path / "search.json"
+    cache = SearchCache(str(path), persist_interval=3600)
+    cache.terms.put("sell old phone", "sell used phone online india")
+    cache.mark_dirty()
+    assert not path.exists()
+
+    cache.save()
+
+    assert SearchCache(str(path)).terms.get("sell old phone") == "sell used phone online india"
@@ -0,0 +1,47 @@
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def client(stub_llm):
+    from api.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def _threads():
+    from api.main import chatbot_service
+
+    checkpointer = chatbot_service.workflow.checkpointer
+    return {item.config["configurable"]["thread_id"] for item in checkpointer.list(None)}
+
+
+def _stored_sessions():
+    from api.main import chatbot_service
+
+    backend = chatbot_service.session_memory.backend
+    return {row[0] for row in backend._conn.execute("SELECT DISTINCT session_id FROM chat_history")}
+
+
+def test_sessionless_requests_leave_no_threads_behind(client):
+    threads, sessions = _threads(), _stored_sessions()
+
+    for message in ("where is my order", "what is the resale value of my iphone 12"):
+        response = client.post("/chat", json={"message": message})
+        assert response.status_code == 200
+        assert response.json()["session_id"] is None
+    response = client.post("/chat/stream", json={"message": "how many coins do i have"})
+    assert response.status_code == 200
+    assert "X-Session-Id" not in response.headers
+
+    assert _threads() == threads
+    assert _stored_sessions() == sessions
+
+
+def test_requests_with_a_session_id_are_checkpointed(client):
+    response = client.post("/chat", json={"message": "where is my order", "session_id": "erin"})
+
+    assert response.json()["session_id"] == "erin"
+    assert "erin" in _threads()
+    assert "erin" in _stored_sessions()
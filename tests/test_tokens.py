@@ -0,0 +1,49 @@
+import pytest
+
+from app.logs.logger import Logger
+from app.services import tokens
+from app.services.tokens import TokenCounter
+
+
+class _LocalOnlyTokenizer:
+    loaded = []
+
+    @classmethod
+    def from_file(cls, path):
+        cls.loaded.append(path)
+        return cls()
+
+    @classmethod
+    def from_pretrained(cls, *args, **kwargs):
+        raise AssertionError("tokenizers must not be fetched from the network")
+
+
+@pytest.fixture
+def warnings(monkeypatch):
+    monkeypatch.setattr(tokens, "_fallback_warned", False)
+    recorded = []
+    monkeypatch.setattr(Logger(tokens.__name__).get_logger(), "warning", lambda *args: recorded.append(args))
+    return recorded
+
+
+def test_missing_tokenizer_file_falls_back_and_warns_once(tmp_path, monkeypatch, warnings):
+    monkeypatch.setattr(tokens, "Tokenizer", _LocalOnlyTokenizer)
+    missing = str(tmp_path / "tokenizer.json")
+
+    counters = [TokenCounter("llama-3.3-70b-versatile", missing) for _ in range(3)]
+
+    assert not any(counter.exact for counter in counters)
+    assert counters[0].count("abcdefgh") == 2
+    assert len(warnings) == 1
+
+
+def test_tokenizer_is_loaded_from_the_local_path_only(tmp_path, monkeypatch, warnings):
+    monkeypatch.setattr(tokens, "Tokenizer", _LocalOnlyTokenizer)
+    path = tmp_path / "tokenizer.json"
+    path.write_text("{}")
+
+    counter = TokenCounter("llama-3.3-70b-versatile", str(path))
+
+    assert counter.exact
+    assert _LocalOnlyTokenizer.loaded[-1] == str(path)
+    assert warnings == []